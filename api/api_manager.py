@@ -1,12 +1,119 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from custom_requester.adapters import TimingHTTPAdapter
+from custom_requester.http2_adapter import HTTP2Adapter
+
 from .auth_api import AuthAPI
 from .movies_api import MoviesAPI
 from .user_api import UserAPI
-from constants import BASE_URL, MOVIES_BASE_URL
+from constants import BASE_URL, CONNECTION_POOL_SIZE, HTTP2_HOSTS, MOVIES_BASE_URL
+
+
+class Batch:
+    """
+    Накопитель вызовов для ApiManager.batch().
+    Вызовы выполняются при выходе из контекста, результаты доступны в self.results.
+    """
+    def __init__(self):
+        self.calls = []
+        self.results = None
+
+    def add(self, func, *args, **kwargs):
+        """
+        Добавляет вызов в пакет.
+        :param func: Метод API, например api_manager.movies_api.get_movie_by_id.
+        :return: Индекс результата в self.results.
+        """
+        self.calls.append(partial(func, *args, **kwargs))
+        return len(self.calls) - 1
 
 
 class ApiManager:
-    def __init__(self, session):
+    # Хосты (base URL), запросы к которым идут через HTTP/2 - один мультиплексированный канал вместо пула
+    http2_hosts = HTTP2_HOSTS
+
+    def __init__(self, session, cleanup_registry=None, pool_size=CONNECTION_POOL_SIZE):
+        """
+        :param session: Общая requests.Session для всех API.
+        :param cleanup_registry: CleanupRegistry, куда автоматически попадают созданные фильмы и пользователи.
+        :param pool_size: Размер пула keep-alive соединений на хост и число потоков gather/batch по умолчанию.
+        """
         self.session = session
-        self.auth_api = AuthAPI(session=session, base_url=BASE_URL)
-        self.user_api = UserAPI(session=session, base_url=BASE_URL)
-        self.movies_api = MoviesAPI(session=session, base_url=MOVIES_BASE_URL)
+        self.cleanup_registry = cleanup_registry
+        self.pool_size = pool_size
+        # Один пул на хост; при нехватке соединений потоки ждут освободившееся, а не открывают лишние
+        self.adapters = {}
+        for base_url in dict.fromkeys((BASE_URL, MOVIES_BASE_URL)):
+            adapter = session.get_adapter(base_url)
+            if base_url in self.http2_hosts:
+                if not isinstance(adapter, HTTP2Adapter):
+                    # verify с учётом окружения (REQUESTS_CA_BUNDLE и т.п.) - тот же, что session.request передаст в send
+                    verify = session.merge_environment_settings(base_url, {}, None, session.verify, None)["verify"]
+                    adapter = HTTP2Adapter(max_connections=pool_size, verify=verify)
+                    session.mount(base_url, adapter)
+            elif not isinstance(adapter, TimingHTTPAdapter) or adapter._pool_maxsize < pool_size:
+                adapter = TimingHTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+                session.mount(base_url, adapter)
+            self.adapters[base_url] = adapter
+        self.auth_api = AuthAPI(session=session, base_url=BASE_URL, cleanup_registry=cleanup_registry)
+        self.user_api = UserAPI(session=session, base_url=BASE_URL, cleanup_registry=cleanup_registry)
+        self.movies_api = MoviesAPI(session=session, base_url=MOVIES_BASE_URL, cleanup_registry=cleanup_registry)
+
+    def warm_up(self, connections=None):
+        """
+        Заранее открывает соединения (TCP + TLS) со всеми хостами, чтобы первые запросы тестов
+        не платили за рукопожатия.
+        :param connections: Сколько соединений открыть на хост (по умолчанию - весь пул).
+        :return: Словарь {base_url: число открытых соединений}.
+        """
+        connections = connections or self.pool_size
+        calls = []
+        for base_url, adapter in self.adapters.items():
+            # verify с учётом окружения (REQUESTS_CA_BUNDLE и т.п.), как его увидит session.request
+            verify = self.session.merge_environment_settings(base_url, {}, None, self.session.verify, None)["verify"]
+            calls.append(partial(adapter.warm_up, base_url, connections, verify))
+        return dict(zip(self.adapters, self.gather(calls)))
+
+    def pool_stats(self):
+        """
+        Счётчики переиспользования соединений по хостам (см. TimingHTTPAdapter.stats):
+        hits - оценка числа запросов по открытому соединению, misses - запросов, открывших новое.
+        """
+        return {base_url: adapter.stats() for base_url, adapter in self.adapters.items()}
+
+    def gather(self, calls, max_workers=None):
+        """
+        Выполняет независимые вызовы API параллельно на ограниченном пуле потоков поверх общей сессии.
+        Проверка статуса выполняется внутри каждого вызова (expected_status метода API).
+        :param calls: Список вызываемых объектов без аргументов (functools.partial, lambda).
+        :param max_workers: Максимальное число одновременных запросов
+                            (по умолчанию совпадает с размером пула соединений self.pool_size).
+        :return: Список результатов в порядке calls.
+        """
+        calls = list(calls)
+        if not calls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers or self.pool_size, len(calls))) as executor:
+            # Каждый вызов - в копии контекста вызывающего потока (бюджет deadline() и т.п.)
+            futures = [executor.submit(contextvars.copy_context().run, call) for call in calls]
+
+        # Пул уже дождался всех вызовов; первая ошибка (в т.ч. pytest.fail) пробрасывается в тест
+        return [future.result() for future in futures]
+
+    @contextmanager
+    def batch(self, max_workers=None):
+        """
+        Контекст для пакетного выполнения вызовов:
+
+            with api_manager.batch() as batch:
+                for movie_id in ids:
+                    batch.add(api_manager.movies_api.get_movie_by_id, movie_id)
+            responses = batch.results
+        """
+        batch = Batch()
+        yield batch
+        batch.results = self.gather(batch.calls, max_workers=max_workers)
@@ -0,0 +1,38 @@
+import httpx
+
+from .async_auth_api import AsyncAuthAPI
+from .async_movies_api import AsyncMoviesAPI
+from .async_user_api import AsyncUserAPI
+from constants import BASE_URL, MOVIES_BASE_URL
+
+
+class AsyncApiManager:
+    """
+    Асинхронный аналог ApiManager: все API работают поверх одного httpx.AsyncClient.
+    """
+    def __init__(self, client, cleanup_registry=None):
+        """
+        :param client: Общий httpx.AsyncClient для всех API.
+        :param cleanup_registry: CleanupRegistry, куда автоматически попадают созданные фильмы и пользователи.
+        """
+        self.client = client
+        self.cleanup_registry = cleanup_registry
+        self.auth_api = AsyncAuthAPI(client=client, base_url=BASE_URL, cleanup_registry=cleanup_registry)
+        self.user_api = AsyncUserAPI(client=client, base_url=BASE_URL, cleanup_registry=cleanup_registry)
+        self.movies_api = AsyncMoviesAPI(client=client, base_url=MOVIES_BASE_URL, cleanup_registry=cleanup_registry)
+
+    @classmethod
+    def create(cls, max_connections=100, cleanup_registry=None):
+        """
+        Создаёт менеджер с собственным клиентом, рассчитанным на max_connections одновременных запросов.
+        Использовать как `async with AsyncApiManager.create() as manager: ...`
+        :param cleanup_registry: CleanupRegistry для созданных сущностей (см. __init__).
+        """
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        return cls(client=httpx.AsyncClient(limits=limits), cleanup_registry=cleanup_registry)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
@@ -0,0 +1,67 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from constants import LOGIN_ENDPOINT, REGISTER_ENDPOINT
+
+
+class AsyncAuthAPI(AsyncCustomRequester):
+    def __init__(self, client, base_url, cleanup_registry=None):
+        super().__init__(client=client, base_url=base_url)
+        self.client = client
+        self.cleanup_registry = cleanup_registry
+
+    async def register_user(self, user_data, expected_status=201):
+        """
+        Регистрация нового пользователя.
+        :param user_data: Данные пользователя.
+        :param expected_status: Ожидаемый статус-код.
+        """
+        response = await self.send_request(
+            method="POST",
+            endpoint=REGISTER_ENDPOINT,
+            json=user_data,
+            expected_status=expected_status
+        )
+        if self.cleanup_registry is not None and response.status_code == 201:
+            self.cleanup_registry.add_user(response.json()["id"])
+        return response
+
+    async def login_user(self, login_data, expected_status=200):
+        """
+        Авторизация пользователя.
+        :param login_data: Данные для логина.
+        :param expected_status: Ожидаемый статус-код.
+        """
+        return await self.send_request(
+            method="POST",
+            endpoint=LOGIN_ENDPOINT,
+            json=login_data,
+            expected_status=expected_status
+        )
+
+    async def authenticate(self, user_creds):
+        """
+        Авторизует пользователя и устанавливает токен авторизации в клиенте.
+        :param user_creds: Словарь с кредами, например: {'email': '...', 'password': '...'}
+        :return: Полученный токен авторизации (строка) или None в случае ошибки.
+        """
+        login_data = {
+            "email": user_creds["email"],
+            "password": user_creds["password"]
+        }
+
+        try:
+            response_obj = await self.login_user(login_data)
+            response_data = response_obj.json()
+
+            token = response_data.get("accessToken")
+            if not token:
+                self.logger.error(f"Токен не найден в ответе. Ответ: {response_data}")
+                return None
+
+            self._update_session_headers(**{"authorization": "Bearer " + token})
+            self.logger.info("Токен получен и установлен в клиент")
+
+            return token
+
+        except Exception as e:
+            self.logger.error(f"Ошибка при аутентификации: {e}")
+            return None
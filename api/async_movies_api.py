@@ -0,0 +1,66 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from constants import MOVIES_ENDPOINT
+
+
+class AsyncMoviesAPI(AsyncCustomRequester):
+    def __init__(self, client, base_url, cleanup_registry=None):
+        super().__init__(client=client, base_url=base_url)
+        self.client = client
+        self.cleanup_registry = cleanup_registry
+
+    async def create_movie(self, movie_data, expected_status=201):
+        """ Создание нового фильма"""
+        response = await self.send_request(
+            method="POST",
+            endpoint=MOVIES_ENDPOINT,
+            json=movie_data,
+            expected_status=expected_status
+        )
+        if self.cleanup_registry is not None and response.status_code == 201:
+            self.cleanup_registry.add_movie(response.json()["id"])
+        return response
+
+    async def get_movies(self, params=None, expected_status=200):
+        """
+        Получаем список фильмов
+        """
+        return await self.send_request(
+            method="GET",
+            endpoint=MOVIES_ENDPOINT,
+            params=params,
+            expected_status=expected_status
+        )
+
+    async def get_movie_by_id(self, movie_id, expected_status=200):
+        """
+        Получаем фильм по ID
+        """
+        return await self.send_request(
+            method="GET",
+            endpoint=f"{MOVIES_ENDPOINT}/{movie_id}",
+            expected_status=expected_status
+        )
+
+    async def delete_movie(self, movie_id, expected_status=200):
+        """
+        Удаление фильма
+        """
+        response = await self.send_request(
+            method="DELETE",
+            endpoint=f"{MOVIES_ENDPOINT}/{movie_id}",
+            expected_status=expected_status
+        )
+        if self.cleanup_registry is not None and response.status_code == 200:
+            self.cleanup_registry.discard_movie(movie_id)
+        return response
+
+    async def update_movie(self, movie_id, update_data, expected_status=200):
+        """
+        Редактирование фильма по ID
+        """
+        return await self.send_request(
+            method="PATCH",
+            endpoint=f"{MOVIES_ENDPOINT}/{movie_id}",
+            json=update_data,
+            expected_status=expected_status
+        )
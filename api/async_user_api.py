@@ -0,0 +1,35 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+
+
+class AsyncUserAPI(AsyncCustomRequester):
+    def __init__(self, client, base_url, cleanup_registry=None):
+        super().__init__(client=client, base_url=base_url)
+        self.client = client
+        self.cleanup_registry = cleanup_registry
+
+    async def get_user_info(self, user_id, expected_status=200):
+        """
+        Получение информации о пользователе.
+        :param user_id: ID пользователя.
+        :param expected_status: Ожидаемый статус-код.
+        """
+        return await self.send_request(
+            method="GET",
+            endpoint=f"/user/{user_id}",
+            expected_status=expected_status
+        )
+
+    async def delete_user(self, user_id, expected_status=204):
+        """
+        Удаление пользователя.
+        :param user_id: ID пользователя.
+        :param expected_status: Ожидаемый статус-код.
+        """
+        response = await self.send_request(
+            method="DELETE",
+            endpoint=f"/user/{user_id}",
+            expected_status=expected_status
+        )
+        if self.cleanup_registry is not None and response.status_code in (200, 204):
+            self.cleanup_registry.discard_user(user_id)
+        return response
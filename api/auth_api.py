@@ -1,11 +1,75 @@
 
+from urllib.parse import urlsplit
+
+from requests.auth import AuthBase
+
 from custom_requester.custom_requester import CustomRequester
 from constants import LOGIN_ENDPOINT, REGISTER_ENDPOINT
+from utils.token_cache import TokenCache
+
+
+class CachedTokenAuth(AuthBase):
+    """
+    Авторизация сессии requests токеном из TokenCache (session.auth).
+    Токен подставляется в каждый запрос заново, поэтому истекающий токен обновляется заранее
+    (см. TokenCache.refresh_margin), а не живёт в заголовках сессии до конца прогона.
+    Если сервер всё же отверг токен (401), он удаляется из кэша и запрос повторяется один раз с новым.
+    """
+    # Логин и регистрация токена не требуют: 401 на них - про креды, а не про токен
+    skip_paths = (LOGIN_ENDPOINT, REGISTER_ENDPOINT)
+
+    def __init__(self, token_cache, cache_key, fetch):
+        """
+        :param token_cache: TokenCache.
+        :param cache_key: Ключ из TokenCache.make_key.
+        :param fetch: Функция без аргументов, выполняющая логин и возвращающая токен или None.
+        """
+        self.token_cache = token_cache
+        self.cache_key = cache_key
+        self.fetch = fetch
+
+    def token(self):
+        return self.token_cache.get_or_fetch(self.cache_key, self.fetch)
+
+    def __call__(self, request):
+        if urlsplit(request.url).path.rstrip("/").endswith(self.skip_paths):
+            return request
+        token = self.token()
+        if token:
+            request.headers["Authorization"] = f"Bearer {token}"
+            request.register_hook("response", self.handle_401)
+        return request
+
+    def handle_401(self, response, **kwargs):
+        """Хук ответа: на 401 получает новый токен и один раз повторяет запрос (как HTTPDigestAuth)."""
+        if response.status_code != 401 or getattr(response.request, "token_retried", False):
+            return response
+        rejected = response.request.headers["Authorization"][len("Bearer "):]
+        self.token_cache.invalidate(self.cache_key, token=rejected)
+        token = self.token()
+        if not token or token == rejected:
+            return response
+
+        # Соединение нужно вернуть в пул до повтора
+        response.content
+        response.close()
+        retry = response.request.copy()
+        retry.headers["Authorization"] = f"Bearer {token}"
+        retry.token_retried = True
+        new_response = response.connection.send(retry, **kwargs)
+        new_response.history.append(response)
+        new_response.request = retry
+        return new_response
+
 
 class AuthAPI(CustomRequester):
-    def __init__(self, session, base_url): # <-- ДОЛЖЕН ПРИНИМАТЬ base_url
+    # Общий для всех экземпляров (и, через файл, для всех воркеров) кэш токенов; None - без кэша
+    token_cache = TokenCache()
+
+    def __init__(self, session, base_url, cleanup_registry=None): # <-- ДОЛЖЕН ПРИНИМАТЬ base_url
         super().__init__(session=session, base_url=base_url)
         self.session = session
+        self.cleanup_registry = cleanup_registry
 
     def register_user(self, user_data, expected_status=201):
         """
@@ -13,12 +77,15 @@ class AuthAPI(CustomRequester):
         :param user_data: Данные пользователя.
         :param expected_status: Ожидаемый статус-код.
         """
-        return self.send_request(
+        response = self.send_request(
             method="POST",
             endpoint=REGISTER_ENDPOINT,
             json=user_data,
             expected_status=expected_status
         )
+        if self.cleanup_registry is not None and response.status_code == 201:
+            self.cleanup_registry.add_user(response.json()["id"])
+        return response
 
     def login_user(self, login_data, expected_status=200):
         """
@@ -33,10 +100,13 @@ class AuthAPI(CustomRequester):
             expected_status=expected_status
         )
 
-    def authenticate(self, user_creds):
+    def authenticate(self, user_creds, use_cache=True):
         """
         Авторизует пользователя и устанавливает токен авторизации в сессии.
+        Токен берётся из общего кэша, логин выполняется только при его отсутствии или скором истечении;
+        с кэшем токен подставляется в каждый запрос сессии (CachedTokenAuth) и обновляется по ходу прогона.
         :param user_creds: Словарь с кредами, например: {'email': '...', 'password': '...'}
+        :param use_cache: Использовать ли кэш токенов (по умолчанию True).
         :return: Полученный токен авторизации (строка) или None в случае ошибки.
         """
         login_data = {
@@ -45,17 +115,24 @@ class AuthAPI(CustomRequester):
         }
 
         try:
-            # send_request уже проверяет статус и логирует ошибки
-            response_obj = self.login_user(login_data)
-            response_data = response_obj.json()
+            if use_cache and self.token_cache is not None:
+                cache_key = self.token_cache.make_key(self.base_url, login_data["email"], login_data["password"])
+                auth = CachedTokenAuth(self.token_cache, cache_key, lambda: self._fetch_token(login_data))
+                token = auth.token()
+                if not token:
+                    return None
+                # Токен подставляется в каждый запрос сессии из кэша и обновляется до истечения
+                self.session.auth = auth
+                self.logger.info("Токен получен, сессия авторизуется через кэш токенов")
+                return token
 
-            # Получаем токен
-            token = response_data.get("accessToken")
+            token = self._fetch_token(login_data)
             if not token:
-                self.logger.error(f"Токен не найден в ответе. Ответ: {response_data}")
                 return None
 
             # Обновляем заголовки сессии
+            if hasattr(self.session, "auth"):
+                self.session.auth = None
             self._update_session_headers(**{"authorization": "Bearer " + token})
             self.logger.info("Токен получен и установлен в сессию")
 
@@ -63,4 +140,16 @@ class AuthAPI(CustomRequester):
 
         except Exception as e:
             self.logger.error(f"Ошибка при аутентификации: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _fetch_token(self, login_data):
+        """
+        Выполняет логин и возвращает accessToken из ответа (или None).
+        """
+        # send_request уже проверяет статус и логирует ошибки
+        response_data = self.login_user(login_data).json()
+
+        token = response_data.get("accessToken")
+        if not token:
+            self.logger.error(f"Токен не найден в ответе. Ответ: {response_data}")
+        return token
@@ -1,19 +1,114 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pytest
+
 from custom_requester.custom_requester import CustomRequester
 from constants import MOVIES_ENDPOINT
 
+
+class BulkCreateReport:
+    """
+    Итог массового создания фильмов: ID и ответы на создание, ошибки и пропускная способность.
+    """
+    def __init__(self):
+        self.created_ids = []
+        self.created_movies = [] # тела ответов 201 в том же порядке, что created_ids
+        self.failures = [] # (данные фильма, статус-код или None, текст ошибки)
+        self.elapsed = 0.0
+
+    @property
+    def total(self):
+        return len(self.created_ids) + len(self.failures)
+
+    @property
+    def throughput(self):
+        """Созданных фильмов в секунду."""
+        return len(self.created_ids) / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"Создано фильмов: {len(self.created_ids)}/{self.total}, ошибок: {len(self.failures)}, "
+                f"время: {self.elapsed:.2f} с, {self.throughput:.1f} фильмов/с")
+
 class MoviesAPI(CustomRequester):
-    def __init__(self, session, base_url):
+    def __init__(self, session, base_url, cleanup_registry=None):
         super().__init__(session=session, base_url=base_url)
         self.session = session
+        self.cleanup_registry = cleanup_registry
 
     def create_movie(self, movie_data, expected_status=201):
         """ Создание нового фильма"""
-        return self.send_request(
+        response = self.send_request(
             method="POST",
             endpoint=MOVIES_ENDPOINT,
             json=movie_data,
             expected_status=expected_status
         )
+        if self.cleanup_registry is not None and response.status_code == 201:
+            self.cleanup_registry.add_movie(response.json()["id"])
+        return response
+
+    def create_movies_bulk(self, movies, concurrency=10, rate=None):
+        """
+        Массовое создание фильмов с ограниченным числом запросов "в полёте".
+        Данные читаются из итерируемого объекта лениво, поэтому можно передавать генератор:
+            movies_api.create_movies_bulk(DataGenerator.movies(10000))
+        :param movies: Итерируемый объект с данными фильмов.
+        :param concurrency: Максимальное число одновременных запросов.
+        :param rate: Ограничение скорости отправки (запросов в секунду), None - без ограничения.
+        :return: BulkCreateReport; created_ids идут в порядке завершения запросов.
+        """
+        report = BulkCreateReport()
+        interval = 1.0 / rate if rate else 0.0
+        start = time.perf_counter()
+        next_send = start
+        in_flight = set()
+
+        def collect(done):
+            for future in done:
+                movie_data, movie, status_code, error = future.result()
+                if movie is not None:
+                    report.created_ids.append(movie["id"])
+                    report.created_movies.append(movie)
+                else:
+                    report.failures.append((movie_data, status_code, error))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for movie_data in movies:
+                if len(in_flight) >= concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                if interval:
+                    delay = next_send - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_send = max(next_send + interval, time.perf_counter())
+                # copy_context - чтобы бюджет deadline() вызывающего действовал и в потоках пула
+                in_flight.add(executor.submit(contextvars.copy_context().run, self._create_movie_for_bulk, movie_data))
+            collect(wait(in_flight)[0])
+
+        report.elapsed = time.perf_counter() - start
+        self.logger.info(str(report))
+        return report
+
+    def _create_movie_for_bulk(self, movie_data):
+        """
+        Создаёт один фильм, не пропуская наружу никаких ошибок, чтобы одна неудача не прерывала всю загрузку.
+        :return: (данные фильма, созданный фильм или None, статус-код или None, текст ошибки или None)
+        """
+        status_code = None
+        try:
+            response = self.create_movie(movie_data, expected_status=None)
+            status_code = response.status_code
+            if status_code != 201:
+                return movie_data, None, status_code, response.text
+            return movie_data, response.json(), status_code, None
+        except pytest.fail.Exception as e:
+            return movie_data, None, status_code, str(e)
+        except Exception as e:
+            # Например, тело ответа 201 не JSON - фильм попадает в ошибки, остальные создаются дальше
+            return movie_data, None, status_code, f"{type(e).__name__}: {e}"
 
     def get_movies(self, params=None, expected_status=200):
         """
@@ -26,6 +121,35 @@ class MoviesAPI(CustomRequester):
             expected_status=expected_status
         )
 
+    def iter_movies(self, filters=None, page_size=100):
+        """
+        Генератор, отдающий фильмы по одному со всех страниц афиши.
+        Следующая страница запрашивается в фоне, пока вызывающий код обрабатывает текущую.
+        Остановка - по pageCount из ответа (или по пустой странице).
+        :param filters: Параметры фильтрации get_movies (без page/pageSize).
+        :param page_size: Размер страницы.
+        """
+        params = dict(filters or {})
+        params["pageSize"] = page_size
+
+        def fetch(page):
+            return self.get_movies(params={**params, "page": page}).json()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 1
+            pending = executor.submit(contextvars.copy_context().run, fetch, page)
+            while pending is not None:
+                response_data = pending.result()
+                movies = response_data.get("movies", [])
+                page_count = response_data.get("pageCount", page)
+
+                pending = None
+                if movies and page < page_count:
+                    page += 1
+                    pending = executor.submit(contextvars.copy_context().run, fetch, page)
+
+                yield from movies
+
     def get_movie_by_id(self, movie_id, expected_status=200):
         """
         Получаем фильм по ID
@@ -40,11 +164,14 @@ class MoviesAPI(CustomRequester):
         """
         Удаление фильма
         """
-        return self.send_request(
+        response = self.send_request(
             method="DELETE",
             endpoint=f"{MOVIES_ENDPOINT}/{movie_id}",
             expected_status=expected_status
         )
+        if self.cleanup_registry is not None and response.status_code == 200:
+            self.cleanup_registry.discard_movie(movie_id)
+        return response
 
     def update_movie(self, movie_id, update_data, expected_status=200):
         """
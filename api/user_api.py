@@ -1,9 +1,10 @@
 from custom_requester.custom_requester import CustomRequester
 
 class UserAPI(CustomRequester):
-    def __init__(self, session, base_url): # <-- ДОЛЖЕН ПРИНИМАТЬ base_url
+    def __init__(self, session, base_url, cleanup_registry=None): # <-- ДОЛЖЕН ПРИНИМАТЬ base_url
         super().__init__(session=session, base_url=base_url)
         self.session = session
+        self.cleanup_registry = cleanup_registry
 
     def get_user_info(self, user_id, expected_status=200):
         """
@@ -23,8 +24,11 @@ class UserAPI(CustomRequester):
         :param user_id: ID пользователя.
         :param expected_status: Ожидаемый статус-код.
         """
-        return self.send_request(
+        response = self.send_request(
             method="DELETE",
             endpoint=f"/user/{user_id}",
             expected_status=expected_status
         )
+        if self.cleanup_registry is not None and response.status_code in (200, 204):
+            self.cleanup_registry.discard_user(user_id)
+        return response
@@ -0,0 +1,44 @@
+import argparse
+import sys
+import time
+
+from utils.data_generator import DataGenerator, _payload_pools
+
+
+def rate(make_payloads, count):
+    """Payload'ов в секунду: make_payloads(count) должен вернуть итерируемое из count элементов."""
+    start = time.perf_counter()
+    for _ in make_payloads(count):
+        pass
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Сравнение поштучной генерации DataGenerator с потоками movies()/users()"
+    )
+    parser.add_argument("--count", type=int, default=20000, help="Payload'ов на замер")
+    parser.add_argument("--min-speedup", type=float, default=10.0,
+                        help="Минимальное ускорение; при меньшем код возврата 1")
+    args = parser.parse_args()
+
+    _payload_pools() # пулы строятся один раз на процесс - в замер не входят
+    cases = [
+        ("movies", lambda n: (DataGenerator.generate_movie_data() for _ in range(n)),
+         lambda n: DataGenerator.movies(n, seed=1)),
+        ("users", lambda n: (DataGenerator.generate_user_data() for _ in range(n)),
+         lambda n: DataGenerator.users(n, seed=1)),
+    ]
+    print(f"{'payload':<10}{'по одному, /с':>16}{'поток, /с':>16}{'ускорение':>12}")
+    ok = True
+    for name, single, stream in cases:
+        single_rate = rate(single, args.count)
+        stream_rate = rate(stream, args.count)
+        speedup = stream_rate / single_rate
+        ok = ok and speedup >= args.min_speedup
+        print(f"{name:<10}{single_rate:>16,.0f}{stream_rate:>16,.0f}{speedup:>11.1f}x")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,60 +1,270 @@
+import random
+import zlib
+
 from faker import Faker
 import pytest
 import requests
-from constants import REGISTER_ENDPOINT
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from custom_requester.cassette import Cassette
 from custom_requester.custom_requester import CustomRequester
-from utils.data_generator import DataGenerator
+from custom_requester.deadline import deadline
+from custom_requester.metrics import InMemoryHistogramSink, JsonlFileSink
+from custom_requester.request_log_buffer import request_log_buffer
+from custom_requester.rate_limiter import RateLimiter
+from custom_requester.resilience import RetryPolicy
+from stub_server.cinescope_stub import CinescopeStubServer
+from utils.data_generator import DataGenerator, UniqueIdAllocator, unique_ids
+from utils.histogram import LatencyHistogram
+from utils.cleanup_registry import CleanupRegistry
+from utils.movie_pool import MoviePool
+from utils.user_pool import UserPool
 from api.api_manager import ApiManager
-from constants import BASE_URL, HEADERS, BOOKING_ENDPOINT
+from api.auth_api import AuthAPI
+from constants import (ADMIN_CREDENTIALS, BASE_URL, HEADERS, BOOKING_ENDPOINT, CASSETTE_PATH, CONNECTION_POOL_SIZE,
+                       MOVIE_POOL_SIZE, RATE_LIMIT_STATE_DIR, RETRY_BACKOFF_BASE, RETRY_MAX_ATTEMPTS, USER_POOL_SIZE)
 import json
 
 
 faker = Faker()
 
+def pytest_addoption(parser):
+    parser.addoption("--user-pool-size", action="store", type=int, default=USER_POOL_SIZE,
+                     help="Число заранее зарегистрированных пользователей в пуле")
+    parser.addoption("--movie-pool-size", action="store", type=int, default=MOVIE_POOL_SIZE,
+                     help="Число заранее созданных фильмов для читающих тестов")
+    parser.addoption("--request-log-mode", action="store", choices=("full", "on-failure"), default="full",
+                     help="full - логировать каждый запрос, on-failure - выводить последние запросы только упавших тестов")
+    parser.addoption("--request-log-buffer", action="store", type=int, default=50,
+                     help="Сколько последних запросов теста хранить в режиме on-failure")
+    parser.addoption("--latency-report", action="store_true", default=False,
+                     help="Вывести в конце прогона таблицу задержек по эндпоинтам")
+    parser.addoption("--metrics-file", action="store", default=None,
+                     help="JSONL-файл, куда пишется замер каждого запроса")
+    parser.addoption("--cassette-mode", action="store", choices=("off", "record", "replay"), default="off",
+                     help="record - записывать запросы в кассету, replay - отвечать из кассеты без сети")
+    parser.addoption("--cassette", action="store", default=CASSETTE_PATH,
+                     help="Путь к файлу кассеты (JSONL)")
+    parser.addoption("--rate-limit", action="append", default=[],
+                     help="Ограничение скорости, общее для всех воркеров: base_url[/endpoint/{id}]=rps[:burst]")
+    parser.addoption("--max-attempts", action="store", type=int, default=RETRY_MAX_ATTEMPTS,
+                     help="Попыток на идемпотентный запрос при 429/502/503/504 и сетевых ошибках (1 - без повторов)")
+    parser.addoption("--pool-size", action="store", type=int, default=CONNECTION_POOL_SIZE,
+                     help="Размер пула keep-alive соединений на хост (и параллельность gather/batch)")
+    parser.addoption("--http2-host", action="append", default=[],
+                     help="Base URL хоста, запросы к которому идут через HTTP/2 (можно указать несколько раз)")
+    parser.addoption("--filter-oracle", action="store_true", default=False,
+                     help="Проверить фильтры get_movies по всей сетке сочетаний на стенде (сотни GET-запросов)")
+    parser.addoption("--no-warm-up", action="store_true", default=False,
+                     help="Не открывать соединения с хостами заранее в начале сессии")
+
+
+# Приёмники замеров, подключённые на время прогона
+metrics_sinks = {}
+# Счётчики пулов соединений общей сессии, заполняются при её закрытии
+connection_pool_stats = {}
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "deadline(seconds): общий бюджет времени на все запросы теста")
+    config.addinivalue_line("markers", "filter_oracle: проверка всей сетки фильтров на стенде, только с --filter-oracle")
+    CustomRequester.log_mode = config.getoption("--request-log-mode").replace("-", "_")
+    CustomRequester.retry_policy = RetryPolicy(max_attempts=config.getoption("--max-attempts"),
+                                               backoff_base=RETRY_BACKOFF_BASE)
+    if config.getoption("--rate-limit"):
+        try:
+            rules = dict(RateLimiter.parse_rule(rule) for rule in config.getoption("--rate-limit"))
+        except ValueError as e:
+            raise pytest.UsageError(f"--rate-limit: {e}")
+        CustomRequester.rate_limiter = RateLimiter(rules, RATE_LIMIT_STATE_DIR)
+    request_log_buffer.resize(config.getoption("--request-log-buffer"))
+    if config.getoption("--http2-host"):
+        ApiManager.http2_hosts = tuple(config.getoption("--http2-host"))
+
+    if config.getoption("--latency-report"):
+        metrics_sinks["latency"] = InMemoryHistogramSink()
+    if config.getoption("--metrics-file"):
+        metrics_sinks["file"] = JsonlFileSink(config.getoption("--metrics-file"))
+    for sink in metrics_sinks.values():
+        CustomRequester.add_metrics_sink(sink)
+
+    if config.getoption("--cassette-mode") != "off":
+        CustomRequester.cassette = Cassette(config.getoption("--cassette"), config.getoption("--cassette-mode"))
+        # Кэш токенов в /tmp решал бы, будет ли логин, по состоянию машины - под кассетой логин всегда свой
+        AuthAPI.token_cache = None
+
+
+def pytest_unconfigure(config):
+    if CustomRequester.cassette is not None:
+        CustomRequester.cassette.close()
+        CustomRequester.cassette = None
+    for sink in metrics_sinks.values():
+        CustomRequester.remove_metrics_sink(sink)
+    if "file" in metrics_sinks:
+        metrics_sinks["file"].close()
+    metrics_sinks.clear()
+
+
+def pytest_sessionfinish(session):
+    # Воркер xdist передаёт замеры контроллеру (pytest_testnodedown) - сводку печатает он
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None and "latency" in metrics_sinks:
+        sink = metrics_sinks["latency"]
+        workeroutput["cinescope_latency"] = {
+            "histograms": {key: histogram.to_dict() for key, histogram in sink.histograms.items()},
+            "status_counts": sink.status_counts,
+            "errors": sink.errors,
+            "retries": sink.retries,
+            "pool_stats": connection_pool_stats,
+        }
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Сливает замеры завершившегося воркера xdist в сводку --latency-report контроллера."""
+    data = getattr(node, "workeroutput", {}).get("cinescope_latency")
+    if data is None or "latency" not in metrics_sinks:
+        return
+    histograms = {key: LatencyHistogram.from_dict(histogram) for key, histogram in data["histograms"].items()}
+    metrics_sinks["latency"].merge(histograms, data["status_counts"], data["errors"], data["retries"])
+    for base_url, stats in data["pool_stats"].items():
+        merged = connection_pool_stats.setdefault(base_url, dict.fromkeys(stats, 0))
+        for name, value in stats.items():
+            merged[name] = merged.get(name, 0) + value
+
+
+def pytest_terminal_summary(terminalreporter):
+    if metrics_sinks.get("latency") and metrics_sinks["latency"].histograms:
+        terminalreporter.write_sep("-", "Cinescope latency, ms")
+        terminalreporter.write_line(metrics_sinks["latency"].summary())
+        for base_url, stats in connection_pool_stats.items():
+            terminalreporter.write_line(
+                f"{base_url}: запросов {stats['requests']}, новых соединений {stats['new_connections']} "
+                f"(прогрето {stats['warmed']}), оценка hit/miss: {stats['hits']}/{stats['misses']}"
+                + (f", по HTTP/2 {stats['http2']}" if "http2" in stats else "")
+            )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--filter-oracle") and config.getoption("--cassette-mode") == "off":
+        return
+    if not config.getoption("--filter-oracle"):
+        reason = "проверка сетки фильтров на стенде включается --filter-oracle"
+    else:
+        # Число перепроверок зависит от параллельных тестов - записанные запросы не воспроизводятся
+        reason = "проверка сетки фильтров на стенде не работает с кассетой"
+    skip = pytest.mark.skip(reason=reason)
+    for item in items:
+        if item.get_closest_marker("filter_oracle"):
+            item.add_marker(skip)
+
+
+def pytest_runtest_setup(item):
+    request_log_buffer.clear()
+    if CustomRequester.cassette is not None:
+        # Одинаковые "случайные" данные и уникальные ID при записи и воспроизведении - запросы совпадают по хэшу тела
+        seed = zlib.crc32(item.nodeid.encode("utf-8"))
+        random.seed(seed)
+        Faker.seed(seed)
+        unique_ids.reset(f"{CustomRequester.cassette.run_id}:{item.nodeid}", worker_id="")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed and CustomRequester.log_mode == "on_failure":
+        report.sections.append(("Cinescope requests", request_log_buffer.dump()))
+
+
+@pytest.fixture(autouse=True)
+def test_deadline(request):
+    """
+    Бюджет времени из @pytest.mark.deadline(seconds): каждый запрос теста (и его function-фикстур)
+    получает таймаут не больше оставшегося времени, исчерпанный бюджет роняет тест с понятной ошибкой.
+    """
+    marker = request.node.get_closest_marker("deadline")
+    with deadline(marker.args[0] if marker else None):
+        yield
+
+
 @pytest.fixture(scope="function")
 def test_user():
     """
     Генерация случайного пользователя для тестов.
     """
-    random_email = DataGenerator.generate_random_email()
-    random_name = DataGenerator.generate_random_name()
-    random_password = DataGenerator.generate_random_password()
+    return DataGenerator.generate_user_data()
 
-    return {
-        "email": random_email,
-        "fullName": random_name,
-        "password": random_password,
-        "passwordRepeat": random_password,
-        "roles": ["USER"]
-    }
+
+@pytest.fixture(scope="session")
+def user_pool(request):
+    """
+    Сессионный пул заранее зарегистрированных пользователей, общий для воркеров xdist.
+    """
+    pool = UserPool(
+        api_manager=ApiManager(session=requests.Session()),
+        size=request.config.getoption("--user-pool-size")
+    )
+    pool.ensure()
+    yield pool
+    pool.close()
 
 
 @pytest.fixture(scope="function")
-def registered_user(requester, test_user):
+def registered_user(request):
     """
-    Фикстура для регистрации и получения данных зарегистрированного пользователя.
+    Фикстура, выдающая зарегистрированного пользователя из пула на время теста.
+    Под кассетой пул (файл в /tmp, переживающий запуски) не используется: пользователь регистрируется
+    заново, чтобы набор запросов при записи и воспроизведении не зависел от состояния машины.
     """
-    response = requester.send_request(
-        method="POST",
-        endpoint=REGISTER_ENDPOINT,
-        json=test_user,
-        expected_status=201
-    )
-    response_data = response.json()
-    registered_user = test_user.copy()
-    registered_user["id"] = response_data["id"]
-    return registered_user
+    if CustomRequester.cassette is not None:
+        user = DataGenerator.generate_user_data()
+        user["id"] = request.getfixturevalue("api_manager").auth_api.register_user(user).json()["id"]
+        yield user
+        return
+    user_pool = request.getfixturevalue("user_pool")
+    user = user_pool.lease()
+    yield user
+    user_pool.release(user)
 
 
 @pytest.fixture(scope="session")
-def requester():
+def requester(session):
     """
-    Фикстура для создания экземпляра CustomRequester.
+    Фикстура для создания экземпляра CustomRequester поверх общей сессии.
     """
-    session = requests.Session()
     return CustomRequester(session=session, base_url=BASE_URL)
 
 
+@pytest.fixture(scope="function")
+def stub_server(monkeypatch):
+    """
+    Собственный двойник Cinescope теста на свободном порту (для тестов транспорта и устойчивости:
+    внедрение ошибок через error_rate/error_status не задевает общий стенд).
+    Пока он запущен, приёмники замеров прогона (--latency-report, --metrics-file) отключены:
+    в сводке задержек - только хосты стенда.
+    """
+    monkeypatch.setattr(CustomRequester, "metrics_sinks", [])
+    server = CinescopeStubServer(port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="function")
+def stub_requester(stub_server, monkeypatch):
+    """
+    CustomRequester к stub_server с отдельной сессией и собственными размыкателями цепи,
+    без кассеты и ограничителя скорости.
+    """
+    monkeypatch.setattr(CustomRequester, "cassette", None)
+    monkeypatch.setattr(CustomRequester, "rate_limiter", None)
+    stub_session = requests.Session()
+    requester = CustomRequester(session=stub_session, base_url=stub_server.base_url)
+    requester.circuit_breakers = {}
+    yield requester
+    stub_session.close()
+
+
 @pytest.fixture(scope="session")
 def session():
     """
@@ -66,13 +276,40 @@ def session():
 
 
 @pytest.fixture(scope="session")
-def api_manager():
+def cleanup_registry():
     """
-    Инициализирует ApiManager с общей сессией.
+    Реестр созданных за сессию фильмов и пользователей.
+    В конце сессии всё удаляется параллельно от имени администратора.
     """
-    session = requests.Session()
-    manager = ApiManager(session=session)
-    return manager
+    registry = CleanupRegistry()
+    yield registry
+
+    if CustomRequester.cassette is not None and CustomRequester.cassette.mode == "replay":
+        return # при воспроизведении на сервере ничего не создавалось
+    admin_manager = ApiManager(session=requests.Session())
+    admin_manager.auth_api.authenticate(ADMIN_CREDENTIALS)
+    failed = registry.drain(admin_manager)
+    if failed:
+        admin_manager.movies_api.logger.warning(f"Не удалось удалить сущности (ID, статус или ошибка): {failed}")
+    admin_manager.session.close()
+
+
+@pytest.fixture(scope="session")
+def api_manager(request, session, cleanup_registry):
+    """
+    Инициализирует ApiManager с общей сессией: один пул соединений на хост, прогретый в начале сессии.
+    """
+    manager = ApiManager(session=session, cleanup_registry=cleanup_registry,
+                         pool_size=request.config.getoption("--pool-size"))
+    replay = CustomRequester.cassette is not None and CustomRequester.cassette.mode == "replay"
+    if not replay and not request.config.getoption("--no-warm-up"):
+        try:
+            manager.warm_up()
+        except (OSError, Urllib3HTTPError) as e:
+            # Недоступный хост проявится в самих тестах понятной ошибкой запроса
+            manager.auth_api.logger.warning("Не удалось прогреть соединения: %s", e)
+    yield manager
+    connection_pool_stats.update(manager.pool_stats())
 
 
 @pytest.fixture(scope="session")
@@ -81,12 +318,7 @@ def authorized_api_manager(api_manager):
     Фикстура для создания авторизованной сессии через ApiManager.
     Возвращает настроенный ApiManager с установленным токеном авторизации.
     """
-    admin_credentials = {
-        "email": "api1@gmail.com",
-        "password": "asdqwe123Q"
-    }
-
-    api_manager.auth_api.authenticate(admin_credentials)
+    api_manager.auth_api.authenticate(ADMIN_CREDENTIALS)
     return api_manager
 
 
@@ -146,19 +378,54 @@ def base_url():
     """Возвращает базовый URL для API."""
     return "https://restful-booker.herokuapp.com"
 
+@pytest.fixture(scope="session")
+def movie_pool(request, session, authorized_api_manager):
+    """
+    Сессионный пул заранее созданных фильмов, общий для воркеров xdist.
+    Создаётся параллельно при первом обращении, удаляется пакетно последним воркером.
+    """
+    cassette_options = {}
+    if CustomRequester.cassette is not None:
+        # Пул не зависит от того, какой тест его создал - записи совпадают при воспроизведении
+        cassette_options = {"seed": zlib.crc32(b"movie_pool"),
+                            "ids": UniqueIdAllocator(f"{CustomRequester.cassette.run_id}:movie_pool", worker_id="")}
+    pool = MoviePool(
+        api_manager=ApiManager(session=session, pool_size=request.config.getoption("--pool-size")),
+        size=request.config.getoption("--movie-pool-size"),
+        **cassette_options
+    )
+    try:
+        pool.open()
+    except RuntimeError as e:
+        pytest.fail(str(e))
+    yield pool
+
+    replay = CustomRequester.cassette is not None and CustomRequester.cassette.mode == "replay"
+    failed = pool.close(delete=not replay)
+    if failed:
+        pool.api_manager.movies_api.logger.warning("Не удалось удалить фильмы пула (ID, статус): %s", failed)
+
+
+@pytest.fixture(scope="function")
+def shared_movie(request, movie_pool):
+    """
+    Фильм из общего пула только для чтения: тест не должен его менять или удалять.
+    """
+    return movie_pool.get(key=request.node.nodeid)
+
+
+@pytest.fixture(scope="function")
+def leased_movie(request, movie_pool, authorized_api_manager):
+    """
+    Собственная копия фильма из пула для теста, который его меняет или удаляет (clone-on-write).
+    Копия попадает в cleanup_registry и удаляется в конце сессии.
+    """
+    return movie_pool.clone(authorized_api_manager.movies_api, key=request.node.nodeid)
+
+
 @pytest.fixture(scope="function")
 def create_movie_data():
     """
     Генерация случайных данных для создания фильма.
     """
-    movie_data = {
-        "name": DataGenerator.generate_movie_title(),
-        "imageUrl": DataGenerator.generate_image_url(),
-        "price": DataGenerator.generate_price(),
-        "description": DataGenerator.generate_description(),
-        "location": DataGenerator.generate_location(),
-        "published": True,
-        "genreId": 1
-    }
-    return movie_data
-
+    return DataGenerator.generate_movie_data()
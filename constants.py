@@ -1,5 +1,10 @@
-BASE_URL = "https://auth.dev-cinescope.coconutqa.ru"
-MOVIES_BASE_URL = "https://api.dev-cinescope.coconutqa.ru"
+import os
+import tempfile
+from urllib.parse import urlsplit
+
+# Переопределяются через окружение, например для локального двойника: python -m stub_server
+BASE_URL = os.environ.get("CINESCOPE_BASE_URL", "https://auth.dev-cinescope.coconutqa.ru")
+MOVIES_BASE_URL = os.environ.get("CINESCOPE_MOVIES_BASE_URL", "https://api.dev-cinescope.coconutqa.ru")
 
 HEADERS = {
     "Content-Type": "application/json",
@@ -12,4 +17,56 @@ BOOKING_ENDPOINT = "/booking"
 AUTH_ENDPOINT = "/auth"
 MOVIES_ENDPOINT = "/movies" # получение афиши и создание фильма
 
+# Уровень логирования запросов (например, WARNING отключает форматирование INFO-логов)
+REQUEST_LOG_LEVEL = os.environ.get("CINESCOPE_LOG_LEVEL", "INFO").upper()
+
+ADMIN_CREDENTIALS = {
+    "email": "api1@gmail.com",
+    "password": "asdqwe123Q"
+}
+
+# Таймауты запросов (connect, read) в секундах; для эндпоинтов задаются по шаблону пути (см. endpoint_template)
+DEFAULT_TIMEOUT = (5, 30)
+ENDPOINT_TIMEOUTS = {
+    "/login": (5, 15),
+    "/register": (5, 15),
+    "/movies/{id}": (5, 15),
+}
+
+# Пул keep-alive соединений на каждый хост ApiManager: совпадает с числом потоков gather/batch по умолчанию
+CONNECTION_POOL_SIZE = 10
+
+# Хосты, запросы к которым идут через HTTP/2 (custom_requester.http2_adapter), через запятую:
+# CINESCOPE_HTTP2_HOSTS=https://api.dev-cinescope.coconutqa.ru
+HTTP2_HOSTS = tuple(host for host in os.environ.get("CINESCOPE_HTTP2_HOSTS", "").split(",") if host)
+
+# Кэш токенов авторизации, общий для воркеров pytest-xdist
+TOKEN_CACHE_PATH = os.path.join(tempfile.gettempdir(), "cinescope_token_cache.json")
+TOKEN_REFRESH_MARGIN = 60 # обновляем токен за минуту до истечения
+TOKEN_DEFAULT_TTL = 15 * 60 # срок жизни токена без поля exp
+
+# Пул заранее зарегистрированных пользователей
+# Отдельный файл на каждый auth-хост, чтобы пулы реального сервера и локального двойника не смешивались
+USER_POOL_PATH = os.path.join(
+    tempfile.gettempdir(), f"cinescope_user_pool_{urlsplit(BASE_URL).netloc.replace(':', '_')}.json"
+)
+USER_POOL_SIZE = 20
+USER_POOL_LEASE_TTL = 10 * 60 # аренда упавшего воркера освобождается через 10 минут
+
+# Пул заранее созданных фильмов для читающих тестов (файл на прогон: <путь>_<ID прогона>.json)
+MOVIE_POOL_PATH = os.path.join(
+    tempfile.gettempdir(), f"cinescope_movie_pool_{urlsplit(MOVIES_BASE_URL).netloc.replace(':', '_')}"
+)
+MOVIE_POOL_SIZE = 5
+
+# Кассета записи/воспроизведения запросов (pytest --cassette-mode=record|replay)
+CASSETTE_PATH = os.path.join("cassettes", "cinescope.jsonl")
+
+# Повторы запросов и размыкатель цепи
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.2 # секунды
+CIRCUIT_FAILURE_THRESHOLD = 5 # отказов подряд до размыкания
+CIRCUIT_RESET_TIMEOUT = 30 # секунды до пробного запроса
 
+# Общие для воркеров ограничители скорости (pytest --rate-limit base_url[/endpoint]=rps[:burst])
+RATE_LIMIT_STATE_DIR = os.path.join(tempfile.gettempdir(), "cinescope_rate_limits")
@@ -0,0 +1,140 @@
+import threading
+import time
+
+from requests import Request
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from constants import DEFAULT_TIMEOUT
+
+# Время установки последнего нового соединения в текущем потоке (DNS + TCP + TLS)
+_connect_timing = threading.local()
+
+
+def pop_connect_time():
+    """Возвращает время установки соединения для последнего запроса потока и сбрасывает его."""
+    value = getattr(_connect_timing, "value", 0.0)
+    _connect_timing.value = 0.0
+    return value
+
+
+class _TimedConnectionMixin:
+    # Колбэк пула, считающий новые соединения (назначается в _TimedPoolMixin._new_conn)
+    on_connect = None
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.value = time.perf_counter() - start
+        if self.on_connect is not None:
+            self.on_connect()
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedPoolMixin:
+    """Считает установленные пулом соединения (TCP + TLS), включая переподключения после обрыва keep-alive."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connects = 0
+        self._connects_lock = threading.Lock()
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.on_connect = self._count_connect
+        return conn
+
+    def _count_connect(self):
+        with self._connects_lock:
+            self.connects += 1
+
+
+class _TimedHTTPConnectionPool(_TimedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(_TimedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter, замеряющий время установки новых соединений.
+    Монтируется в сессию CustomRequester'ом (или ApiManager'ом с размером пула под конкурентность),
+    результат читается через pop_connect_time().
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.warmed = 0
+        self.warm_up_requests = 0
+        self._warm_up_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def warm_up(self, url, connections, verify=True):
+        """
+        Заранее устанавливает до connections соединений (TCP + TLS) с хостом url и кладёт их в пул.
+        Соединения открываются настоящими HEAD-запросами к url: ответы держатся открытыми, пока не отправлены
+        все запросы (иначе пул отдавал бы одно и то же соединение), и закрываются вместе - соединения
+        возвращаются в пул. HEAD прогрева не попадают в счётчик requests в stats().
+        :param verify: Параметр verify сессии - от него зависит, какой пул requests возьмёт для запросов.
+        :return: Число установленных соединений.
+        """
+        request = Request("HEAD", url).prepare()
+        # Тот же пул, что requests выберет для запросов к url (ключ пула включает параметры TLS)
+        pool = self.get_connection_with_tls_context(request, verify)
+        connects = pool.connects
+        responses = []
+        try:
+            # Больше размера пула не взять: при pool_block=True лишний запрос ждал бы соединение вечно
+            for _ in range(min(connections, self._pool_maxsize)):
+                responses.append(self.send(request, stream=True, timeout=DEFAULT_TIMEOUT, verify=verify))
+        finally:
+            for response in responses:
+                response.content # ответ прочитан целиком - requests возвращает соединение в пул, а не закрывает
+            pop_connect_time() # время прогрева не относится ни к одному запросу
+        opened = pool.connects - connects
+        with self._warm_up_lock:
+            self.warmed += opened
+            self.warm_up_requests += len(responses)
+        return opened
+
+    def stats(self):
+        """
+        Счётчики переиспользования соединений по всем пулам адаптера:
+        requests - отправлено запросов (без HEAD прогрева), new_connections - установлено соединений
+        (включая прогрев), warmed - из них при прогреве.
+        hits и misses - оценки, а не точный учёт по запросам: misses - соединения, открытые не при прогреве
+        (включая переподключения после обрыва keep-alive), hits - остальные запросы.
+        """
+        requests_sent = connects = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_sent += pool.num_requests
+            connects += getattr(pool, "connects", 0)
+        requests_sent = max(requests_sent - self.warm_up_requests, 0)
+        misses = max(connects - self.warmed, 0)
+        return {
+            "requests": requests_sent,
+            "new_connections": connects,
+            "warmed": self.warmed,
+            "misses": misses,
+            "hits": max(requests_sent - misses, 0),
+        }
@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+import logging
+import time
+
+import httpx
+import pytest
+import requests
+
+from constants import REQUEST_LOG_LEVEL
+from custom_requester.base_requester import PERFORM, SLEEP, BaseRequester
+from custom_requester.cached_response import CachedResponse
+from custom_requester.custom_requester import CustomRequester
+
+# Время соединения и первого байта текущей попытки: у каждой задачи asyncio свой контекст
+_attempt_timing = contextvars.ContextVar("attempt_timing", default=None)
+
+
+def _as_requests_error(error):
+    """Ошибка httpx в терминах requests - их понимают RetryPolicy и обработка ошибок send_request."""
+    if isinstance(error, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(error)
+    if isinstance(error, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(error)
+    if isinstance(error, httpx.TransportError):
+        return requests.exceptions.ConnectionError(error)
+    return requests.exceptions.RequestException(error)
+
+
+class _SharedSetting:
+    """Настройка, общая с CustomRequester: читается из его атрибута с тем же именем (в т.ч. подменённого в тесте)."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        return getattr(CustomRequester, self.name)
+
+
+class AsyncCustomRequester(BaseRequester):
+    """
+    Асинхронный аналог CustomRequester на базе httpx.AsyncClient.
+    Позволяет держать сотни запросов "в полёте" в одном event loop.
+    Настройки общие с CustomRequester: режим логирования, кассета, политика повторов, размыкатели цепи
+    по хостам, ограничитель скорости, таймауты и приёмники замеров.
+    """
+    base_headers = {
+        "Content-Type": "application/json",
+        "Accept": "application/json"
+    }
+    log_mode = _SharedSetting()
+    metrics_sinks = _SharedSetting()
+    cassette = _SharedSetting()
+    retry_policy = _SharedSetting()
+    circuit_breaker_enabled = _SharedSetting()
+    circuit_breakers = _SharedSetting()
+    rate_limiter = _SharedSetting()
+    default_timeout = _SharedSetting()
+    endpoint_timeouts = _SharedSetting()
+
+    def __init__(self, client, base_url):
+        self.client = client
+        self.base_url = base_url
+        self.headers = self.base_headers.copy()
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(REQUEST_LOG_LEVEL)
+
+    def _default_headers(self):
+        return self.client.headers
+
+    @staticmethod
+    def _request_body(request):
+        return request.content
+
+    def _attempt_timings(self, response):
+        timing = _attempt_timing.get() or {}
+        _attempt_timing.set(None)
+        return timing.get("connect", 0.0), timing.get("ttfb", 0.0)
+
+    async def send_request(self, method, endpoint, json=None, data=None, expected_status=None, need_logging=True,
+                           headers=None, params=None):
+        """
+        Универсальный асинхронный метод для отправки запросов.
+        Контракт совпадает с CustomRequester.send_request, включая повторы, размыкатель цепи и ограничитель скорости.
+        :param method: HTTP метод (GET, POST, PUT, DELETE и т.д.).
+        :param endpoint: Эндпоинт (например, "/login").
+        :param json: Тело запроса (JSON-данные).
+        :param data: Сырое тело запроса или данные формы.
+        :param expected_status: Ожидаемый статус-код (None - не проверять).
+        :param need_logging: Флаг для логирования (по умолчанию True).
+        :param headers: Дополнительные заголовки для этого запроса.
+        :param params: Query-параметры.
+        :return: CachedResponse поверх httpx.Response.
+        """
+        url = f"{self.base_url}{endpoint}"
+        try:
+            log_full = self._log_request(method, url, json, data, headers, params, need_logging)
+            response_obj = await self._send_with_retries(method, url, endpoint, json, data, headers, params,
+                                                         expected_status)
+            return self._check_response(response_obj, method, url, expected_status, need_logging, log_full)
+
+        except requests.exceptions.Timeout as e:
+            pytest.fail(f"Таймаут запроса к {method} {url}: {e}")
+        except requests.exceptions.RequestException as e:
+            pytest.fail(f"Ошибка сети при запросе к {method} {url}: {e}")
+
+    async def _send_with_retries(self, method, url, endpoint, json, data, headers, params, expected_status):
+        """
+        Выполняет шаги BaseRequester._attempts: попытки через httpx, паузы не блокируют event loop.
+        Ошибки httpx передаются политике как ошибки requests.
+        """
+        steps = self._attempts(method, url, endpoint, expected_status)
+        result = error = None
+        while True:
+            try:
+                step, argument = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            result = error = None
+            try:
+                if step == PERFORM:
+                    result = await self._perform_request(method, url, endpoint, json, data, headers, params,
+                                                         argument)
+                elif step == SLEEP:
+                    await asyncio.sleep(argument)
+                else:
+                    # Ведро под файловой блокировкой ждёт токен во сне - в отдельном потоке (с тем же deadline)
+                    await asyncio.to_thread(self.rate_limiter.acquire, *argument)
+            except httpx.RequestError as e:
+                error = _as_requests_error(e)
+            except BaseException as e: # исход шага решает политика: повторить попытку или пробросить
+                error = e
+
+    @staticmethod
+    def _body_kwargs(data):
+        # httpx разделяет сырое тело (content) и данные формы (data)
+        return {"content": data} if isinstance(data, (str, bytes)) else {"data": data}
+
+    async def _perform_request(self, method, url, endpoint, json, data, headers, params, timeout):
+        """Одна попытка запроса: из кассеты при воспроизведении, иначе по сети (с записью в кассету)."""
+        timing = {}
+        _attempt_timing.set(timing)
+        if self.cassette is not None and self.cassette.mode == "replay":
+            return self._replay(method, url, endpoint, json, data, headers, params)
+        start = time.perf_counter()
+
+        async def trace(event_name, info):
+            # Трассировка httpcore: установка соединения (TCP + TLS) и получение заголовков ответа (HTTP/1.1 и HTTP/2)
+            if event_name == "connection.connect_tcp.started":
+                timing["connect_start"] = time.perf_counter()
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                timing["connect"] = time.perf_counter() - timing["connect_start"]
+            elif event_name.endswith(".receive_response_headers.complete"):
+                timing["ttfb"] = time.perf_counter() - start
+
+        connect, read = timeout
+        response = CachedResponse(await self.client.request(
+            method=method,
+            url=url,
+            json=json,
+            params=params,
+            headers=headers,
+            timeout=httpx.Timeout(read, connect=connect),
+            extensions={"trace": trace},
+            **self._body_kwargs(data)
+        ))
+        if self.cassette is not None:
+            self.cassette.record(method, endpoint, params, json, data, response)
+        return response
+
+    def _replay(self, method, url, endpoint, json, data, headers, params):
+        """Отдаёт ответ из кассеты без обращения к сети."""
+        entry = self.cassette.find(method, endpoint, params, json, data)
+        if entry is None:
+            pytest.fail(f"В кассете {self.cassette.path} нет записи для {method} {url}")
+        request = self.client.build_request(method, entry["url"], json=json, headers=headers,
+                                            **self._body_kwargs(data))
+        return CachedResponse(httpx.Response(
+            status_code=entry["status_code"],
+            headers=entry["headers"],
+            content=entry["body"].encode("utf-8"),
+            request=request
+        ))
+
+    def _update_session_headers(self, **kwargs):
+        """
+        Обновляет заголовки клиента, к которому принадлежит этот requester.
+        """
+        self.client.headers.update(kwargs)
+        self.logger.info("Обновлены заголовки клиента: %s", kwargs)
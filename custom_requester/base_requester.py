@@ -0,0 +1,209 @@
+import json
+import logging
+import threading
+import time
+
+import pytest
+import requests
+
+from constants import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT
+from custom_requester.deadline import DeadlineExceeded, bounded_timeout, remaining
+from custom_requester.metrics import RequestMetrics, endpoint_template
+from custom_requester.request_log_buffer import request_log_buffer
+from custom_requester.resilience import CircuitBreaker, CircuitOpenError
+
+# Шаги отправки запроса, которые выполняет транспорт (см. BaseRequester._attempts)
+ACQUIRE = "acquire" # дождаться токена ограничителя скорости
+PERFORM = "perform" # одна попытка запроса
+SLEEP = "sleep" # пауза перед повтором
+
+_circuit_breakers_lock = threading.Lock()
+
+
+class BaseRequester:
+    """
+    Общая часть CustomRequester и AsyncCustomRequester, не зависящая от транспорта: логирование,
+    ограничитель скорости, бюджет времени, размыкатель цепи хоста, повторы, замеры и проверка статуса.
+    Наследник задаёт настройки (log_mode, metrics_sinks, cassette, retry_policy, circuit_breaker_enabled,
+    circuit_breakers, rate_limiter, default_timeout, endpoint_timeouts) и выполняет шаги _attempts():
+    одну попытку запроса и паузы.
+    """
+
+    def _default_headers(self):
+        """Заголовки, которые транспорт добавит к каждому запросу (сессии requests или клиента httpx)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _request_body(request):
+        """Тело отправленного запроса (requests.PreparedRequest или httpx.Request)."""
+        raise NotImplementedError
+
+    def _attempt_timings(self, response):
+        """Время установки соединения и до первого байта ответа последней попытки, секунды."""
+        raise NotImplementedError
+
+    def _circuit_breaker(self):
+        """Размыкатель цепи хоста base_url (общий для всех requester'ов процесса)."""
+        breaker = self.circuit_breakers.get(self.base_url)
+        if breaker is None:
+            with _circuit_breakers_lock:
+                breaker = self.circuit_breakers.setdefault(
+                    self.base_url, CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+                )
+        return breaker
+
+    def _timeout(self, endpoint):
+        """Таймаут (connect, read) для эндпоинта с учётом бюджета времени текущего теста или сценария."""
+        return bounded_timeout(self.endpoint_timeouts.get(endpoint_template(endpoint), self.default_timeout))
+
+    @staticmethod
+    def _fits_deadline(delay):
+        """Успеет ли повтор после паузы delay уложиться в бюджет времени."""
+        left = remaining()
+        return left is None or delay < left
+
+    def _record_metrics(self, method, endpoint, start, response=None, error=None, attempt=1):
+        """Собирает RequestMetrics и передаёт во все приёмники. Без приёмников ничего не делает."""
+        if not self.metrics_sinks:
+            return
+        connect, ttfb = self._attempt_timings(response)
+        metrics = RequestMetrics(
+            method=method,
+            host=self.base_url,
+            endpoint=endpoint_template(endpoint),
+            total=time.perf_counter() - start,
+            ttfb=ttfb,
+            connect=connect,
+            error=None if error is None else f"{type(error).__name__}: {error}",
+            attempt=attempt
+        )
+        if response is not None:
+            body = self._request_body(response.request)
+            metrics.status_code = response.status_code
+            metrics.request_bytes = len(body) if body else 0
+            metrics.response_bytes = len(response.content)
+        for sink in self.metrics_sinks:
+            sink(metrics)
+
+    def _attempts(self, method, url, endpoint, expected_status):
+        """
+        Политика отправки запроса - генератор шагов (шаг, аргумент), которые выполняет транспорт:
+        (ACQUIRE, (base_url, шаблон эндпоинта)) - дождаться токена ограничителя скорости;
+        (PERFORM, timeout) - одна попытка запроса, в генератор передаётся ответ (send) или исключение (throw);
+        (SLEEP, delay) - пауза перед повтором.
+        Итоговый ответ - значение StopIteration. Каждая попытка попадает в замеры отдельно (с номером attempt).
+        Ответ со статусом, равным expected_status, не повторяется.
+        """
+        policy = self.retry_policy
+        breaker = self._circuit_breaker() if self.circuit_breaker_enabled else None
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None and (self.cassette is None or self.cassette.mode != "replay"):
+                yield ACQUIRE, (self.base_url, endpoint_template(endpoint))
+
+            start = time.perf_counter()
+            try:
+                # Бюджет проверяется до размыкателя: исчерпанный deadline не должен занимать пробный запрос
+                timeout = self._timeout(endpoint)
+            except DeadlineExceeded as e:
+                self._record_metrics(method, endpoint, start, error=e, attempt=attempt)
+                raise
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpenError(f"Цепь для {self.base_url} разомкнута после серии отказов, запрос не отправлен")
+
+            settled = False # исход попытки передан размыкателю
+            try:
+                response = yield PERFORM, timeout
+            except requests.exceptions.RequestException as e:
+                self._record_metrics(method, endpoint, start, error=e, attempt=attempt)
+                if breaker is not None:
+                    breaker.record_failure()
+                settled = True
+                if policy is None or not policy.should_retry_error(method, e, attempt):
+                    raise
+                delay = policy.delay(attempt)
+                if not self._fits_deadline(delay):
+                    raise
+                self.logger.warning("Повтор %s %s через %.2f с после ошибки: %s", method, url, delay, e)
+                yield SLEEP, delay
+                continue
+            else:
+                self._record_metrics(method, endpoint, start, response=response, attempt=attempt)
+                if breaker is not None:
+                    breaker.record_status(response.status_code)
+                settled = True
+            finally:
+                # Любое другое исключение (pytest.fail при промахе кассеты и т.п.) не должно навсегда занять пробу
+                if breaker is not None and not settled:
+                    breaker.release()
+
+            if (policy is None or response.status_code == expected_status
+                    or not policy.should_retry_status(method, response.status_code, attempt)):
+                return response
+            delay = policy.delay(attempt, response)
+            if not self._fits_deadline(delay):
+                return response
+            self.logger.warning("Повтор %s %s через %.2f с после статуса %s", method, url, delay,
+                                response.status_code)
+            yield SLEEP, delay
+
+    def _log_request(self, method, url, json, data, headers, params, need_logging):
+        """
+        Логирует запрос перед отправкой, если нужен полный лог.
+        :return: Нужно ли после ответа залогировать и его (режим "full" и включён уровень INFO).
+        """
+        log_full = need_logging and self.log_mode == "full" and self.logger.isEnabledFor(logging.INFO)
+        if log_full:
+            self.logger.info("Запрос: %s %s", method, url)
+            self.logger.info("  Заголовки: %s", {**self._default_headers(), **(headers or {})})
+            if json: self.logger.info("  JSON: %s", json)
+            if params: self.logger.info("  Параметры: %s", params)
+            elif data: self.logger.info("  Data: %s", data)
+        return log_full
+
+    def _check_response(self, response_obj, method, url, expected_status, need_logging, log_full):
+        """Сохраняет ответ в буфер лога, проверяет ожидаемый статус и логирует ответ."""
+        if need_logging and self.log_mode == "on_failure":
+            request_log_buffer.append(response_obj)
+
+        # --- Проверка ожидаемого статуса ---
+        # Если expected_status указан, и он не совпадает, вызываем pytest.fail.
+        # Это гарантирует, что мы работаем с объектом response_obj, если тест не упал.
+        if expected_status is not None:
+            if response_obj.status_code != expected_status:
+                error_message = f"Запрос к {method} {url} вернул статус {response_obj.status_code}, ожидался {expected_status}. Ответ: {response_obj.text}"
+                self.logger.error(error_message)
+                pytest.fail(error_message)
+
+        # Логирование (если нужно)
+        if log_full:
+            self.log_request_and_response(response_obj)
+
+        # --- ВСЕГДА возвращаем объект Response, если не вызван pytest.fail ---
+        return response_obj
+
+    def log_request_and_response(self, response):
+        """Логирует информацию о запросе и ответе. Ничего не форматирует, если уровень INFO выключен."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info("Request: %s %s", response.request.method, response.request.url)
+        self.logger.info("Request Headers: %s", response.request.headers)
+        body = self._request_body(response.request)
+        if body:
+            self.logger.info("Request Body: %s", body)
+        self.logger.info("Response Status: %s", response.status_code)
+        self.logger.info("Response Headers: %s", response.headers)
+
+        try:
+            # Если ответ содержит JSON, логируем его
+            if response.content:
+                self.logger.info("Response Body (JSON): %s", response.json())
+            else:
+                self.logger.info("Response Body: (пусто)")
+        except json.JSONDecodeError:
+            # Если не удалось распарсить JSON, логируем как обычный текст
+            self.logger.info("Response Body (Text): %s", response.text)
+        except Exception as e:
+            # Для перехвата любых других неожиданных ошибок при логировании
+            self.logger.error("Ошибка при попытке логировать тело ответа: %s. Тело: %s", e, response.text)
@@ -0,0 +1,53 @@
+import json
+
+import requests
+
+try:
+    import orjson
+except ImportError: # orjson не установлен - используем стандартный json
+    orjson = None
+
+
+def json_loads(content):
+    """Декодирует JSON из bytes/str самым быстрым доступным бэкендом."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class CachedResponse:
+    """
+    Тонкая обёртка над объектом ответа (requests.Response или httpx.Response).
+    Тело декодируется из JSON один раз при первом вызове json(), дальше логирование
+    и проверки в тесте работают с одним и тем же объектом.
+    Все остальные атрибуты (status_code, text, headers, request, ...) берутся из исходного ответа.
+    """
+    __slots__ = ("response", "_json", "_json_loaded")
+
+    def __init__(self, response):
+        self.response = response
+        self._json = None
+        self._json_loaded = False
+
+    def json(self):
+        """
+        Возвращает декодированное тело ответа (кэшируется).
+        Ошибка декодирования - requests.exceptions.JSONDecodeError, как и у requests.Response.json().
+        Внимание: возвращается один и тот же объект, изменения в нём видны всем потребителям.
+        """
+        if not self._json_loaded:
+            try:
+                self._json = json_loads(self.response.content)
+            except json.JSONDecodeError as e: # orjson.JSONDecodeError - его подкласс
+                raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+            self._json_loaded = True
+        return self._json
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __bool__(self):
+        return bool(self.response)
+
+    def __repr__(self):
+        return f"<CachedResponse {self.response!r}>"
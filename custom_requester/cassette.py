@@ -0,0 +1,162 @@
+import glob
+import hashlib
+import json
+import os
+import secrets
+import threading
+from collections import deque
+from datetime import timedelta
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from custom_requester.metrics import endpoint_template
+
+
+def build_response(method, url, status_code, headers, content, request_headers=None, request_body=None,
+                   elapsed=0.0):
+    """
+    Собирает requests.Response из готовых данных (для ответов, полученных не через requests.Session),
+    чтобы проверки статуса, логирование и CachedResponse работали как с настоящим ответом.
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.encoding = "utf-8"
+    response.url = url
+    response.elapsed = timedelta(seconds=elapsed)
+    try:
+        response.reason = HTTPStatus(status_code).phrase
+    except ValueError:
+        response.reason = ""
+    request = requests.PreparedRequest()
+    request.method = method
+    request.url = url
+    request.headers = CaseInsensitiveDict(request_headers or {})
+    request.body = request_body
+    response.request = request
+    return response
+
+
+class Cassette:
+    """
+    Хранилище записанных пар запрос/ответ (JSONL) для режимов record и replay.
+
+    Запрос нормализуется до ключа (метод, шаблон эндпоинта, хэш тела), где хэш считается от
+    конкретного пути, отсортированных query-параметров и канонического JSON тела.
+    При воспроизведении сначала ищется точное совпадение хэша, затем - следующая по порядку
+    ещё не использованная запись того же метода и шаблона (для тел со случайными данными).
+    Первая строка файла - ID записи (run_id): по нему тесты воспроизводят те же уникальные ID, что при записи.
+    """
+
+    def __init__(self, path, mode):
+        """
+        :param path: Путь к файлу кассеты. Под xdist при записи каждый воркер пишет свой файл
+                     <path без .jsonl>.<worker>.jsonl, при воспроизведении читаются все такие файлы.
+        :param mode: "record" или "replay".
+        """
+        self.mode = mode
+        self._lock = threading.Lock()
+        stem = path[:-len(".jsonl")] if path.endswith(".jsonl") else path
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        if mode == "record":
+            # Общий для воркеров одной записи
+            self.run_id = os.environ.get("PYTEST_XDIST_TESTRUNUID") or secrets.token_hex(16)
+            self.path = f"{stem}.{worker}.jsonl" if worker else f"{stem}.jsonl"
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(json.dumps({"run_id": self.run_id}) + "\n")
+        else:
+            self.run_id = ""
+            self.path = path
+            self._file = None
+            self._exact = {}
+            self._sequence = {}
+            for file_path in sorted(glob.glob(f"{stem}*.jsonl")):
+                with open(file_path, encoding="utf-8") as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+                # Файл без записей (например, от master-процесса xdist) не задаёт run_id
+                if len(entries) > 1 and "run_id" in entries[0]:
+                    self.run_id = entries[0]["run_id"]
+                for entry in entries:
+                    if "run_id" not in entry:
+                        self._index(entry)
+
+    @staticmethod
+    def normalize(method, endpoint, params=None, json_body=None, data=None):
+        """Возвращает (метод, шаблон эндпоинта, хэш тела) для запроса."""
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        if json_body is not None:
+            body = json.dumps(json_body, sort_keys=True, ensure_ascii=False)
+        else:
+            body = data.decode("utf-8", "replace") if isinstance(data, bytes) else str(data or "")
+        digest = hashlib.sha1(f"{endpoint}?{query}\n{body}".encode("utf-8")).hexdigest()
+        return method.upper(), endpoint_template(endpoint), digest
+
+    def _index(self, entry):
+        entry["used"] = False
+        route = (entry["method"], entry["endpoint"])
+        self._exact.setdefault((*route, entry["body_hash"]), deque()).append(entry)
+        self._sequence.setdefault(route, deque()).append(entry)
+
+    def record(self, method, endpoint, params, json_body, data, response):
+        method, template, body_hash = self.normalize(method, endpoint, params, json_body, data)
+        entry = {
+            "method": method,
+            "endpoint": template,
+            "body_hash": body_hash,
+            "url": str(response.url),
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "body": response.content.decode("utf-8", "replace"),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    @staticmethod
+    def _pop_unused(queue):
+        while queue:
+            entry = queue.popleft()
+            if not entry["used"]:
+                entry["used"] = True
+                return entry
+        return None
+
+    def find(self, method, endpoint, params, json_body, data):
+        """
+        Возвращает следующую подходящую запись (словарь с url, status_code, headers, body) и помечает
+        её использованной, или None, если подходящей записи нет.
+        """
+        method, template, body_hash = self.normalize(method, endpoint, params, json_body, data)
+        with self._lock:
+            entry = self._pop_unused(self._exact.get((method, template, body_hash), deque()))
+            if entry is None:
+                entry = self._pop_unused(self._sequence.get((method, template), deque()))
+        return entry
+
+    def play(self, method, endpoint, params, json_body, data, request_headers=None):
+        """
+        Возвращает записанный ответ в виде requests.Response или None, если подходящей записи нет.
+        """
+        entry = self.find(method, endpoint, params, json_body, data)
+        if entry is None:
+            return None
+        request_body = json.dumps(json_body).encode("utf-8") if json_body is not None else data
+        return build_response(
+            method=method.upper(),
+            url=entry["url"],
+            status_code=entry["status_code"],
+            headers=entry["headers"],
+            content=entry["body"].encode("utf-8"),
+            request_headers=request_headers,
+            request_body=request_body,
+        )
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
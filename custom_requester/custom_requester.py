@@ -1,13 +1,17 @@
-import json
 import logging
-import os
+import time
 
 import pytest
 import requests
-import logging  # <-- Импортируем logging
-import json  # <-- Если используете json=, лучше импортировать
 
-class CustomRequester:
+from constants import DEFAULT_TIMEOUT, ENDPOINT_TIMEOUTS, REQUEST_LOG_LEVEL, RETRY_BACKOFF_BASE, RETRY_MAX_ATTEMPTS
+from custom_requester.adapters import TimingHTTPAdapter, pop_connect_time
+from custom_requester.base_requester import PERFORM, SLEEP, BaseRequester
+from custom_requester.cached_response import CachedResponse
+from custom_requester.http2_adapter import HTTP2Adapter
+from custom_requester.resilience import RetryPolicy
+
+class CustomRequester(BaseRequester):
     """
     Кастомный реквестер для стандартизации и упрощения отправки HTTP-запросов.
     """
@@ -15,76 +19,54 @@ class CustomRequester:
         "Content-Type": "application/json",
         "Accept": "application/json"
     }
+    # "full" - логировать каждый запрос, "on_failure" - копить в кольцевом буфере и выводить только для упавших тестов
+    log_mode = "full"
+    # Приёмники замеров запросов: вызываемые объекты, принимающие RequestMetrics
+    metrics_sinks = []
+    # Кассета для записи/воспроизведения запросов (custom_requester.cassette.Cassette), None - выключено
+    cassette = None
+    # Политика повторов (None - без повторов) и размыкатели цепи по хостам
+    retry_policy = RetryPolicy(max_attempts=RETRY_MAX_ATTEMPTS, backoff_base=RETRY_BACKOFF_BASE)
+    circuit_breaker_enabled = True
+    circuit_breakers = {}
+    # Ограничитель скорости (custom_requester.rate_limiter.RateLimiter), None - без ограничений
+    rate_limiter = None
+    # Таймауты (connect, read) по шаблонам эндпоинтов; бюджет deadline() ужимает их до оставшегося времени
+    default_timeout = DEFAULT_TIMEOUT
+    endpoint_timeouts = ENDPOINT_TIMEOUTS
 
     def __init__(self, session, base_url):
         self.session = session
         self.base_url = base_url
         self.headers = self.base_headers.copy()
         self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.INFO)
-
-    def send_request(self, method, endpoint, data=None, expected_status=200, need_logging=True):
-        """
-        Универсальный метод для отправки запросов.
-        :param method: HTTP метод (GET, POST, PUT, DELETE и т.д.).
-        :param endpoint: Эндпоинт (например, "/login").
-        :param data: Тело запроса (JSON-данные).
-        :param expected_status: Ожидаемый статус-код (по умолчанию 200).
-        :param need_logging: Флаг для логирования (по умолчанию True).
-        :return: Объект ответа requests.Response.
-        """
-        url = f"{self.base_url}{endpoint}"
-        response = self.session.request(method, url, json=data, headers=self.headers)
-        if need_logging:
-            self.log_request_and_response(response)
-        if response.status_code != expected_status:
-            raise ValueError(f"Unexpected status code: {response.status_code}. Expected: {expected_status}")
-        return response
-
-    def log_request_and_response(self, response):
-        try:
-            request = response.request
-            GREEN = '\033[32m'
-            RED = '\033[31m'
-            RESET = '\033[0m'
-            headers = " \\\n".join([f"-H '{header}: {value}'" for header, value in request.headers.items()])
-            full_test_name = f"pytest {os.environ.get('PYTEST_CURRENT_TEST', '').replace(' (call)', '')}"
-
-            body = ""
-            if hasattr(request, 'body') and request.body is not None:
-                if isinstance(request.body, bytes):
-                    body = request.body.decode('utf-8')
-                body = f"-d '{body}' \n" if body != '{}' else ''
-
-            self.logger.info(f"\n{'=' * 40} REQUEST {'=' * 40}")
-            self.logger.info(
-                f"{GREEN}{full_test_name}{RESET}\n"
-                f"curl -X {request.method} '{request.url}' \\\n"
-                f"{headers} \\\n"
-                f"{body}"
-            )
-
-            response_data = response.text
-            try:
-                response_data = json.dumps(json.loads(response.text), indent=4, ensure_ascii=False)
-            except json.JSONDecodeError:
-                pass
-
-            self.logger.info(f"\n{'=' * 40} RESPONSE {'=' * 40}")
-            if not response.ok:
-                self.logger.info(
-                    f"\tSTATUS_CODE: {RED}{response.status_code}{RESET}\n"
-                    f"\tDATA: {RED}{response_data}{RESET}"
-                )
-            else:
-                self.logger.info(
-                    f"\tSTATUS_CODE: {GREEN}{response.status_code}{RESET}\n"
-                    f"\tDATA:\n{response_data}"
-                )
-            self.logger.info(f"{'=' * 80}\n")
-        except Exception as e:
-            self.logger.error(f"\nLogging failed: {type(e)} - {e}")
-
+        self.logger.setLevel(REQUEST_LOG_LEVEL)
+        # Адаптер с замером времени установки соединений (общий для всех requester'ов одного хоста),
+        # если ApiManager ещё не смонтировал для хоста свой (в т.ч. HTTP/2)
+        if hasattr(self.session, "mount") and not isinstance(self.session.get_adapter(base_url),
+                                                             (TimingHTTPAdapter, HTTP2Adapter)):
+            self.session.mount(base_url, TimingHTTPAdapter())
+
+    @classmethod
+    def add_metrics_sink(cls, sink):
+        """Подключает приёмник замеров (например, InMemoryHistogramSink или JsonlFileSink)."""
+        cls.metrics_sinks.append(sink)
+
+    @classmethod
+    def remove_metrics_sink(cls, sink):
+        if sink in cls.metrics_sinks:
+            cls.metrics_sinks.remove(sink)
+
+    def _default_headers(self):
+        return self.session.headers
+
+    @staticmethod
+    def _request_body(request):
+        return request.body
+
+    def _attempt_timings(self, response):
+        # Соединение замеряет адаптер (TimingHTTPAdapter, HTTP2Adapter), elapsed requests - до заголовков ответа
+        return pop_connect_time(), response.elapsed.total_seconds() if response is not None else 0.0
 
     def _update_session_headers(self, **kwargs): # **kwargs содержит {'authorization': 'Bearer token'}
         """
@@ -94,75 +76,80 @@ class CustomRequester:
         if hasattr(self.session, 'headers'):
             # Просто добавляем новые заголовки из kwargs
             self.session.headers.update(kwargs)
-            self.logger.info(f"Обновлены заголовки сессии: {kwargs}")
+            self.logger.info("Обновлены заголовки сессии: %s", kwargs)
         else:
             self.logger.warning("Объект сессии не имеет атрибута 'headers'. Заголовки не обновлены.")
 
-    def log_request_and_response(self, response):
-        """Логирует информацию о запросе и ответе."""
-        self.logger.info(f"Request: {response.request.method} {response.request.url}")
-        self.logger.info(f"Request Headers: {response.request.headers}")
-        if response.request.body:
-            self.logger.info(f"Request Body: {response.request.body}")
-        self.logger.info(f"Response Status: {response.status_code}")
-        self.logger.info(f"Response Headers: {response.headers}")
+    def _perform_request(self, method, url, endpoint, json, data, headers, params, timeout):
+        """Одна попытка запроса: из кассеты при воспроизведении, иначе по сети (с записью в кассету)."""
+        if self.cassette is not None and self.cassette.mode == "replay":
+            return self._replay(method, url, endpoint, json, data, headers, params)
+        response = CachedResponse(self.session.request(
+            method=method,
+            url=url,
+            json=json,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=timeout
+        ))
+        if self.cassette is not None:
+            self.cassette.record(method, endpoint, params, json, data, response)
+        return response
 
-        # --- ИСПРАВЛЕНИЕ ЗДЕСЬ ---
-        try:
-            # Если ответ содержит JSON, логируем его
-            if response.content and len(response.content) > 0:  # Проверяем, есть ли вообще контент
-                self.logger.info(f"Response Body (JSON): {response.json()}")
-            else:
-                self.logger.info("Response Body: (пусто)")
-        except json.JSONDecodeError:
-            # Если не удалось распарсить JSON, логируем как обычный текст
-            self.logger.info(f"Response Body (Text): {response.text}")
-        except Exception as e:
-            # Для перехвата любых других неожиданных ошибок при логировании
-            self.logger.error(f"Ошибка при попытке логировать тело ответа: {e}. Тело: {response.text}")
+    def _send_with_retries(self, method, url, endpoint, json, data, headers, params, expected_status):
+        """Выполняет шаги BaseRequester._attempts: попытки через сессию requests, паузы - во сне потока."""
+        steps = self._attempts(method, url, endpoint, expected_status)
+        result = error = None
+        while True:
+            try:
+                step, argument = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            result = error = None
+            try:
+                if step == PERFORM:
+                    pop_connect_time()
+                    result = self._perform_request(method, url, endpoint, json, data, headers, params, argument)
+                elif step == SLEEP:
+                    time.sleep(argument)
+                else:
+                    self.rate_limiter.acquire(*argument)
+            except BaseException as e: # исход шага решает политика: повторить попытку или пробросить
+                error = e
+
+    def _replay(self, method, url, endpoint, json, data, headers, params):
+        """Отдаёт ответ из кассеты без обращения к сети."""
+        response = self.cassette.play(method, endpoint, params, json, data,
+                                      request_headers={**self.session.headers, **(headers or {})})
+        if response is None:
+            pytest.fail(f"В кассете {self.cassette.path} нет записи для {method} {url}")
+        return CachedResponse(response)
 
-    # Исправленный метод send_request
     def send_request(self, method, endpoint, json=None, data=None, expected_status=None, need_logging=True,
                      headers=None, params=None):
+        """
+        Универсальный метод для отправки запросов.
+        :param method: HTTP метод (GET, POST, PUT, DELETE и т.д.).
+        :param endpoint: Эндпоинт (например, "/login").
+        :param json: Тело запроса (JSON-данные).
+        :param data: Сырое тело запроса или данные формы.
+        :param expected_status: Ожидаемый статус-код (None - не проверять).
+        :param need_logging: Флаг для логирования (по умолчанию True).
+        :param headers: Дополнительные заголовки (заголовки сессии requests подставит сам).
+        :param params: Query-параметры.
+        :return: CachedResponse поверх requests.Response.
+        """
         url = f"{self.base_url}{endpoint}"
         try:
-            current_headers = self.session.headers.copy()
-            if headers:
-                current_headers.update(headers)
-
-            if need_logging:
-                self.logger.info(f"Запрос: {method} {url}")
-                self.logger.info(f"  Заголовки: {current_headers}")
-                if json: self.logger.info(f"  JSON: {json}")
-                if params: self.logger.info(f"  Параметры: {params}")
-                elif data: self.logger.info(f"  Data: {data}")
-
-            response_obj = self.session.request(
-                method=method,
-                url=url,
-                json=json,
-                data=data,
-                headers=current_headers
-            )
-
-            # --- Проверка ожидаемого статуса ---
-            # Если expected_status указан, и он не совпадает, вызываем pytest.fail.
-            # Это гарантирует, что мы работаем с объектом response_obj, если тест не упал.
-            if expected_status is not None:
-                if response_obj.status_code != expected_status:
-                    error_message = f"Запрос к {method} {url} вернул статус {response_obj.status_code}, ожидался {expected_status}. Ответ: {response_obj.text}"
-                    self.logger.error(error_message)
-                    pytest.fail(error_message)
-
-            # Логирование (если нужно)
-            if need_logging:
-                self.log_request_and_response(response_obj)
-
-            # --- ВСЕГДА возвращаем объект Response, если не вызван pytest.fail ---
-            return response_obj
+            log_full = self._log_request(method, url, json, data, headers, params, need_logging)
+            response_obj = self._send_with_retries(method, url, endpoint, json, data, headers, params,
+                                                   expected_status)
+            return self._check_response(response_obj, method, url, expected_status, need_logging, log_full)
 
+        except requests.exceptions.Timeout as e:
+            pytest.fail(f"Таймаут запроса к {method} {url}: {e}")
         except requests.exceptions.RequestException as e:
             pytest.fail(f"Ошибка сети при запросе к {method} {url}: {e}")
         except AssertionError as e:
             pytest.fail(f"Ошибка проверки статуса: {e}")
-
@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import requests
+
+# Момент (time.monotonic()), к которому должна закончиться текущая операция; None - без бюджета
+_deadline = ContextVar("cinescope_deadline", default=None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Бюджет времени теста или сценария исчерпан до отправки запроса."""
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Ограничивает общее время всех запросов внутри блока:
+
+        with deadline(5):
+            api_manager.movies_api.create_movie(...)
+            api_manager.movies_api.get_movie_by_id(...)
+
+    Каждый запрос получает таймаут не больше оставшегося времени. Вложенный бюджет не может продлить внешний.
+    Бюджет хранится в contextvars: в потоки ThreadPoolExecutor его нужно передавать через contextvars.copy_context().
+    :param seconds: Бюджет в секундах; None - блок без ограничения.
+    """
+    if seconds is None:
+        yield
+        return
+    until = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Оставшееся время бюджета в секундах или None, если бюджета нет."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+def bounded_timeout(timeout):
+    """
+    Ужимает таймаут запроса (connect, read) до оставшегося бюджета.
+    :raises DeadlineExceeded: Если бюджет уже исчерпан.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded(f"Бюджет времени исчерпан {-left:.2f} с назад")
+    connect, read = timeout
+    return min(connect, left), min(read, left)
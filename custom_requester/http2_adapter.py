@@ -0,0 +1,169 @@
+import os
+import ssl
+import threading
+import time
+from email.message import Message
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+
+from custom_requester.adapters import _connect_timing
+from custom_requester.cassette import build_response
+
+# Заголовки уровня соединения HTTP/1.1, запрещённые в HTTP/2 (requests добавляет Connection: keep-alive)
+_HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+
+class _OriginalResponse:
+    def __init__(self, msg):
+        self.msg = msg
+
+
+class _RawResponse:
+    """
+    Минимальная замена urllib3-ответа в response.raw: requests достаёт из него cookies (Set-Cookie)
+    и закрывает его при редиректах.
+    """
+
+    def __init__(self, headers):
+        message = Message()
+        for name, value in headers.multi_items():
+            message[name] = value
+        self._original_response = _OriginalResponse(message)
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Транспорт requests поверх httpx.Client(http2=True): параллельные запросы к хосту идут потоками
+    одного соединения вместо отдельного TCP+TLS соединения на каждый запрос.
+    Монтируется в сессию вместо TimingHTTPAdapter (см. ApiManager.http2_hosts). Всё, что выше транспорта, -
+    заголовки и cookies сессии, проверки статуса, логирование, повторы, замеры, кассета - работает как раньше.
+    HTTP/2 согласуется через ALPN, поэтому по http:// и с серверами без HTTP/2 запросы идут по HTTP/1.1.
+    """
+
+    def __init__(self, max_connections=10, verify=True):
+        """
+        :param max_connections: Максимум соединений с хостом (при HTTP/2 обычно хватает одного).
+        :param verify: Проверка TLS-сертификата: True, False или путь к CA-бандлу (verify сессии с учётом
+                       окружения). Задаётся при создании клиента; запрос с другим verify отклоняется.
+        """
+        super().__init__()
+        self.verify = verify
+        if isinstance(verify, str):
+            verify = ssl.create_default_context(**{"capath" if os.path.isdir(verify) else "cafile": verify})
+        self.client = httpx.Client(
+            http2=True,
+            verify=verify,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            # Cookies хранит только сессия requests: собственная банка httpx подмешивала бы в запросы
+            # cookies, которых в сессии уже нет
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        )
+        self.warmed = 0
+        self.requests_sent = 0
+        self.connects = 0
+        self.http2_responses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _trace(self, event_name, info):
+        """Трассировка httpcore: время установки соединения (для pop_connect_time) и счётчик соединений."""
+        if event_name == "connection.connect_tcp.started":
+            self._local.connect_start = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            _connect_timing.value = time.perf_counter() - self._local.connect_start
+            if event_name == "connection.connect_tcp.complete":
+                with self._lock:
+                    self.connects += 1
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """
+        Отправляет requests.PreparedRequest через httpx и возвращает requests.Response.
+        :raises ValueError: Если verify запроса отличается от verify, с которым создан клиент.
+        """
+        if verify != self.verify:
+            raise ValueError(f"HTTP2Adapter создан с verify={self.verify!r}, запрос передал verify={verify!r}: "
+                             f"проверка сертификата задаётся при создании адаптера")
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        else:
+            timeout = httpx.Timeout(timeout)
+        headers = [(name, value) for name, value in request.headers.items()
+                   if name.lower() not in _HOP_BY_HOP_HEADERS]
+        try:
+            response = self.client.request(
+                request.method,
+                request.url,
+                headers=headers,
+                content=request.body,
+                timeout=timeout,
+                extensions={"trace": self._trace}
+            )
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.RequestError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        with self._lock:
+            self.requests_sent += 1
+            if response.http_version == "HTTP/2":
+                self.http2_responses += 1
+
+        result = build_response(
+            request.method, str(response.url), response.status_code, response.headers.multi_items(),
+            response.content, elapsed=response.elapsed.total_seconds()
+        )
+        # Ответ должен ссылаться на исходный PreparedRequest - по нему requests строит редиректы и логирование
+        result.request = request
+        result.raw = _RawResponse(response.headers)
+        result._content_consumed = True
+        result.connection = self
+        extract_cookies_to_jar(result.cookies, request, result.raw)
+        return result
+
+    def warm_up(self, url, connections, verify=True):
+        """
+        Открывает соединение с хостом заранее (HEAD на url). При HTTP/2 одного соединения хватает
+        на все параллельные запросы, поэтому connections и verify не используются.
+        :return: Число установленных соединений.
+        """
+        connects = self.connects
+        try:
+            self.client.head(url, extensions={"trace": self._trace})
+        except httpx.RequestError as e:
+            raise requests.exceptions.ConnectionError(e)
+        finally:
+            _connect_timing.value = 0.0
+        opened = self.connects - connects
+        self.warmed += opened
+        return opened
+
+    def stats(self):
+        """
+        Те же счётчики, что у TimingHTTPAdapter.stats() (hits и misses - оценки), плюс http2 - число ответов
+        по HTTP/2.
+        """
+        misses = max(self.connects - self.warmed, 0)
+        return {
+            "requests": self.requests_sent,
+            "new_connections": self.connects,
+            "warmed": self.warmed,
+            "misses": misses,
+            "hits": max(self.requests_sent - misses, 0),
+            "http2": self.http2_responses,
+        }
+
+    def close(self):
+        self.client.close()
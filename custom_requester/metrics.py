@@ -0,0 +1,126 @@
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from utils.histogram import LatencyHistogram
+
+# Сегменты пути, которые являются идентификаторами: числа и UUID
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$")
+
+
+def endpoint_template(endpoint):
+    """
+    Приводит путь к шаблону эндпоинта: "/movies/123" -> "/movies/{id}".
+    Query-строка отбрасывается.
+    """
+    path = urlsplit(endpoint).path
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+class RequestMetrics:
+    """
+    Замер одного HTTP-запроса.
+    Время в секундах: connect - DNS + TCP + TLS нового соединения (0, если соединение переиспользовано),
+    ttfb - от отправки до получения заголовков ответа (включая connect), total - весь вызов включая чтение тела.
+    Размеры - байты тела запроса и ответа. attempt - номер попытки (больше 1 - повтор).
+    """
+    __slots__ = ("timestamp", "method", "host", "endpoint", "status_code", "total", "ttfb", "connect",
+                 "request_bytes", "response_bytes", "error", "attempt")
+
+    def __init__(self, method, host, endpoint, status_code=None, total=0.0, ttfb=0.0, connect=0.0,
+                 request_bytes=0, response_bytes=0, error=None, attempt=1):
+        self.timestamp = time.time()
+        self.method = method
+        self.host = host
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.total = total
+        self.ttfb = ttfb
+        self.connect = connect
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.error = error
+        self.attempt = attempt
+
+    @property
+    def key(self):
+        """Ключ гистограммы: "METHOD host/endpoint" - задержки разных хостов не смешиваются."""
+        host = urlsplit(self.host).netloc if self.host else ""
+        return f"{self.method} {host}{self.endpoint}"
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class InMemoryHistogramSink:
+    """Копит гистограммы задержек и счётчики статусов по каждому "METHOD host/endpoint/{id}"."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.status_counts = {}
+        self.errors = {}
+        self.retries = {}
+
+    def __call__(self, metrics):
+        key = metrics.key
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(metrics.total)
+            statuses = self.status_counts.setdefault(key, {})
+            statuses[metrics.status_code] = statuses.get(metrics.status_code, 0) + 1
+            if metrics.error is not None:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if metrics.attempt > 1:
+                self.retries[key] = self.retries.get(key, 0) + 1
+
+    def merge(self, histograms, status_counts, errors, retries=None):
+        """Добавляет данные другого приёмника (например, из другого процесса)."""
+        with self._lock:
+            for key, histogram in histograms.items():
+                self.histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+            for key, statuses in status_counts.items():
+                merged = self.status_counts.setdefault(key, {})
+                for status, count in statuses.items():
+                    merged[status] = merged.get(status, 0) + count
+            for key, count in errors.items():
+                self.errors[key] = self.errors.get(key, 0) + count
+            for key, count in (retries or {}).items():
+                self.retries[key] = self.retries.get(key, 0) + count
+
+    def summary(self):
+        """Таблица задержек по эндпоинтам (мс)."""
+        lines = [f"{'endpoint':<60} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  statuses"]
+        with self._lock:
+            for key in sorted(self.histograms):
+                histogram = self.histograms[key]
+                statuses = ", ".join(f"{status}: {count}" for status, count in self.status_counts[key].items())
+                if key in self.retries:
+                    statuses += f", retries: {self.retries[key]}"
+                lines.append(
+                    f"{key:<60} {histogram.total_count:>7} "
+                    f"{histogram.percentile(50) * 1000:>9.1f} {histogram.percentile(95) * 1000:>9.1f} "
+                    f"{histogram.percentile(99) * 1000:>9.1f} {histogram.max * 1000:>9.1f}  {statuses}"
+                )
+        return "\n".join(lines)
+
+
+class JsonlFileSink:
+    """Дописывает каждый замер отдельной JSON-строкой в файл."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, metrics):
+        line = json.dumps(metrics.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
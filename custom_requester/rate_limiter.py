@@ -0,0 +1,111 @@
+import hashlib
+import os
+import struct
+import threading
+import time
+
+from filelock import FileLock
+
+from custom_requester.deadline import DeadlineExceeded, remaining
+
+_STATE = struct.Struct("dd") # (токенов в ведре, время последнего пополнения)
+
+
+class TokenBucket:
+    """
+    Ведро токенов, общее для потоков процесса и для процессов (воркеров xdist).
+    Состояние - 16 байт в файле под файловой блокировкой, время - системные часы,
+    одинаковые для всех процессов машины.
+    """
+
+    def __init__(self, path, rate, burst=None):
+        """
+        :param path: Файл состояния (одинаковый путь = общее ведро).
+        :param rate: Скорость пополнения, токенов (запросов) в секунду.
+        :param burst: Ёмкость ведра; по умолчанию - секунда трафика.
+        """
+        self.path = path
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._thread_lock = threading.Lock()
+        self._file_lock = FileLock(f"{path}.lock")
+
+    def _try_take(self):
+        """Пытается взять токен; возвращает 0 при успехе или сколько секунд ждать до следующего токена."""
+        with self._thread_lock, self._file_lock:
+            now = time.time()
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                raw = os.pread(fd, _STATE.size, 0)
+                tokens, updated = _STATE.unpack(raw) if len(raw) == _STATE.size else (self.burst, now)
+                tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                os.pwrite(fd, _STATE.pack(tokens, now), 0)
+            finally:
+                os.close(fd)
+            return wait
+
+    def acquire(self):
+        """
+        Блокирует до получения токена. Возвращает время ожидания, секунды.
+        :raises DeadlineExceeded: Если токен не появится до конца бюджета времени (deadline).
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_take()
+            if not wait:
+                return waited
+            left = remaining()
+            if left is not None and wait > left:
+                raise DeadlineExceeded(f"Токен ограничителя скорости появится через {wait:.2f} с, "
+                                       f"бюджета осталось {max(left, 0.0):.2f} с")
+            time.sleep(wait)
+            waited += wait
+
+
+class RateLimiter:
+    """
+    Набор ограничителей по хостам и эндпоинтам.
+    Правила задаются строками "base_url=rate[:burst]" (весь хост) или
+    "base_url/endpoint/{id}=rate[:burst]" (один шаблон эндпоинта); запрос берёт токены
+    из всех подходящих вёдер.
+    """
+
+    def __init__(self, rules, state_dir):
+        """
+        :param rules: Словарь {base_url или base_url + шаблон эндпоинта: (rate, burst или None)}.
+        :param state_dir: Каталог файлов состояния вёдер.
+        """
+        os.makedirs(state_dir, exist_ok=True)
+        self.buckets = {}
+        for key, (rate, burst) in rules.items():
+            name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+            self.buckets[key] = TokenBucket(os.path.join(state_dir, name), rate, burst)
+
+    @staticmethod
+    def parse_rule(rule):
+        """
+        "https://host/movies=5:10" -> ("https://host/movies", (5.0, 10.0))
+        :raises ValueError: Если скорость не больше нуля или ёмкость ведра меньше одного токена.
+        """
+        key, _, limit = rule.rpartition("=")
+        rate, _, burst = limit.partition(":")
+        rate, burst = float(rate), float(burst) if burst else None
+        if not rate > 0:
+            raise ValueError(f"Скорость в правиле {rule} должна быть больше нуля")
+        if burst is not None and burst < 1:
+            raise ValueError(f"Ёмкость ведра в правиле {rule} должна быть не меньше 1")
+        return key.rstrip("/"), (rate, burst)
+
+    def acquire(self, base_url, endpoint):
+        """Ждёт токены для хоста и шаблона эндпоинта. Возвращает суммарное время ожидания."""
+        waited = 0.0
+        for key in (base_url, f"{base_url}{endpoint}"):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                waited += bucket.acquire()
+        return waited
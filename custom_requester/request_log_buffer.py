@@ -0,0 +1,54 @@
+import threading
+from collections import deque
+
+
+class RequestLogBuffer:
+    """
+    Кольцевой буфер последних запросов текущего теста.
+    Хранит ссылки на объекты ответов без форматирования; текст собирается
+    только в dump(), т.е. только для упавших тестов.
+    """
+
+    def __init__(self, size=50):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=size)
+
+    def resize(self, size):
+        with self._lock:
+            self._records = deque(self._records, maxlen=size)
+
+    def append(self, response):
+        # Под блокировкой: resize() может подменить deque между чтением self._records и append
+        with self._lock:
+            self._records.append(response)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def dump(self):
+        """Форматирует накопленные запросы и ответы в текст для отчёта pytest."""
+        with self._lock:
+            records = list(self._records)
+        return "\n\n".join(self._format(response) for response in records)
+
+    @staticmethod
+    def _format(response):
+        request = response.request
+        body = getattr(request, "body", None) or getattr(request, "content", None)
+        lines = [
+            f"Request: {request.method} {request.url}",
+            f"Request Headers: {dict(request.headers)}",
+        ]
+        if body:
+            lines.append(f"Request Body: {body}")
+        lines += [
+            f"Response Status: {response.status_code}",
+            f"Response Headers: {dict(response.headers)}",
+            f"Response Body: {response.text or '(пусто)'}",
+        ]
+        return "\n".join(lines)
+
+
+# Общий буфер процесса: тесты внутри воркера выполняются последовательно
+request_log_buffer = RequestLogBuffer()
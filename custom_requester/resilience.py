@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Методы, повтор которых не меняет состояние сервера (RFC 9110)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Запрос не отправлен: цепь для хоста разомкнута после серии отказов."""
+
+
+class RetryPolicy:
+    """
+    Политика повторов: экспоненциальная пауза с полным jitter, уважение Retry-After,
+    по умолчанию повторяются только идемпотентные методы.
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=0.2, backoff_max=5.0, retry_statuses=(429, 502, 503, 504),
+                 retry_methods=IDEMPOTENT_METHODS, max_retry_after=30.0):
+        """
+        :param max_attempts: Максимум попыток, включая первую (1 - без повторов).
+        :param backoff_base: Базовая пауза, секунды; верхняя граница паузы попытки n - base * 2^(n-1).
+        :param backoff_max: Максимальная пауза, секунды.
+        :param retry_statuses: Статусы, при которых запрос повторяется.
+        :param retry_methods: Методы, которые разрешено повторять.
+        :param max_retry_after: Потолок для значения Retry-After, секунды.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.max_retry_after = max_retry_after
+
+    def _can_retry(self, method, attempt):
+        return attempt < self.max_attempts and method.upper() in self.retry_methods
+
+    def should_retry_status(self, method, status_code, attempt):
+        return status_code in self.retry_statuses and self._can_retry(method, attempt)
+
+    def should_retry_error(self, method, error, attempt):
+        # Таймаут чтения мог дойти до сервера - повторяем только то, что разрешено политикой методов
+        retriable = isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return retriable and not isinstance(error, CircuitOpenError) and self._can_retry(method, attempt)
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt, response=None):
+        """Пауза перед следующей попыткой после неудачной попытки номер attempt."""
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_retry_after)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи для одного хоста.
+    closed -> open после failure_threshold отказов подряд (сетевые ошибки и 5xx шлюза);
+    open -> half_open через reset_timeout секунд: пропускается один пробный запрос,
+    его успех замыкает цепь, неудача - снова размыкает.
+    """
+    failure_statuses = frozenset({502, 503, 504})
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock # источник монотонного времени (в тестах - поддельные часы)
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self):
+        """Можно ли отправлять запрос прямо сейчас."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = self.clock()
+                self._probe_in_flight = False
+
+    def release(self):
+        """
+        Освобождает пробный запрос, завершившийся без ответа сервера и без сетевой ошибки
+        (например, исчерпан бюджет времени или тест упал внутри запроса): цепь остаётся в прежнем состоянии.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_status(self, status_code):
+        if status_code in self.failure_statuses:
+            self.record_failure()
+        else:
+            self.record_success()
@@ -0,0 +1,95 @@
+import argparse
+import os
+
+# Поток логов на каждый запрос под нагрузкой не нужен - по умолчанию только предупреждения
+os.environ.setdefault("CINESCOPE_LOG_LEVEL", "WARNING")
+
+from api.api_manager import ApiManager
+from load.distributed import DistributedRunner
+from load.engine import LoadEngine
+from load.open_model import OpenModelRunner
+from load.scenarios import SCENARIOS
+
+
+def parse_scenarios(values):
+    """["browse=3", "admin_crud"] -> {browse_movies: 3.0, admin_movie_crud: 1.0}"""
+    scenarios = {}
+    for value in values or ["browse"]:
+        name, _, weight = value.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Неизвестный сценарий {name}, доступны: {', '.join(SCENARIOS)}")
+        scenarios[SCENARIOS[name]] = float(weight or 1)
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон Cinescope на сценариях ApiManager")
+    parser.add_argument("--users", type=int, default=10, help="Число виртуальных пользователей")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Время запуска всех пользователей, секунды")
+    parser.add_argument("--duration", type=float, default=60.0, help="Длительность прогона, секунды")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Пауза между сценариями, секунды")
+    parser.add_argument("--scenario", action="append",
+                        help=f"Сценарий с весом, например browse=3. Доступны: {', '.join(SCENARIOS)}")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Открытая модель: запусков сценария в секунду независимо от времени ответа "
+                             "(--users/--ramp-up/--think-time игнорируются)")
+    parser.add_argument("--max-in-flight", type=int, default=256,
+                        help="Открытая модель: максимум одновременно выполняемых сценариев")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Число процессов-генераторов; rate или пользователи делятся между ними")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--http2-host", action="append", default=[],
+                        help="Base URL хоста, запросы к которому идут через HTTP/2 (можно указать несколько раз)")
+    parser.add_argument("--journey-timeout", type=float, default=None,
+                        help="Бюджет времени на один сценарий, секунды: запросы получают таймаут не больше остатка")
+    parser.add_argument("--no-cleanup", action="store_true", help="Не удалять созданные фильмы и пользователей")
+    args = parser.parse_args()
+    try:
+        scenarios = parse_scenarios(args.scenario)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.http2_host:
+        # Через окружение - чтобы настройку увидели и процессы DistributedRunner
+        os.environ["CINESCOPE_HTTP2_HOSTS"] = ",".join(args.http2_host)
+        ApiManager.http2_hosts = tuple(args.http2_host)
+
+    if args.processes > 1:
+        engine = DistributedRunner(
+            processes=args.processes,
+            scenarios=scenarios,
+            rate=args.rate,
+            users=args.users,
+            duration=args.duration,
+            ramp_up=args.ramp_up,
+            think_time=args.think_time,
+            max_in_flight=args.max_in_flight,
+            cleanup=not args.no_cleanup,
+            seed=args.seed,
+            journey_timeout=args.journey_timeout
+        )
+    elif args.rate:
+        engine = OpenModelRunner(
+            scenarios=scenarios,
+            rate=args.rate,
+            duration=args.duration,
+            max_in_flight=args.max_in_flight,
+            cleanup=not args.no_cleanup,
+            seed=args.seed,
+            journey_timeout=args.journey_timeout
+        )
+    else:
+        engine = LoadEngine(
+            scenarios=scenarios,
+            users=args.users,
+            ramp_up=args.ramp_up,
+            duration=args.duration,
+            think_time=args.think_time,
+            cleanup=not args.no_cleanup,
+            seed=args.seed,
+            journey_timeout=args.journey_timeout
+        )
+    print(engine.run().format())
+
+
+if __name__ == "__main__":
+    main()
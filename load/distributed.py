@@ -0,0 +1,157 @@
+import multiprocessing
+import queue
+
+from custom_requester.metrics import InMemoryHistogramSink
+from load.engine import LoadEngine, LoadReport
+from load.open_model import OpenModelReport, OpenModelRunner
+from utils.histogram import LatencyHistogram
+
+
+def _merge_counts(target, counts):
+    for key, count in counts.items():
+        target[key] = target.get(key, 0) + count
+
+
+def _merge_histograms(target, histograms):
+    for key, histogram in histograms.items():
+        target.setdefault(key, LatencyHistogram()).merge(histogram)
+
+
+def _worker(index, processes, options, barrier, start_timeout, results):
+    """
+    Процесс-воркер: свой движок (и свои ApiManager/сессии), старт по общему барьеру,
+    результат - гистограммы и счётчики, переданные координатору через очередь.
+    Ошибка до старта ломает барьер (abort), чтобы остальные воркеры не ждали его вечно.
+    """
+    try:
+        options = dict(options)
+        seed = options.pop("seed")
+        if options.get("rate"):
+            engine = OpenModelRunner(
+                rate=options.pop("rate") / processes,
+                phase=index / processes,
+                seed=None if seed is None else seed + index,
+                **options
+            )
+        else:
+            users = options.pop("users")
+            engine = LoadEngine(
+                users=users // processes + (1 if index < users % processes else 0),
+                seed=None if seed is None else seed * processes + index,
+                **options
+            )
+        barrier.wait(timeout=start_timeout)
+        report = engine.run()
+        result = {
+            "elapsed": report.elapsed,
+            "histograms": report.sink.histograms,
+            "status_counts": report.sink.status_counts,
+            "errors": report.sink.errors,
+            "retries": report.sink.retries,
+        }
+        if isinstance(report, OpenModelReport):
+            result.update(scheduled=report.scheduled, response_time=report.response_time,
+                          service_time=report.service_time, scenario_errors=report.errors)
+        else:
+            result.update(journeys=report.journeys, journey_errors=report.journey_errors)
+        results.put((index, result, None))
+    except BaseException as e:
+        barrier.abort()
+        results.put((index, None, f"{type(e).__name__}: {e}"))
+
+
+class DistributedRunner:
+    """
+    Координатор многопроцессной нагрузки: запускает N процессов со своим движком
+    (LoadEngine или OpenModelRunner), синхронизирует старт барьером, делит между ними
+    целевой rate (со сдвигом расписаний) или число пользователей и сливает
+    гистограммы и счётчики ошибок в один отчёт.
+    """
+
+    # Сколько воркеры ждут друг друга на старте (импорт и создание движка), секунды
+    start_timeout = 120
+
+    def __init__(self, processes, scenarios, rate=None, users=10, **options):
+        """
+        :param processes: Число процессов-воркеров.
+        :param scenarios: Словарь {функция сценария: вес} (функции должны быть на уровне модуля).
+        :param rate: Общий целевой rate открытой модели; None - закрытая модель на users пользователей.
+        :param options: Остальные параметры движка (duration, ramp_up, think_time, max_in_flight, cleanup, seed,
+                        journey_timeout).
+        """
+        self.processes = processes
+        self.options = {"scenarios": scenarios, "seed": options.pop("seed", None), **options}
+        if rate:
+            self.options["rate"] = rate
+            for name in ("ramp_up", "think_time"):
+                self.options.pop(name, None)
+        else:
+            self.options["users"] = users
+            self.options.pop("max_in_flight", None)
+        self.rate = rate
+
+    def run(self):
+        """Выполняет прогон и возвращает объединённый LoadReport или OpenModelReport."""
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(self.processes)
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker,
+                            args=(index, self.processes, self.options, barrier, self.start_timeout, results))
+            for index in range(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        collected = {}
+        failures = []
+        polls_after_exit = 0
+        while len(collected) < self.processes and not failures:
+            try:
+                index, result, error = results.get(timeout=1)
+            except queue.Empty:
+                # Воркер мог умереть, не успев ничего сообщить (сигнал, нехватка памяти)
+                failures = [f"воркер {index}: процесс завершился с кодом {worker.exitcode} без результата"
+                            for index, worker in enumerate(workers)
+                            if index not in collected and worker.exitcode not in (None, 0)]
+                if not any(worker.is_alive() for worker in workers):
+                    # Результат, отправленный перед выходом, уже в очереди - ждём его ещё один раз
+                    polls_after_exit += 1
+                    if polls_after_exit > 1 and not failures:
+                        failures = ["процессы завершились без результата"]
+                continue
+            collected[index] = result
+            if error:
+                failures.append(f"воркер {index}: {error}")
+
+        if failures:
+            # Остальные воркеры без отказавшего не дадут целевой нагрузки - останавливаем их сразу
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+        for worker in workers:
+            worker.join()
+        if failures:
+            raise RuntimeError("Ошибка в процессах нагрузки: " + "; ".join(failures))
+        return self._merge(list(collected.values()))
+
+    def _merge(self, results):
+        sink = InMemoryHistogramSink()
+        for result in results:
+            sink.merge(result["histograms"], result["status_counts"], result["errors"], result["retries"])
+        elapsed = max(result["elapsed"] for result in results)
+
+        if self.rate:
+            response_time, service_time, errors = {}, {}, {}
+            for result in results:
+                _merge_histograms(response_time, result["response_time"])
+                _merge_histograms(service_time, result["service_time"])
+                _merge_counts(errors, result["scenario_errors"])
+            scheduled = sum(result["scheduled"] for result in results)
+            return OpenModelReport(self.rate, scheduled, elapsed, response_time, service_time, errors, sink)
+
+        journeys, journey_errors = {}, {}
+        for result in results:
+            _merge_counts(journeys, result["journeys"])
+            _merge_counts(journey_errors, result["journey_errors"])
+        return LoadReport(sink, elapsed, journeys, journey_errors)
@@ -0,0 +1,162 @@
+import random
+import threading
+import time
+
+import pytest
+import requests
+
+from api.api_manager import ApiManager
+from constants import ADMIN_CREDENTIALS
+from custom_requester.custom_requester import CustomRequester
+from custom_requester.deadline import deadline
+from custom_requester.metrics import InMemoryHistogramSink
+from utils.cleanup_registry import CleanupRegistry
+
+REPORT_PERCENTILES = (50, 95, 99, 99.9)
+
+
+def format_histogram_table(title, histograms, elapsed, errors=None):
+    """
+    Таблица count / rps / errors / перцентили (мс) по набору гистограмм.
+    :param histograms: Словарь {имя строки: LatencyHistogram}.
+    :param errors: Словарь {имя строки: число ошибок}.
+    """
+    errors = errors or {}
+    lines = [
+        f"{title:<56} {'count':>8} {'rps':>8} {'errors':>7} "
+        + " ".join(f"{'p' + str(p):>9}" for p in REPORT_PERCENTILES) + f" {'max':>9}   (мс)",
+    ]
+    for key in sorted(histograms):
+        histogram = histograms[key]
+        lines.append(
+            f"{key:<56} {histogram.total_count:>8} {histogram.total_count / elapsed if elapsed else 0:>8.1f} "
+            f"{errors.get(key, 0):>7} "
+            + " ".join(f"{histogram.percentile(p) * 1000:>9.1f}" for p in REPORT_PERCENTILES)
+            + f" {histogram.max * 1000:>9.1f}"
+        )
+    return lines
+
+
+def endpoint_errors(sink):
+    """Число ошибок по эндпоинтам: сетевые ошибки и ответы со статусом >= 400."""
+    return {
+        key: sink.errors.get(key, 0) + sum(
+            count for status, count in statuses.items() if status is not None and status >= 400
+        )
+        for key, statuses in sink.status_counts.items()
+    }
+
+
+def drain_created(cleanup_registry):
+    """Удаляет созданные за прогон фильмы и пользователей от имени администратора."""
+    admin_manager = ApiManager(session=requests.Session())
+    admin_manager.auth_api.authenticate(ADMIN_CREDENTIALS)
+    cleanup_registry.drain(admin_manager)
+    admin_manager.session.close()
+
+
+class LoadReport:
+    """Итог прогона: гистограммы по эндпоинтам, счётчики сценариев и ошибок."""
+
+    def __init__(self, sink, elapsed, journeys, journey_errors):
+        self.sink = sink
+        self.elapsed = elapsed
+        self.journeys = journeys
+        self.journey_errors = journey_errors
+
+    def format(self):
+        lines = [f"Длительность: {self.elapsed:.1f} с"]
+        lines += format_histogram_table("endpoint", self.sink.histograms, self.elapsed, endpoint_errors(self.sink))
+        lines.append("Сценарии (выполнено / ошибок):")
+        for name in sorted(self.journeys):
+            lines.append(f"  {name:<30} {self.journeys[name]:>8} / {self.journey_errors.get(name, 0)}")
+        return "\n".join(lines)
+
+
+class LoadEngine:
+    """
+    Закрытая модель нагрузки: виртуальные пользователи (потоки) в цикле выполняют
+    сценарии, выбранные по весам. У каждого пользователя своя сессия и свой ApiManager.
+    Задержки собираются через CustomRequester.metrics_sinks.
+    """
+
+    def __init__(self, scenarios, users=10, ramp_up=0.0, duration=60.0, think_time=0.0, cleanup=True, seed=None,
+                 journey_timeout=None):
+        """
+        :param scenarios: Словарь {функция сценария: вес}.
+        :param users: Число виртуальных пользователей.
+        :param ramp_up: За сколько секунд запускаются все пользователи (равномерно).
+        :param duration: Длительность прогона, секунды (считая с начала ramp-up).
+        :param think_time: Пауза между сценариями одного пользователя, секунды.
+        :param cleanup: Удалить созданные за прогон фильмы и пользователей в конце.
+        :param seed: Seed выбора сценариев и их параметров.
+        :param journey_timeout: Бюджет времени на один сценарий, секунды (None - только таймауты запросов).
+        """
+        self.scenarios = list(scenarios)
+        self.weights = [scenarios[scenario] for scenario in self.scenarios]
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.think_time = think_time
+        self.cleanup = cleanup
+        self.seed = seed
+        self.journey_timeout = journey_timeout
+        self.cleanup_registry = CleanupRegistry()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.journeys = {}
+        self.journey_errors = {}
+
+    def _count(self, counter, name):
+        with self._lock:
+            counter[name] = counter.get(name, 0) + 1
+
+    def _virtual_user(self, index, start_at):
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        delay = start_at - time.perf_counter()
+        if delay > 0 and self._stop.wait(delay):
+            return
+        session = requests.Session()
+        api_manager = ApiManager(session=session, cleanup_registry=self.cleanup_registry)
+        try:
+            while not self._stop.is_set():
+                scenario = rng.choices(self.scenarios, weights=self.weights)[0]
+                try:
+                    with deadline(self.journey_timeout):
+                        scenario(api_manager, rng)
+                except (pytest.fail.Exception, Exception):
+                    self._count(self.journey_errors, scenario.__name__)
+                self._count(self.journeys, scenario.__name__)
+                if self.think_time:
+                    self._stop.wait(self.think_time)
+        finally:
+            session.close()
+
+    def run(self):
+        """Выполняет прогон и возвращает LoadReport."""
+        sink = InMemoryHistogramSink()
+        CustomRequester.add_metrics_sink(sink)
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=self._virtual_user,
+                args=(index, start + self.ramp_up * index / self.users),
+                daemon=True
+            )
+            for index in range(self.users)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            self._stop.wait(self.duration)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            CustomRequester.remove_metrics_sink(sink)
+
+        if self.cleanup:
+            drain_created(self.cleanup_registry)
+
+        return LoadReport(sink, elapsed, self.journeys, self.journey_errors)
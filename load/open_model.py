@@ -0,0 +1,144 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from api.api_manager import ApiManager
+from custom_requester.custom_requester import CustomRequester
+from custom_requester.deadline import deadline
+from custom_requester.metrics import InMemoryHistogramSink
+from load.engine import drain_created, endpoint_errors, format_histogram_table
+from utils.cleanup_registry import CleanupRegistry
+from utils.histogram import LatencyHistogram
+
+
+class OpenModelReport:
+    """
+    Итог прогона открытой модели.
+    response_time - от запланированного момента отправки (ожидание в очереди при остановках сервера
+    входит в задержку, поэтому coordinated omission её не занижает),
+    service_time - от фактической отправки.
+    """
+
+    def __init__(self, target_rate, scheduled, elapsed, response_time, service_time, errors, sink):
+        self.target_rate = target_rate
+        self.scheduled = scheduled
+        self.elapsed = elapsed
+        self.response_time = response_time
+        self.service_time = service_time
+        self.errors = errors
+        self.sink = sink
+
+    def format(self):
+        lines = [
+            f"Целевая интенсивность: {self.target_rate:.1f} rps, запланировано: {self.scheduled}, "
+            f"фактически: {self.scheduled / self.elapsed if self.elapsed else 0:.1f} rps за {self.elapsed:.1f} с"
+        ]
+        lines += format_histogram_table("response time (intended)", self.response_time, self.elapsed, self.errors)
+        lines += format_histogram_table("service time", self.service_time, self.elapsed, self.errors)
+        lines += format_histogram_table("endpoint", self.sink.histograms, self.elapsed, endpoint_errors(self.sink))
+        return "\n".join(lines)
+
+
+class OpenModelRunner:
+    """
+    Открытая модель нагрузки: сценарии запускаются с постоянной интенсивностью rate
+    по расписанию, не зависящему от времени ответа сервера. Если сервер тормозит,
+    запросы копятся в очереди пула, а задержка всё равно отсчитывается от запланированного
+    момента - поэтому "замирания" сервера не прячутся (coordinated omission).
+    """
+
+    def __init__(self, scenarios, rate, duration=60.0, max_in_flight=256, cleanup=True, seed=None, phase=0.0,
+                 journey_timeout=None):
+        """
+        :param scenarios: Словарь {функция сценария: вес}, например {list_movies: 1}.
+        :param rate: Целевая интенсивность, запусков сценария в секунду.
+        :param duration: Длительность расписания, секунды.
+        :param max_in_flight: Число рабочих потоков (одновременных сценариев).
+        :param cleanup: Удалить созданные за прогон фильмы и пользователей в конце.
+        :param seed: Seed выбора сценариев и их параметров.
+        :param phase: Сдвиг расписания в долях интервала (0..1) - чтобы расписания нескольких
+                      процессов с одинаковым rate не совпадали, а чередовались.
+        :param journey_timeout: Бюджет времени на один сценарий, секунды (None - только таймауты запросов).
+        """
+        self.scenarios = list(scenarios)
+        self.weights = [scenarios[scenario] for scenario in self.scenarios]
+        self.rate = rate
+        self.interval = 1.0 / rate
+        self.duration = duration
+        self.phase = phase
+        self.max_in_flight = max_in_flight
+        self.cleanup = cleanup
+        self.journey_timeout = journey_timeout
+        self.rng = random.Random(seed)
+        self.cleanup_registry = CleanupRegistry()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions = []
+        self.response_time = {}
+        self.service_time = {}
+        self.errors = {}
+
+    def _api_manager(self):
+        """ApiManager на рабочий поток: своя сессия и пул соединений."""
+        api_manager = getattr(self._local, "api_manager", None)
+        if api_manager is None:
+            session = requests.Session()
+            api_manager = self._local.api_manager = ApiManager(session=session, cleanup_registry=self.cleanup_registry)
+            self._local.rng = random.Random(self.rng.random())
+            with self._lock:
+                self._sessions.append(session)
+        return api_manager
+
+    def _execute(self, scenario, intended_start):
+        api_manager = self._api_manager()
+        actual_start = time.perf_counter()
+        failed = False
+        try:
+            with deadline(self.journey_timeout):
+                scenario(api_manager, self._local.rng)
+        except (pytest.fail.Exception, Exception):
+            failed = True
+        end = time.perf_counter()
+
+        name = scenario.__name__
+        with self._lock:
+            if name not in self.response_time:
+                self.response_time[name] = LatencyHistogram()
+                self.service_time[name] = LatencyHistogram()
+            self.response_time[name].record(end - intended_start)
+            self.service_time[name].record(end - actual_start)
+            if failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def run(self):
+        """Выполняет прогон и возвращает OpenModelReport."""
+        sink = InMemoryHistogramSink()
+        CustomRequester.add_metrics_sink(sink)
+        scheduled = 0
+        start = time.perf_counter() + self.phase * self.interval
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+                while True:
+                    intended_start = start + scheduled * self.interval
+                    if intended_start - start >= self.duration:
+                        break
+                    delay = intended_start - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    scenario = self.rng.choices(self.scenarios, weights=self.weights)[0]
+                    executor.submit(self._execute, scenario, intended_start)
+                    scheduled += 1
+            elapsed = time.perf_counter() - start
+        finally:
+            CustomRequester.remove_metrics_sink(sink)
+            for session in self._sessions:
+                session.close()
+
+        if self.cleanup:
+            drain_created(self.cleanup_registry)
+
+        return OpenModelReport(self.rate, scheduled, elapsed, self.response_time, self.service_time, self.errors, sink)
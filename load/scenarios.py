@@ -0,0 +1,56 @@
+"""
+Пользовательские сценарии для нагрузочного движка.
+Сценарий - функция (api_manager, rng), выполняющая цепочку вызовов существующих API-классов.
+Ошибки (неожиданный статус, сеть) поднимаются как pytest.fail и учитываются движком.
+"""
+from constants import ADMIN_CREDENTIALS
+from utils.data_generator import DataGenerator
+
+
+def list_movies(api_manager, rng):
+    """Один запрос листинга афиши - основная цель открытой модели с фиксированным RPS."""
+    api_manager.movies_api.get_movies(params={
+        "pageSize": 10,
+        "page": rng.randint(1, 5),
+        "published": True,
+        "createdAt": "desc"
+    })
+
+
+def browse_movies(api_manager, rng):
+    """Гость: листает афишу и открывает случайный фильм со страницы."""
+    params = {
+        "pageSize": 10,
+        "page": rng.randint(1, 5),
+        "locations": rng.choice([["MSK"], ["SPB"], ["MSK", "SPB"]]),
+        "published": True,
+        "createdAt": rng.choice(["asc", "desc"])
+    }
+    movies = api_manager.movies_api.get_movies(params=params).json()["movies"]
+    if movies:
+        api_manager.movies_api.get_movie_by_id(rng.choice(movies)["id"])
+
+
+def register_and_browse(api_manager, rng):
+    """Новый пользователь: регистрация -> логин -> афиша -> фильм."""
+    user_data = next(DataGenerator.users(1, seed=rng.getrandbits(64)))
+    api_manager.auth_api.register_user(user_data)
+    api_manager.auth_api.login_user({"email": user_data["email"], "password": user_data["password"]})
+    browse_movies(api_manager, rng)
+
+
+def admin_movie_crud(api_manager, rng):
+    """Администратор: создание -> редактирование -> удаление фильма."""
+    api_manager.auth_api.authenticate(ADMIN_CREDENTIALS)
+    movie_data = next(DataGenerator.movies(1, seed=rng.getrandbits(64)))
+    movie_id = api_manager.movies_api.create_movie(movie_data).json()["id"]
+    api_manager.movies_api.update_movie(movie_id, {"price": rng.randint(1, 1000)})
+    api_manager.movies_api.delete_movie(movie_id)
+
+
+SCENARIOS = {
+    "list_movies": list_movies,
+    "browse": browse_movies,
+    "register": register_and_browse,
+    "admin_crud": admin_movie_crud,
+}
@@ -0,0 +1,40 @@
+import argparse
+import os
+
+from stub_server.cinescope_stub import CinescopeState, CinescopeStubServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный двойник API Cinescope (auth + movies)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка каждого ответа, секунды")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, секунды")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов с ошибкой (0..1)")
+    parser.add_argument("--error-status", type=int, default=503, help="Статус-код внедрённой ошибки")
+    parser.add_argument("--state-file", default=None,
+                        help="JSON-файл состояния: загружается при старте и сохраняется при остановке")
+    args = parser.parse_args()
+
+    state = CinescopeState()
+    if args.state_file and os.path.exists(args.state_file):
+        state.load(args.state_file)
+
+    server = CinescopeStubServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, state=state
+    )
+    print(f"Cinescope stub: {server.base_url}")
+    print(f"export CINESCOPE_BASE_URL={server.base_url} CINESCOPE_MOVIES_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.state_file:
+            state.dump(args.state_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from constants import ADMIN_CREDENTIALS, LOGIN_ENDPOINT, MOVIES_ENDPOINT, REGISTER_ENDPOINT
+
+GENRES = {1: "Драма", 2: "Комедия", 3: "Боевик", 4: "Фантастика", 5: "Ужасы"}
+LOCATIONS = ("MSK", "SPB")
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+MOVIE_ID_PATH = re.compile(rf"^{MOVIES_ENDPOINT}/(\d+)$")
+USER_ID_PATH = re.compile(r"^/user/([^/]+)$")
+# Минимальная цена фильма: её принимает валидация, и с неё по умолчанию начинается фильтр minPrice
+MIN_PRICE = 0
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, error=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"message": message, "error": error, "statusCode": status} if error else {"message": message}
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class CinescopeState:
+    """
+    Состояние локального двойника Cinescope: пользователи, фильмы и выпуск токенов.
+    Все операции потокобезопасны.
+    """
+
+    def __init__(self, token_secret="cinescope-stub", token_ttl=30 * 60):
+        self.lock = threading.Lock()
+        self.token_secret = token_secret.encode("utf-8")
+        self.token_ttl = token_ttl
+        self.users = {}
+        self.users_by_email = {}
+        self.movies = {} # dict сохраняет порядок вставки = порядок createdAt
+        self.next_movie_id = 1
+        # Постоянный ID администратора: токены из общего кэша остаются валидными после перезапуска двойника
+        self._add_user(ADMIN_CREDENTIALS["email"], "Super Admin", ADMIN_CREDENTIALS["password"], ["SUPER_ADMIN"],
+                       user_id="00000000-0000-4000-8000-000000000001")
+
+    # --- токены ---
+
+    @staticmethod
+    def _b64(data):
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+    def issue_token(self, user):
+        header = self._b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        payload = self._b64(json.dumps({
+            "id": user["id"], "email": user["email"], "roles": user["roles"],
+            "iat": int(time.time()), "exp": int(time.time()) + self.token_ttl
+        }).encode())
+        signature = hmac.new(self.token_secret, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        return f"{header}.{payload}.{self._b64(signature)}"
+
+    def user_from_token(self, authorization):
+        if not authorization or not authorization.lower().startswith("bearer "):
+            raise ApiError(401, "Unauthorized")
+        try:
+            header, payload, signature = authorization[7:].split(".")
+            expected = self._b64(hmac.new(self.token_secret, f"{header}.{payload}".encode(), hashlib.sha256).digest())
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except ValueError:
+            raise ApiError(401, "Unauthorized")
+        if not hmac.compare_digest(signature, expected) or claims["exp"] < time.time():
+            raise ApiError(401, "Unauthorized")
+        user = self.users.get(claims["id"])
+        if user is None:
+            raise ApiError(401, "Unauthorized")
+        return user
+
+    # --- пользователи ---
+
+    def _add_user(self, email, full_name, password, roles, user_id=None):
+        user = {
+            "id": user_id or str(uuid.uuid4()), "email": email, "fullName": full_name, "password": password,
+            "roles": roles, "verified": True, "banned": False, "createdAt": _now_iso()
+        }
+        self.users[user["id"]] = user
+        self.users_by_email[email] = user
+        return user
+
+    @staticmethod
+    def public_user(user):
+        return {key: value for key, value in user.items() if key != "password"}
+
+    def register(self, data):
+        errors = []
+        if not isinstance(data.get("email"), str) or not EMAIL_PATTERN.match(data["email"]):
+            errors.append("Некорректный email")
+        if not isinstance(data.get("fullName"), str) or not data["fullName"].strip():
+            errors.append("Поле fullName обязательно")
+        password = data.get("password")
+        if (not isinstance(password, str) or not 8 <= len(password) <= 20
+                or not re.search(r"[A-Za-z]", password) or not re.search(r"\d", password)):
+            errors.append("Пароль должен содержать от 8 до 20 символов, минимум одну букву и одну цифру")
+        elif data.get("passwordRepeat") != password:
+            errors.append("Пароли не совпадают")
+        if errors:
+            raise ApiError(400, errors, "Bad Request")
+        with self.lock:
+            if data["email"] in self.users_by_email:
+                raise ApiError(409, "Пользователь с таким email уже зарегистрирован", "Conflict")
+            return self.public_user(self._add_user(data["email"], data["fullName"], password, ["USER"]))
+
+    def login(self, data):
+        user = self.users_by_email.get(data.get("email"))
+        if user is None or user["password"] != data.get("password"):
+            raise ApiError(401, "Неверный логин или пароль", "Unauthorized")
+        return {
+            "accessToken": self.issue_token(user),
+            "expiresIn": self.token_ttl * 1000,
+            "user": {key: user[key] for key in ("id", "email", "fullName", "roles")}
+        }
+
+    def get_user(self, current_user, user_id):
+        if current_user["id"] != user_id and not {"ADMIN", "SUPER_ADMIN"} & set(current_user["roles"]):
+            raise ApiError(403, "Forbidden resource", "Forbidden")
+        user = self.users.get(user_id)
+        if user is None:
+            raise ApiError(404, "Пользователь не найден", "Not Found")
+        return self.public_user(user)
+
+    def delete_user(self, current_user, user_id):
+        if "SUPER_ADMIN" not in current_user["roles"]:
+            raise ApiError(403, "Forbidden resource", "Forbidden")
+        with self.lock:
+            user = self.users.pop(user_id, None)
+            if user is None:
+                raise ApiError(404, "Пользователь не найден", "Not Found")
+            self.users_by_email.pop(user["email"], None)
+
+    # --- фильмы ---
+
+    @staticmethod
+    def _require_admin(current_user):
+        if not {"ADMIN", "SUPER_ADMIN"} & set(current_user["roles"]):
+            raise ApiError(403, "Forbidden resource", "Forbidden")
+
+    @staticmethod
+    def _validate_movie(data, partial):
+        errors = []
+        checks = {
+            "name": lambda value: isinstance(value, str) and value.strip(),
+            "imageUrl": lambda value: isinstance(value, str),
+            "price": lambda value: isinstance(value, int) and not isinstance(value, bool) and value >= MIN_PRICE,
+            "description": lambda value: isinstance(value, str),
+            "location": lambda value: value in LOCATIONS,
+            "published": lambda value: isinstance(value, bool),
+            "genreId": lambda value: value in GENRES,
+        }
+        for field, check in checks.items():
+            if field not in data:
+                if not partial and field != "imageUrl":
+                    errors.append(f"Поле {field} обязательно")
+            elif not check(data[field]):
+                errors.append(f"Некорректное значение поля {field}")
+        if errors:
+            raise ApiError(400, errors, "Bad Request")
+
+    def _movie_response(self, movie):
+        return {**movie, "genre": {"name": GENRES[movie["genreId"]]}}
+
+    def create_movie(self, current_user, data):
+        self._require_admin(current_user)
+        self._validate_movie(data, partial=False)
+        with self.lock:
+            if any(movie["name"] == data["name"] for movie in self.movies.values()):
+                raise ApiError(409, "Фильм с таким названием уже существует", "Conflict")
+            movie = {
+                "id": self.next_movie_id, "name": data["name"], "price": data["price"],
+                "description": data["description"], "imageUrl": data.get("imageUrl"),
+                "location": data["location"], "published": data["published"], "genreId": data["genreId"],
+                "rating": 0, "createdAt": _now_iso(), "reviews": []
+            }
+            self.movies[movie["id"]] = movie
+            self.next_movie_id += 1
+        return self._movie_response(movie)
+
+    def get_movie(self, movie_id):
+        movie = self.movies.get(movie_id)
+        if movie is None:
+            raise ApiError(404, "Фильм не найден")
+        return self._movie_response(movie)
+
+    def update_movie(self, current_user, movie_id, data):
+        self._require_admin(current_user)
+        self._validate_movie(data, partial=True)
+        with self.lock:
+            movie = self.movies.get(movie_id)
+            if movie is None:
+                raise ApiError(404, "Фильм не найден")
+            movie.update({key: value for key, value in data.items() if key in movie and key not in ("id", "createdAt")})
+        return self._movie_response(movie)
+
+    def delete_movie(self, current_user, movie_id):
+        self._require_admin(current_user)
+        with self.lock:
+            movie = self.movies.pop(movie_id, None)
+        if movie is None:
+            raise ApiError(404, "Фильм не найден")
+        return self._movie_response(movie)
+
+    def list_movies(self, query):
+        def single(name, default, cast):
+            try:
+                return cast(query[name][0]) if name in query else default
+            except ValueError:
+                raise ApiError(400, [f"Некорректное значение параметра {name}"], "Bad Request")
+
+        page_size = single("pageSize", 10, int)
+        page = single("page", 1, int)
+        min_price = single("minPrice", MIN_PRICE, int)
+        max_price = single("maxPrice", 1000, int)
+        genre_id = single("genreId", None, int)
+        order = single("createdAt", "desc", str).lower()
+        published = single("published", None, lambda value: value.lower() == "true")
+        locations = {location for value in query.get("locations", []) for location in value.split(",")}
+        if page_size < 1 or page < 1 or order not in ("asc", "desc"):
+            raise ApiError(400, ["Некорректные параметры пагинации"], "Bad Request")
+
+        with self.lock:
+            movies = list(self.movies.values())
+        if order == "desc":
+            movies.reverse()
+        movies = [
+            movie for movie in movies
+            if min_price <= movie["price"] <= max_price
+            and (not locations or movie["location"] in locations)
+            and (published is None or movie["published"] == published)
+            and (genre_id is None or movie["genreId"] == genre_id)
+        ]
+        offset = (page - 1) * page_size
+        return {
+            "movies": [self._movie_response(movie) for movie in movies[offset:offset + page_size]],
+            "count": len(movies),
+            "page": page,
+            "pageSize": page_size,
+            "pageCount": -(-len(movies) // page_size)
+        }
+
+    # --- сохранение между перезапусками ---
+
+    def dump(self, path):
+        with self.lock, open(path, "w", encoding="utf-8") as f:
+            json.dump({"users": self.users, "movies": list(self.movies.values()),
+                       "next_movie_id": self.next_movie_id}, f, ensure_ascii=False)
+
+    def load(self, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self.lock:
+            self.users = data["users"]
+            self.users_by_email = {user["email"]: user for user in self.users.values()}
+            self.movies = {movie["id"]: movie for movie in data["movies"]}
+            self.next_movie_id = data["next_movie_id"]
+
+
+class CinescopeStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, как у настоящего сервера
+    # Заголовки и тело уходят отдельными send(); без TCP_NODELAY Nagle + delayed ACK дают ~40 мс на ответ
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body=None, extra_headers=None):
+        payload = b"" if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD": # на HEAD - те же заголовки, что на GET, без тела
+            self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            raise ApiError(400, ["Некорректный JSON"], "Bad Request")
+
+    def _handle(self, method):
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        split = urlsplit(self.path)
+        path = split.path.rstrip("/") or "/"
+        try:
+            body = self._read_json() if method in ("POST", "PATCH", "PUT") else {}
+            if server.error_rate and random.random() < server.error_rate:
+                self._send_json(server.error_status, {"message": "Injected error"}, {"Retry-After": "1"})
+                return
+            status, response = self._route(method, path, parse_qs(split.query), body)
+            self._send_json(status, response)
+        except ApiError as e:
+            self._send_json(e.status, e.body)
+
+    def _route(self, method, path, query, body):
+        state = self.server.state
+        if path == REGISTER_ENDPOINT and method == "POST":
+            return 201, state.register(body)
+        if path == LOGIN_ENDPOINT and method == "POST":
+            return 200, state.login(body)
+
+        if path == MOVIES_ENDPOINT:
+            if method == "GET":
+                return 200, state.list_movies(query)
+            if method == "POST":
+                return 201, state.create_movie(state.user_from_token(self.headers.get("Authorization")), body)
+
+        match = MOVIE_ID_PATH.match(path)
+        if match:
+            movie_id = int(match.group(1))
+            if method == "GET":
+                return 200, state.get_movie(movie_id)
+            current_user = state.user_from_token(self.headers.get("Authorization"))
+            if method == "PATCH":
+                return 200, state.update_movie(current_user, movie_id, body)
+            if method == "DELETE":
+                return 200, state.delete_movie(current_user, movie_id)
+
+        match = USER_ID_PATH.match(path)
+        if match:
+            current_user = state.user_from_token(self.headers.get("Authorization"))
+            if method == "GET":
+                return 200, state.get_user(current_user, match.group(1))
+            if method == "DELETE":
+                state.delete_user(current_user, match.group(1))
+                return 204, None
+
+        raise ApiError(404, f"Cannot {method} {path}", "Not Found")
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_HEAD(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class CinescopeStubServer(ThreadingHTTPServer):
+    """
+    Локальный двойник auth- и movies-хостов Cinescope (оба API на одном порту).
+    :param latency: Фиксированная задержка каждого ответа, секунды.
+    :param jitter: Дополнительная случайная задержка от 0 до jitter секунд.
+    :param error_rate: Доля запросов (0..1), на которые отвечаем error_status.
+    :param error_status: Статус-код внедрённой ошибки.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self, host="127.0.0.1", port=8080, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 state=None):
+        super().__init__((host, port), CinescopeStubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.state = state or CinescopeState()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Запускает сервер в фоновом потоке и возвращает его base_url."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
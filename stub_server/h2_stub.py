@@ -0,0 +1,91 @@
+import json
+import socket
+import ssl
+import threading
+
+import h2.config
+import h2.connection
+import h2.events
+
+
+class H2EchoServer:
+    """
+    Минимальный HTTPS-сервер с HTTP/2 (ALPN h2) для проверки HTTP2Adapter.
+    На любой запрос отвечает 200 и JSON с методом, путём и заголовком Cookie запроса, выставляет cookie
+    h2session=1. Запросы (словари заголовков) сохраняются в self.requests.
+    :param certfile: PEM-сертификат сервера (должен быть выписан на host).
+    :param keyfile: PEM-ключ сертификата.
+    """
+
+    def __init__(self, certfile, keyfile, host="127.0.0.1", port=0):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(certfile, keyfile)
+        self.context.set_alpn_protocols(["h2"])
+        self.socket = socket.create_server((host, port))
+        self.requests = []
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.socket.getsockname()[:2]
+        return f"https://{host}:{port}"
+
+    def start(self):
+        """Запускает приём соединений в фоновом потоке и возвращает base_url."""
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.socket.shutdown(socket.SHUT_RDWR) # будит поток, ждущий в accept()
+        self.socket.close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.socket.accept()
+            except OSError: # сокет остановлен в stop()
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        try:
+            with self.context.wrap_socket(client, server_side=True) as tls:
+                connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+                connection.initiate_connection()
+                tls.sendall(connection.data_to_send())
+                headers = {}
+                while True:
+                    data = tls.recv(65535)
+                    if not data:
+                        return
+                    for event in connection.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            headers[event.stream_id] = {name.decode(): value.decode() for name, value in event.headers}
+                        elif isinstance(event, h2.events.DataReceived):
+                            connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            self._respond(connection, event.stream_id, headers.pop(event.stream_id))
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            tls.sendall(connection.data_to_send())
+                            return
+                    tls.sendall(connection.data_to_send())
+        except (OSError, ssl.SSLError):
+            return
+
+    def _respond(self, connection, stream_id, request_headers):
+        self.requests.append(request_headers)
+        body = json.dumps({
+            "method": request_headers[":method"],
+            "path": request_headers[":path"],
+            "cookie": request_headers.get("cookie"),
+        }).encode("utf-8")
+        connection.send_headers(stream_id, [
+            (":status", "200"),
+            ("content-type", "application/json"),
+            ("content-length", str(len(body))),
+            ("set-cookie", "h2session=1; Path=/"),
+        ])
+        connection.send_data(stream_id, body, end_stream=True)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from api.async_api_manager import AsyncApiManager
+from constants import ADMIN_CREDENTIALS, LOGIN_ENDPOINT, MOVIES_ENDPOINT
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from custom_requester.cassette import Cassette
+from custom_requester.custom_requester import CustomRequester
+from custom_requester.resilience import CircuitBreaker, RetryPolicy
+
+
+class TestAsyncAPI:
+    def test_concurrent_register_users(self, test_user, cleanup_registry):
+        """
+        Тест на одновременную регистрацию нескольких пользователей через AsyncApiManager.
+        Пользователи попадают в cleanup_registry и удаляются в конце сессии.
+        """
+        users = []
+        for i in range(5):
+            user = test_user.copy()
+            user["email"] = f"async{i}_{test_user['email']}"
+            users.append(user)
+
+        async def register_all():
+            async with AsyncApiManager.create(cleanup_registry=cleanup_registry) as manager:
+                responses = await asyncio.gather(*(manager.auth_api.register_user(user) for user in users))
+                return [response.json() for response in responses]
+
+        registered = asyncio.run(register_all())
+
+        assert [data["email"] for data in registered] == [user["email"] for user in users]
+        assert all("id" in data for data in registered), "ID пользователя отсутствует в ответе"
+        assert {data["id"] for data in registered} <= cleanup_registry.user_ids, "Пользователи не попали в реестр очистки"
+
+    def test_async_requests_share_retry_policy_and_circuit_breaker(self, stub_server, monkeypatch):
+        """
+        Тест на то, что асинхронные запросы повторяются по политике CustomRequester и размыкают общую цепь хоста.
+        """
+        monkeypatch.setattr(CustomRequester, "cassette", None)
+        monkeypatch.setattr(CustomRequester, "rate_limiter", None)
+        monkeypatch.setattr(CustomRequester, "retry_policy", RetryPolicy(max_attempts=3, max_retry_after=0))
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        monkeypatch.setattr(CustomRequester, "circuit_breakers", {stub_server.base_url: breaker})
+        stub_server.error_rate = 1.0
+        statuses = []
+
+        async def count_attempt(response):
+            statuses.append(response.status_code)
+
+        async def send_twice():
+            async with httpx.AsyncClient(event_hooks={"response": [count_attempt]}) as client:
+                requester = AsyncCustomRequester(client, stub_server.base_url)
+                response = await requester.send_request("GET", MOVIES_ENDPOINT)
+                with pytest.raises(pytest.fail.Exception, match="разомкнута"):
+                    await requester.send_request("GET", MOVIES_ENDPOINT)
+                return response
+
+        response = asyncio.run(send_twice())
+
+        assert response.status_code == 503
+        assert statuses == [503, 503, 503], "Запрос не повторён или повторён лишний раз"
+        assert breaker.state == "open"
+
+    def test_async_metrics_timings_and_replay_of_raw_body(self, stub_server, monkeypatch, tmp_path):
+        """
+        Тест на то, что асинхронные замеры содержат время соединения и первого байта, а ответ из кассеты
+        несёт то же сырое тело запроса (data), что было отправлено при записи.
+        """
+        monkeypatch.setattr(CustomRequester, "rate_limiter", None)
+        monkeypatch.setattr(CustomRequester, "circuit_breakers", {})
+        measured = []
+        CustomRequester.add_metrics_sink(measured.append)
+        body = json.dumps(ADMIN_CREDENTIALS).encode("utf-8")
+        path = str(tmp_path / "cassette.jsonl")
+
+        async def login(mode):
+            monkeypatch.setattr(CustomRequester, "cassette", Cassette(path, mode))
+            async with httpx.AsyncClient() as client:
+                requester = AsyncCustomRequester(client, stub_server.base_url)
+                response = await requester.send_request("POST", LOGIN_ENDPOINT, data=body, expected_status=200)
+            CustomRequester.cassette.close()
+            return response
+
+        recorded = asyncio.run(login("record"))
+        metrics = measured[0]
+        assert 0 < metrics.connect <= metrics.ttfb <= metrics.total, \
+            f"connect {metrics.connect}, ttfb {metrics.ttfb}, total {metrics.total}"
+        assert metrics.request_bytes == len(body)
+
+        replayed = asyncio.run(login("replay"))
+        assert replayed.request.content == recorded.request.content == body
+        assert replayed.json()["accessToken"] == recorded.json()["accessToken"]
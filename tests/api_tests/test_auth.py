@@ -1,4 +1,13 @@
+import os
+import time
+
 from api.api_manager import ApiManager
+from api.auth_api import AuthAPI
+from api.movies_api import MoviesAPI
+from constants import ADMIN_CREDENTIALS
+from utils.data_generator import DataGenerator
+from utils.token_cache import TokenCache
+from utils.user_pool import UserPool
 
 
 class TestAuthAPI:
@@ -64,3 +73,44 @@ class TestAuthAPI:
 
         assert response.status_code in (401, 500), "Ожидался статус 401 или 500"
 
+    @staticmethod
+    def _stub_apis(stub_server, stub_requester, tmp_path, refresh_margin=60):
+        auth_api = AuthAPI(stub_requester.session, stub_server.base_url)
+        auth_api.token_cache = TokenCache(str(tmp_path / "tokens.json"), refresh_margin=refresh_margin)
+        return auth_api, MoviesAPI(stub_requester.session, stub_server.base_url)
+
+    def test_cached_token_refreshed_before_expiry(self, stub_server, stub_requester, tmp_path):
+        """Тест на обновление токена из кэша по ходу сессии, до того как сервер перестанет его принимать."""
+        stub_server.state.token_ttl = 2
+        auth_api, movies_api = self._stub_apis(stub_server, stub_requester, tmp_path, refresh_margin=1)
+        first_token = auth_api.authenticate(ADMIN_CREDENTIALS)
+        assert first_token, "Токен не получен"
+        assert os.stat(auth_api.token_cache.path).st_mode & 0o777 == 0o600, "Файл кэша токенов доступен не только владельцу"
+
+        time.sleep(2.1) # первый токен истёк на сервере
+
+        response = movies_api.create_movie(DataGenerator.generate_movie_data(), expected_status=201)
+        assert response.request.headers["Authorization"] != f"Bearer {first_token}"
+
+    def test_rejected_cached_token_replaced_on_401(self, stub_server, stub_requester, tmp_path):
+        """Тест на замену токена, отвергнутого сервером (401), и повтор запроса с новым."""
+        auth_api, movies_api = self._stub_apis(stub_server, stub_requester, tmp_path)
+        first_token = auth_api.authenticate(ADMIN_CREDENTIALS)
+        stub_server.state.token_secret = b"rotated" # все выданные токены больше не действительны
+
+        response = movies_api.create_movie(DataGenerator.generate_movie_data(), expected_status=201)
+        assert [item.status_code for item in response.history] == [401]
+        assert auth_api.session.auth.token() != first_token
+
+    def test_user_pool_file_readable_only_by_owner(self, stub_server, stub_requester, tmp_path):
+        """Тест на то, что файл пула пользователей (пароли в открытом виде) создаётся с правами 0600."""
+        api_manager = ApiManager(session=stub_requester.session)
+        api_manager.auth_api = AuthAPI(stub_requester.session, stub_server.base_url)
+        pool = UserPool(api_manager, path=str(tmp_path / "users.json"), size=2)
+        pool.ensure()
+
+        assert os.stat(pool.path).st_mode & 0o777 == 0o600, "Файл пула пользователей доступен не только владельцу"
+        user = pool.lease()
+        assert api_manager.auth_api.login_user({"email": user["email"], "password": user["password"]}).status_code == 200
+        pool.release(user)
+        pool.close()
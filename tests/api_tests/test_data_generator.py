@@ -0,0 +1,52 @@
+from constants import MOVIES_ENDPOINT
+from custom_requester.cassette import Cassette
+from custom_requester.custom_requester import CustomRequester
+from utils.data_generator import DataGenerator, UniqueIdAllocator
+
+
+class TestUniqueIdAllocator:
+    def test_same_run_and_worker_reproduce_ids(self):
+        """
+        Тест на то, что одинаковые run_id и воркер дают ту же последовательность ID (так её повторяет
+        воспроизведение кассеты), а reset() начинает её заново.
+        """
+        allocator = UniqueIdAllocator("run-1", "gw2")
+        recorded = [allocator.next_id() for _ in range(50)]
+
+        replayed = UniqueIdAllocator("run-1", "gw2")
+        assert [replayed.next_id() for _ in range(50)] == recorded
+        allocator.reset("run-1", "gw2")
+        assert [allocator.next_id() for _ in range(50)] == recorded
+        assert UniqueIdAllocator("run-2", "gw2").next_id() != recorded[0]
+
+    def test_ids_unique_across_workers(self):
+        """
+        Тест на отсутствие коллизий между воркерами одного прогона, в том числе gw1 и gw11.
+        """
+        allocators = [UniqueIdAllocator("run-1", worker) for worker in ("", "gw1", "gw11", "gw2")]
+        ids = [allocator.next_id() for allocator in allocators for _ in range(2000)]
+
+        assert len(set(ids)) == len(ids), "ID разных воркеров совпали"
+        assert all(identifier.isalnum() and identifier.islower() for identifier in ids)
+
+    def test_ids_reproduced_on_cassette_replay(self, stub_server, stub_requester, monkeypatch, tmp_path):
+        """
+        Тест на то, что воспроизведение кассеты получает run_id записи и выдаёт те же email и названия,
+        что при записи (как в pytest_runtest_setup: run_id кассеты + nodeid теста).
+        """
+        path = str(tmp_path / "cassette.jsonl")
+        nodeid = "tests/api_tests/test_movies.py::TestMoviesAPI::test_create_movie_as_admin"
+
+        def generated_data(cassette):
+            ids = UniqueIdAllocator(f"{cassette.run_id}:{nodeid}", worker_id="")
+            return list(DataGenerator.users(3, seed=1, ids=ids)), list(DataGenerator.movies(3, seed=1, ids=ids))
+
+        recording = Cassette(path, "record")
+        monkeypatch.setattr(CustomRequester, "cassette", recording)
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=200)
+        recorded = generated_data(recording)
+        recording.close()
+
+        replay = Cassette(path, "replay")
+        assert replay.run_id == recording.run_id, "Воспроизведение не получило run_id записи"
+        assert generated_data(replay) == recorded
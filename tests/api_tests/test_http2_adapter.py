@@ -0,0 +1,77 @@
+import shutil
+import subprocess
+
+import pytest
+import requests
+
+from custom_requester.http2_adapter import HTTP2Adapter
+from stub_server.h2_stub import H2EchoServer
+
+
+@pytest.fixture(scope="module")
+def h2_server(tmp_path_factory):
+    """HTTPS-сервер с HTTP/2 на самоподписанном сертификате для 127.0.0.1."""
+    if shutil.which("openssl") is None:
+        pytest.skip("Для сертификата тестового сервера нужен openssl")
+    directory = tmp_path_factory.mktemp("h2")
+    certfile, keyfile = str(directory / "cert.pem"), str(directory / "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1", "-keyout", keyfile, "-out", certfile],
+        check=True, capture_output=True
+    )
+    server = H2EchoServer(certfile, keyfile)
+    server.start()
+    server.certfile = certfile
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def h2_session(h2_server):
+    """Сессия requests с HTTP2Adapter на h2_server; verify - сертификат сервера."""
+    session = requests.Session()
+    session.trust_env = False # иначе REQUESTS_CA_BUNDLE окружения перекроет verify сессии
+    session.verify = h2_server.certfile
+    adapter = HTTP2Adapter(verify=h2_server.certfile)
+    session.mount(h2_server.base_url, adapter)
+    yield session, adapter
+    session.close()
+
+
+class TestHTTP2Adapter:
+    def test_requests_negotiate_http2(self, h2_server, h2_session):
+        """
+        Тест на то, что запросы через HTTP2Adapter согласуют HTTP/2 (ALPN) и идут потоками одного соединения.
+        """
+        session, adapter = h2_session
+        for path in ("/movies", "/movies/1"):
+            response = session.get(f"{h2_server.base_url}{path}")
+            assert response.status_code == 200
+            assert response.json()["path"] == path
+
+        stats = adapter.stats()
+        assert stats["http2"] == 2, f"Ответов по HTTP/2: {stats['http2']}"
+        assert stats["new_connections"] == 1, "Второй запрос открыл новое соединение"
+
+    def test_cookies_follow_session_jar(self, h2_server, h2_session):
+        """
+        Тест на то, что cookies запроса берутся только из сессии requests: очищенная cookie
+        не возвращается из собственной банки httpx.
+        """
+        session, _ = h2_session
+        session.get(f"{h2_server.base_url}/login")
+        assert session.cookies.get("h2session") == "1", "Cookie из ответа HTTP/2 не попала в сессию"
+        assert session.get(f"{h2_server.base_url}/me").json()["cookie"] == "h2session=1"
+
+        session.cookies.clear()
+        assert session.get(f"{h2_server.base_url}/me").json()["cookie"] is None, \
+            "Запрос отправил cookie, удалённую из сессии"
+
+    def test_request_with_other_verify_rejected(self, h2_server, h2_session):
+        """
+        Тест на то, что verify запроса, отличный от verify адаптера, не игнорируется молча.
+        """
+        session, _ = h2_session
+        with pytest.raises(ValueError, match="verify"):
+            session.get(f"{h2_server.base_url}/movies", verify=False)
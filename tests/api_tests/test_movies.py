@@ -1,5 +1,18 @@
 import random
 import string
+from functools import partial
+from itertools import islice
+
+import pytest
+
+from api.api_manager import ApiManager
+from api.auth_api import AuthAPI
+from api.movies_api import MoviesAPI
+from constants import ADMIN_CREDENTIALS
+from custom_requester.deadline import deadline
+from utils.catalog_mirror import CatalogMirror
+from utils.data_generator import DataGenerator
+from utils.filter_oracle import FilterOracle, filter_combinations
 
 class TestMoviesAPI:
 
@@ -53,49 +66,202 @@ class TestMoviesAPI:
 
         print(f"Код ответа {response.status_code}, Текст ответа: {response.text}")
 
-    def test_create_and_get_movie_id_as_admin(self, authorized_api_manager, create_movie_data):
+    def test_iter_movies(self, authorized_api_manager, create_movie_data):
         """
-        Тест на создание фильма с использованием токена админа и его поиск по ID.
+        Тест на постраничный обход афиши через iter_movies.
         """
-        # Сначала создаем фильм
-        response = authorized_api_manager.movies_api.create_movie(create_movie_data)
+        # Гарантируем, что под фильтр попадает хотя бы один фильм
+        authorized_api_manager.movies_api.create_movie(create_movie_data)
+        filters = {"locations": [create_movie_data["location"]], "published": True}
 
-        created_movie = response.json()
-        movie_id = created_movie["id"]
-        print(f"Фильм создан с ID: {movie_id}")
+        movies = list(islice(authorized_api_manager.movies_api.iter_movies(filters, page_size=10), 25))
+
+        assert movies, "Итератор не вернул ни одного фильма"
+        movie_ids = [movie["id"] for movie in movies]
+        assert len(movie_ids) == len(set(movie_ids)), "Фильмы на разных страницах повторяются"
+        for movie in movies:
+            assert movie["location"] in filters["locations"]
+            assert movie["published"] == filters["published"]
+
+    def test_catalog_mirror_incremental_sync(self, stub_server, stub_requester):
+        """
+        Тест на инкрементальную синхронизацию локальной копии афиши (на двойнике теста: полная синхронизация
+        читает весь каталог, на общем стенде это запрос на каждую страницу афиши).
+        """
+        movies_api = self._stub_movies_api(stub_server, stub_requester)
+        for movie_data in DataGenerator.movies(5, seed=3):
+            movies_api.create_movie(movie_data)
+        mirror = CatalogMirror(movies_api, page_size=2)
+        assert mirror.full_sync() == 5
+
+        movie = movies_api.create_movie(DataGenerator.generate_movie_data()).json()
+        assert movie["id"] not in mirror
+
+        assert mirror.sync() >= 1, "Синхронизация не догрузила новый фильм"
+        assert mirror.by_id[movie["id"]]["name"] == movie["name"]
+
+        # Фильтр, под который новый фильм точно попадает, считается локально и совпадает с API
+        params = {
+            "pageSize": 100,
+            "minPrice": movie["price"],
+            "maxPrice": movie["price"],
+            "locations": [movie["location"]],
+            "published": movie["published"],
+            "createdAt": "asc"
+        }
+        expected_ids = mirror.filter_ids(params)
+        assert movie["id"] in expected_ids
+        assert all(mirror.by_id[movie_id]["price"] == movie["price"] for movie_id in expected_ids)
+        api_ids = [item["id"] for item in movies_api.get_movies(params=params).json()["movies"]]
+        assert movie["id"] in api_ids
+
+    @staticmethod
+    def _stub_movies_api(stub_server, stub_requester):
+        """MoviesAPI двойника теста с токеном администратора."""
+        AuthAPI(stub_requester.session, stub_server.base_url).authenticate(ADMIN_CREDENTIALS, use_cache=False)
+        return MoviesAPI(stub_requester.session, stub_server.base_url)
+
+    def test_catalog_mirror_sync_picks_up_movie_created_between_passes(self, stub_server, stub_requester,
+                                                                         monkeypatch):
+        """
+        Тест на фильм, созданный между чтением опубликованных и неопубликованных фильмов:
+        текущая синхронизация его пропускает, следующая - догружает.
+        """
+        movies_api = self._stub_movies_api(stub_server, stub_requester)
+        for movie_data in DataGenerator.movies(5, seed=7):
+            movies_api.create_movie(movie_data)
+        mirror = CatalogMirror(movies_api, page_size=2)
+        mirror.full_sync()
+
+        iter_movies = movies_api.iter_movies
+        created = []
+
+        def create_before_unpublished_pass(filters=None, page_size=100):
+            if filters["published"] is False and not created:
+                created.append(movies_api.create_movie({**DataGenerator.generate_movie_data(), "published": True}).json())
+            return iter_movies(filters, page_size=page_size)
+
+        monkeypatch.setattr(movies_api, "iter_movies", create_before_unpublished_pass)
+        mirror.sync()
+        movie = created[0]
+        assert movie["id"] not in mirror, "Фильм создан после чтения опубликованных - эта синхронизация его не видит"
+
+        assert mirror.sync() >= 1
+        assert movie["id"] in mirror
+        params = {"pageSize": 100, "published": True}
+        assert mirror.filter_ids(params) == [item["id"] for item in movies_api.get_movies(params=params).json()["movies"]]
+
+    def test_catalog_mirror_deleted_movies(self, stub_server, stub_requester):
+        """
+        Тест на удалённые фильмы: sync() удаления не видит, discard() и full_sync() убирают фильм из копии
+        и индексов; удаление самого нового фильма не мешает догрузить следующий.
+        """
+        movies_api = self._stub_movies_api(stub_server, stub_requester)
+        movies = [movies_api.create_movie(movie_data).json() for movie_data in DataGenerator.movies(4, seed=11)]
+        mirror = CatalogMirror(movies_api)
+        mirror.full_sync()
+
+        oldest, newest = movies[0], movies[-1]
+        movies_api.delete_movie(oldest["id"])
+        mirror.sync()
+        assert oldest["id"] in mirror, "Инкрементальная синхронизация не должна видеть удаления"
+        mirror.discard(oldest["id"])
+        assert oldest["id"] not in mirror
+        assert oldest["id"] not in mirror.filter_ids({"pageSize": 100})
+        assert oldest["id"] not in mirror.by_location.get(oldest["location"], set())
+
+        movies_api.delete_movie(newest["id"])
+        movie = movies_api.create_movie(DataGenerator.generate_movie_data()).json()
+        assert mirror.sync() >= 1
+        assert movie["id"] in mirror, "После удаления самого нового фильма синхронизация не догрузила следующий"
+
+        assert mirror.full_sync() == 3
+        assert newest["id"] not in mirror
+        expected_ids = [item["id"] for item in movies_api.get_movies(params={"pageSize": 100}).json()["movies"]]
+        assert mirror.filter_ids({"pageSize": 100}) == expected_ids
+
+    def test_get_movies_filter_combinations(self, stub_server, stub_requester):
+        """
+        Тест на фильтры, пагинацию и сортировку get_movies по всей сетке сочетаний параметров
+        на собственном двойнике теста: афишу никто не меняет параллельно, стенд не получает сотни запросов.
+        """
+        admin = stub_server.state.users_by_email[ADMIN_CREDENTIALS["email"]]
+        for movie_data in DataGenerator.movies(60, seed=2024):
+            stub_server.state.create_movie(admin, movie_data)
+        api_manager = ApiManager(stub_requester.session)
+        api_manager.movies_api = MoviesAPI(stub_requester.session, stub_server.base_url)
+        oracle = FilterOracle(api_manager, CatalogMirror(api_manager.movies_api))
+
+        report = oracle.run(filter_combinations())
+
+        print(report)
+        assert len(report.checks) == len(filter_combinations())
+        assert not report.mismatches, f"get_movies расходится с ожидаемым результатом:\n{report}"
+        assert not report.rechecked, "Афиша двойника изменилась во время проверки"
+
+    def test_free_movie_listed_with_default_filters(self, stub_server, stub_requester):
+        """
+        Тест на то, что фильм с минимальной допустимой ценой (0) попадает в get_movies без фильтра по цене.
+        """
+        movies_api = self._stub_movies_api(stub_server, stub_requester)
+        movie = movies_api.create_movie({**DataGenerator.generate_movie_data(), "price": 0}).json()
+
+        listed_ids = [item["id"] for item in movies_api.get_movies().json()["movies"]]
+        assert movie["id"] in listed_ids, "Фильм с ценой 0 создан, но не виден в афише"
+
+        mirror = CatalogMirror(movies_api)
+        mirror.full_sync()
+        assert mirror.filter_ids() == [movie["id"]]
+
+    @pytest.mark.filter_oracle
+    def test_get_movies_filter_combinations_on_stand(self, authorized_api_manager):
+        """
+        Тест на фильтры get_movies по всей сетке сочетаний на тестовом стенде (запускается с --filter-oracle).
+        """
+        oracle = FilterOracle(authorized_api_manager, CatalogMirror(authorized_api_manager.movies_api))
+
+        report = oracle.run(filter_combinations())
+
+        print(report)
+        assert len(report.checks) == len(filter_combinations())
+        assert not report.mismatches, f"get_movies расходится с ожидаемым результатом:\n{report}"
 
-        # Теперь получаем фильм по ID
+    def test_get_movie_by_id_as_admin(self, authorized_api_manager, shared_movie):
+        """
+        Тест на поиск фильма по ID с использованием токена админа (фильм из общего пула).
+        """
+        movie_id = shared_movie["id"]
+
+        # Получаем фильм по ID
         get_response = authorized_api_manager.movies_api.get_movie_by_id(movie_id)
 
         movie_data_by_id = get_response.json()
 
         # Проверяем данные полученного фильма
         assert movie_data_by_id["id"] == movie_id
-        assert movie_data_by_id["name"] == create_movie_data["name"]
-        assert movie_data_by_id["price"] == create_movie_data["price"]
-        assert movie_data_by_id["description"] == create_movie_data["description"]
-        assert movie_data_by_id["imageUrl"] == create_movie_data["imageUrl"]
-        assert movie_data_by_id["location"] == create_movie_data["location"]
-        assert movie_data_by_id["published"] == create_movie_data["published"]
-        assert movie_data_by_id["genreId"] == create_movie_data["genreId"]
+        assert movie_data_by_id["name"] == shared_movie["name"]
+        assert movie_data_by_id["price"] == shared_movie["price"]
+        assert movie_data_by_id["description"] == shared_movie["description"]
+        assert movie_data_by_id["imageUrl"] == shared_movie["imageUrl"]
+        assert movie_data_by_id["location"] == shared_movie["location"]
+        assert movie_data_by_id["published"] == shared_movie["published"]
+        assert movie_data_by_id["genreId"] == shared_movie["genreId"]
         assert "createdAt" in movie_data_by_id
         assert "reviews" in movie_data_by_id
         assert "genre" in movie_data_by_id
         assert "name" in movie_data_by_id["genre"]
 
-        print(f"✅ Фильм успешно создан и получен по ID {movie_id}")
+        print(f"✅ Фильм получен по ID {movie_id}")
         print(f"Название: {movie_data_by_id['name']}")
         print(f"Жанр: {movie_data_by_id['genre']['name']}")
         print(f"Статус публикации: {movie_data_by_id['published']}")
 
-    def test_update_movie_as_admin(self, authorized_api_manager, create_movie_data):
+    def test_update_movie_as_admin(self, authorized_api_manager, leased_movie):
         """
         Тест на редактирование фильма с использованием токена админа.
         """
-        # Сначала создаем фильм
-        create_response = authorized_api_manager.movies_api.create_movie(create_movie_data)
-        assert create_response.status_code == 201
-        movie_id = create_response.json()["id"]
+        # Собственная копия фильма из пула - её можно менять
+        movie_id = leased_movie["id"]
         print(f"Фильм создан с ID: {movie_id}")
 
         # Генерируем уникальные данные
@@ -123,23 +289,19 @@ class TestMoviesAPI:
         assert movie_from_get["price"] == update_data["price"]
 
         # Проверяем, что остальные данные не изменились
-        assert movie_from_get["description"] == create_movie_data["description"]
-        assert movie_from_get["imageUrl"] == create_movie_data["imageUrl"]
-        assert movie_from_get["location"] == create_movie_data["location"]
-        assert movie_from_get["published"] == create_movie_data["published"]
-        assert movie_from_get["genreId"] == create_movie_data["genreId"]
+        assert movie_from_get["description"] == leased_movie["description"]
+        assert movie_from_get["imageUrl"] == leased_movie["imageUrl"]
+        assert movie_from_get["location"] == leased_movie["location"]
+        assert movie_from_get["published"] == leased_movie["published"]
+        assert movie_from_get["genreId"] == leased_movie["genreId"]
 
         print(f"✅ Фильм с ID {movie_id} успешно отредактирован и изменения сохранены в БД")
 
-    def test_delete_movie(self, authorized_api_manager, create_movie_data):
+    def test_delete_movie(self, authorized_api_manager, leased_movie):
         """
-        Тест на создание фильма с использованием токена админа и его удаление.
+        Тест на удаление фильма с использованием токена админа.
         """
-        # Сначала создаем фильм
-        response = authorized_api_manager.movies_api.create_movie(create_movie_data)
-
-        created_movie = response.json()
-        movie_id = created_movie["id"]
+        movie_id = leased_movie["id"]
         print(f"Фильм создан с ID: {movie_id}")
 
         # Удаляем фильм и проверяем результат
@@ -152,6 +314,71 @@ class TestMoviesAPI:
         assert get_response.status_code == 404
         print("Фильм успешно удален и больше не доступен")
 
+    @pytest.mark.deadline(30)
+    def test_batch_create_and_get_movies(self, authorized_api_manager, create_movie_data):
+        """
+        Тест на пакетное создание фильмов и их параллельное получение по ID.
+        """
+        movies_data = []
+        for _ in range(3):
+            movie_data = create_movie_data.copy()
+            movie_data["name"] = DataGenerator.generate_movie_title()
+            movies_data.append(movie_data)
+
+        with authorized_api_manager.batch() as batch:
+            for movie_data in movies_data:
+                batch.add(authorized_api_manager.movies_api.create_movie, movie_data)
+        movie_ids = [response.json()["id"] for response in batch.results]
+
+        get_responses = authorized_api_manager.gather(
+            [partial(authorized_api_manager.movies_api.get_movie_by_id, movie_id) for movie_id in movie_ids]
+        )
+
+        # Результаты приходят в порядке вызовов
+        for movie_id, movie_data, get_response in zip(movie_ids, movies_data, get_responses):
+            movie_from_get = get_response.json()
+            assert movie_from_get["id"] == movie_id
+            assert movie_from_get["name"] == movie_data["name"]
+
+    def test_create_movies_bulk(self, authorized_api_manager):
+        """
+        Тест на массовое создание фильмов.
+        """
+        count = 5
+        report = authorized_api_manager.movies_api.create_movies_bulk(
+            DataGenerator.movies(count),
+            concurrency=3
+        )
+
+        assert not report.failures, f"Ошибки при массовом создании: {report.failures}"
+        assert len(report.created_ids) == count
+        assert len(set(report.created_ids)) == count, "ID созданных фильмов повторяются"
+        print(report)
+
+    def test_create_movies_bulk_collects_any_error(self, authorized_api_manager, monkeypatch):
+        """
+        Тест на то, что любое исключение при создании одного фильма попадает в failures отчёта,
+        а остальные фильмы создаются.
+        """
+        movies_api = authorized_api_manager.movies_api
+        create_movie = movies_api.create_movie
+        broken_name = "Сломанный фильм"
+
+        def create_or_break(movie_data, expected_status=201):
+            if movie_data["name"] == broken_name:
+                raise ValueError("Некорректный ответ сервера")
+            return create_movie(movie_data, expected_status=expected_status)
+
+        monkeypatch.setattr(movies_api, "create_movie", create_or_break)
+        movies = list(DataGenerator.movies(4))
+        movies[1] = {**movies[1], "name": broken_name}
+        report = movies_api.create_movies_bulk(movies, concurrency=2)
+
+        assert len(report.created_ids) == 3 and len(report.created_movies) == 3
+        assert [(movie_data["name"], status_code) for movie_data, status_code, _ in report.failures] == \
+               [(broken_name, None)]
+        assert "ValueError" in report.failures[0][2]
+
 class TestNegativeMoviesAPI:
     def test_create_unpublished_movie_with_invalid_location(self, authorized_api_manager, create_movie_data):
         """
@@ -207,6 +434,14 @@ class TestNegativeMoviesAPI:
         assert response.status_code == 200, f"Ожидалась ошибка 400 без параметров, но получен {response.status_code}"
         print(f"Без pageSize: код {response.status_code}, ответ: {response.text}")
 
+    def test_get_movies_with_exhausted_deadline(self, authorized_api_manager):
+        """
+        Негативный тест: при исчерпанном бюджете времени запрос не отправляется, тест падает с ошибкой таймаута.
+        """
+        with deadline(0):
+            with pytest.raises(pytest.fail.Exception, match="Таймаут"):
+                authorized_api_manager.movies_api.get_movies()
+
     def test_get_movie_by_nonexistent_id(self, authorized_api_manager):
         """
         Негативный тест: поиск фильма по несуществующему ID.
@@ -225,14 +460,11 @@ class TestNegativeMoviesAPI:
         print(f"Тест пройден: для несуществующего ID {nonexistent_id} получена ожидаемая ошибка 404")
         print(f"Сообщение об ошибке: {response_data}")
 
-    def test_update_movie_with_empty_data(self, authorized_api_manager, create_movie_data):
+    def test_update_movie_with_empty_data(self, authorized_api_manager, leased_movie):
         """
         Тест: обновление фильма с пустыми данными.
         """
-        # Сначала создаем фильм
-        create_response = authorized_api_manager.movies_api.create_movie(create_movie_data)
-        assert create_response.status_code == 201
-        created_movie = create_response.json()
+        created_movie = leased_movie
         movie_id = created_movie["id"]
         print(f"Фильм создан с ID: {movie_id}")
 
@@ -269,14 +501,12 @@ class TestNegativeMoviesAPI:
         assert "message" in response_data
         print(f"Несуществующий ID: код {response.status_code}, ошибка: {response_data['message']}")
 
-    def test_update_movie_with_invalid_data(self, authorized_api_manager, create_movie_data):
+    def test_update_movie_with_invalid_data(self, authorized_api_manager, leased_movie):
         """
         Негативный тест: обновление фильма с невалидными типами данных.
         """
-        # Сначала создаем фильм
-        create_response = authorized_api_manager.movies_api.create_movie(create_movie_data)
-        assert create_response.status_code == 201
-        movie_id = create_response.json()["id"]
+        # Копия из пула: если сервер всё же применит изменения, общий фильм не пострадает
+        movie_id = leased_movie["id"]
 
         # Пытаемся обновить с невалидными данными
         invalid_data = {
@@ -0,0 +1,45 @@
+import pytest
+import requests
+
+from constants import MOVIES_ENDPOINT
+from custom_requester.cached_response import CachedResponse
+from custom_requester.custom_requester import CustomRequester
+from custom_requester.metrics import InMemoryHistogramSink, RequestMetrics
+
+
+class TestCachedResponse:
+    def test_invalid_json_raises_requests_error(self):
+        """
+        Тест на то, что ошибка декодирования тела - requests.exceptions.JSONDecodeError, как у requests.Response.
+        """
+        response = requests.Response()
+        response.status_code = 502
+        response._content = b"<html>Bad Gateway</html>"
+
+        with pytest.raises(requests.exceptions.JSONDecodeError):
+            CachedResponse(response).json()
+
+
+class TestRequestMetrics:
+    def test_histograms_keyed_by_host(self):
+        """
+        Тест на то, что гистограммы одного эндпоинта на разных хостах не смешиваются.
+        """
+        sink = InMemoryHistogramSink()
+        sink(RequestMetrics("GET", "https://auth.example.com", "/movies", status_code=200, total=0.01))
+        sink(RequestMetrics("GET", "https://api.example.com", "/movies", status_code=503, total=0.02, attempt=2))
+
+        assert sorted(sink.histograms) == ["GET api.example.com/movies", "GET auth.example.com/movies"]
+        assert sink.status_counts["GET auth.example.com/movies"] == {200: 1}
+        assert "GET auth.example.com/movies" not in sink.retries
+
+    def test_stub_traffic_kept_out_of_session_sinks(self, request, monkeypatch):
+        """
+        Тест на то, что запросы к собственному двойнику теста не попадают в приёмники прогона.
+        """
+        session_sink = InMemoryHistogramSink()
+        monkeypatch.setattr(CustomRequester, "metrics_sinks", [session_sink])
+        stub_requester = request.getfixturevalue("stub_requester")
+
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=200)
+        assert not session_sink.histograms, f"Замеры двойника попали в сводку: {session_sink.summary()}"
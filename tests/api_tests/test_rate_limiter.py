@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import pytest
+
+from custom_requester.deadline import DeadlineExceeded, deadline
+from custom_requester.rate_limiter import RateLimiter, TokenBucket
+
+# Берёт токены из общего ведра без ожидания и печатает, сколько удалось взять
+_TAKE_SCRIPT = """
+import sys
+from custom_requester.rate_limiter import TokenBucket
+bucket = TokenBucket(sys.argv[1], rate=float(sys.argv[2]), burst=float(sys.argv[3]))
+print(sum(bucket._try_take() == 0 for _ in range(int(sys.argv[4]))))
+"""
+
+
+class TestRateLimiter:
+    def test_parse_rule(self):
+        """
+        Тест на разбор правила --rate-limit и отказ от нулевой и отрицательной скорости.
+        """
+        assert RateLimiter.parse_rule("http://host/movies/=5:10") == ("http://host/movies", (5.0, 10.0))
+        assert RateLimiter.parse_rule("http://host=0.5") == ("http://host", (0.5, None))
+        for rule in ("http://host=0", "http://host=-1", "http://host=5:0"):
+            with pytest.raises(ValueError):
+                RateLimiter.parse_rule(rule)
+
+    def test_acquire_fails_when_token_is_beyond_deadline(self, tmp_path):
+        """
+        Тест на то, что ожидание токена не выходит за бюджет времени: DeadlineExceeded вместо сна.
+        """
+        bucket = TokenBucket(str(tmp_path / "bucket"), rate=0.1, burst=1)
+        assert bucket.acquire() == 0
+
+        with deadline(1), pytest.raises(DeadlineExceeded):
+            bucket.acquire() # следующий токен - через 10 с
+
+        bucket.rate = 1000 # пропущенный из-за бюджета запрос не израсходовал токен
+        assert bucket.acquire() < 0.01
+
+    def test_tokens_shared_between_processes(self, tmp_path, request):
+        """
+        Тест на то, что процессы (как воркеры xdist) делят одно ведро: вместе они берут не больше burst токенов.
+        """
+        path = str(tmp_path / "bucket")
+        processes = [
+            subprocess.Popen([sys.executable, "-c", _TAKE_SCRIPT, path, "0.001", "10", "5"],
+                             cwd=request.config.rootpath, stdout=subprocess.PIPE, text=True)
+            for _ in range(4)
+        ]
+        taken = [int(process.communicate(timeout=60)[0]) for process in processes]
+
+        assert sum(taken) == 10, f"Взято токенов по процессам: {taken}, ёмкость ведра 10"
@@ -0,0 +1,204 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from api.auth_api import AuthAPI
+from api.movies_api import MoviesAPI
+from api.user_api import UserAPI
+from constants import ADMIN_CREDENTIALS, MOVIES_ENDPOINT
+from custom_requester.cassette import Cassette
+from custom_requester.custom_requester import CustomRequester
+from custom_requester.deadline import deadline
+from custom_requester.resilience import CircuitBreaker, RetryPolicy
+from utils.cleanup_registry import CleanupRegistry
+
+
+class FakeClock:
+    """Поддельные часы: время идёт только через sleep(), паузы запоминаются."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestResilience:
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Поддельные часы вместо пауз между повторами CustomRequester."""
+        fake_clock = FakeClock()
+        monkeypatch.setattr(time, "sleep", fake_clock.sleep)
+        return fake_clock
+
+    @staticmethod
+    def _count_attempts(requester):
+        """Статусы всех ответов сервера, включая повторённые попытки."""
+        statuses = []
+        requester.session.hooks["response"].append(lambda response, *args, **kwargs: statuses.append(
+            response.status_code))
+        return statuses
+
+    @staticmethod
+    def _open_circuit(stub_server, requester):
+        """Размыкает цепь хоста stub_server одним отказом; пробный запрос разрешается сразу."""
+        requester.retry_policy = None
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        requester.circuit_breakers[requester.base_url] = breaker
+        stub_server.error_rate = 1.0
+        requester.send_request("GET", MOVIES_ENDPOINT, expected_status=503)
+        stub_server.error_rate = 0.0
+        assert breaker.state == "open"
+        return breaker
+
+    def test_exhausted_deadline_does_not_hold_half_open_probe(self, stub_server, stub_requester):
+        """
+        Тест на то, что исчерпанный бюджет времени не занимает пробный запрос полуоткрытой цепи навсегда.
+        """
+        breaker = self._open_circuit(stub_server, stub_requester)
+
+        with deadline(0), pytest.raises(pytest.fail.Exception, match="Таймаут"):
+            stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=200)
+
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=200)
+        assert breaker.state == "closed"
+
+    def test_failed_probe_without_response_releases_circuit(self, stub_server, stub_requester, monkeypatch,
+                                                            tmp_path):
+        """
+        Тест на то, что исключение внутри пробного запроса (промах кассеты) не оставляет цепь полуоткрытой.
+        """
+        breaker = self._open_circuit(stub_server, stub_requester)
+
+        monkeypatch.setattr(CustomRequester, "cassette", Cassette(str(tmp_path / "empty.jsonl"), "replay"))
+        with pytest.raises(pytest.fail.Exception, match="нет записи"):
+            stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=200)
+        assert breaker.state == "half_open" and not breaker._probe_in_flight
+
+        monkeypatch.setattr(CustomRequester, "cassette", None)
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=200)
+        assert breaker.state == "closed"
+
+    def test_drain_continues_after_failed_delete(self, stub_server, stub_requester, monkeypatch):
+        """
+        Тест на то, что очистка реестра не прерывается на удалении, упавшем с ошибкой (разомкнутая цепь),
+        и возвращает такие сущности в списке неудалённых.
+        """
+        monkeypatch.setattr(CustomRequester, "circuit_breakers", {})
+        monkeypatch.setattr(AuthAPI, "token_cache", None)
+        # Пользователи удаляются через другое имя того же хоста - у него своя, замкнутая цепь
+        users_url = stub_server.base_url.replace("127.0.0.1", "localhost")
+        auth_api = AuthAPI(stub_requester.session, users_url)
+        auth_api.authenticate(ADMIN_CREDENTIALS)
+        api_manager = SimpleNamespace(
+            movies_api=MoviesAPI(stub_requester.session, stub_server.base_url),
+            user_api=UserAPI(stub_requester.session, users_url),
+        )
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        CustomRequester.circuit_breakers[stub_server.base_url] = breaker
+
+        registry = CleanupRegistry()
+        registry.add_movie(1001)
+        registry.add_movie(1002)
+        registry.add_user("missing-user") # 404 - считается удалённым
+
+        failed = registry.drain(api_manager)
+
+        assert sorted(entity_id for entity_id, _ in failed) == [1001, 1002]
+        assert all("разомкнута" in str(error) for _, error in failed)
+        assert not registry.movie_ids and not registry.user_ids
+
+    def test_circuit_breaker_state_transitions(self, stub_server, stub_requester, clock):
+        """
+        Тест на переходы размыкателя цепи: closed -> open после серии отказов, open -> half_open
+        по истечении reset_timeout, неудачная проба снова размыкает цепь, удачная - замыкает.
+        """
+        stub_requester.retry_policy = None
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock.monotonic)
+        stub_requester.circuit_breakers[stub_requester.base_url] = breaker
+        statuses = self._count_attempts(stub_requester)
+
+        stub_server.error_rate = 1.0
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=503)
+        assert breaker.state == "closed", "Цепь разомкнулась раньше порога отказов"
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=503)
+        assert breaker.state == "open"
+
+        with pytest.raises(pytest.fail.Exception, match="разомкнута"):
+            stub_requester.send_request("GET", MOVIES_ENDPOINT)
+        assert len(statuses) == 2, "Запрос при разомкнутой цепи дошёл до сервера"
+
+        clock.sleep(10)
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=503) # неудачная проба
+        assert breaker.state == "open"
+        with pytest.raises(pytest.fail.Exception, match="разомкнута"):
+            stub_requester.send_request("GET", MOVIES_ENDPOINT)
+
+        clock.sleep(10)
+        stub_server.error_rate = 0.0
+        stub_requester.send_request("GET", MOVIES_ENDPOINT, expected_status=200) # удачная проба
+        assert breaker.state == "closed" and breaker.failures == 0
+        assert statuses == [503, 503, 503, 200]
+
+    def test_half_open_circuit_allows_single_probe(self, clock):
+        """
+        Тест на то, что полуоткрытая цепь пропускает ровно один пробный запрос, даже при одновременных вызовах.
+        """
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock.monotonic)
+        breaker.record_failure()
+        assert not breaker.allow(), "Цепь пропустила запрос до истечения reset_timeout"
+
+        clock.sleep(5)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            allowed = list(executor.map(lambda _: breaker.allow(), range(64)))
+        assert allowed.count(True) == 1, f"Пробных запросов пропущено: {allowed.count(True)}"
+        assert breaker.state == "half_open"
+
+        breaker.record_success()
+        assert all(breaker.allow() for _ in range(3)), "Замкнутая цепь не пропускает запросы"
+
+    def test_retry_after_respected_and_capped(self, stub_server, stub_requester, clock):
+        """
+        Тест на то, что пауза перед повтором берётся из Retry-After (а не из jitter) и ограничена max_retry_after.
+        """
+        stub_requester.circuit_breaker_enabled = False
+        statuses = self._count_attempts(stub_requester)
+        stub_server.error_rate = 1.0 # двойник отвечает 503 с Retry-After: 1
+
+        stub_requester.retry_policy = RetryPolicy(max_attempts=3, backoff_base=100)
+        stub_requester.send_request("GET", MOVIES_ENDPOINT) # без expected_status: 503 повторяется
+        assert statuses == [503, 503, 503]
+        assert clock.sleeps == [1.0, 1.0]
+
+        clock.sleeps.clear()
+        stub_requester.retry_policy = RetryPolicy(max_attempts=3, max_retry_after=0.25)
+        stub_requester.send_request("GET", MOVIES_ENDPOINT)
+        assert clock.sleeps == [0.25, 0.25]
+
+        response = SimpleNamespace(headers={"Retry-After": "Wed, 21 Oct 2099 07:28:00 GMT"})
+        assert RetryPolicy(max_retry_after=30).delay(1, response) == 30, "Retry-After в виде даты не ограничен"
+
+    def test_non_idempotent_method_not_retried_by_default(self, stub_server, stub_requester, clock):
+        """
+        Тест на то, что POST не повторяется политикой по умолчанию, а идемпотентный PUT - повторяется.
+        """
+        stub_requester.retry_policy = RetryPolicy(max_attempts=3)
+        stub_requester.circuit_breaker_enabled = False
+        statuses = self._count_attempts(stub_requester)
+        stub_server.error_rate = 1.0
+
+        assert stub_requester.send_request("POST", MOVIES_ENDPOINT, json={}).status_code == 503
+        assert statuses == [503], "POST повторён, хотя повтор мог создать фильм дважды"
+        assert not clock.sleeps
+
+        statuses.clear()
+        assert stub_requester.send_request("PUT", f"{MOVIES_ENDPOINT}/1", json={}).status_code == 503
+        assert statuses == [503, 503, 503]
@@ -0,0 +1,159 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+# Значения по умолчанию параметров GET /movies
+DEFAULT_QUERY = {
+    "pageSize": 10,
+    "page": 1,
+    "minPrice": 0, # как у двойника: фильм с ценой 0 проходит валидацию и виден без фильтра
+    "maxPrice": 1000,
+    "createdAt": "desc",
+}
+
+
+class CatalogMirror:
+    """
+    Локальная копия афиши с индексами для проверки фильтров get_movies без лишних запросов к API.
+    Индексы: по ID, по локации, по цене (отсортированный список для bisect) и по createdAt.
+
+    sync() догружает только фильмы новее уже известных (афиша читается по createdAt=desc до первого
+    знакомого фильма), full_sync() перестраивает копию целиком. Изменения и удаления существующих
+    фильмов инкрементальная синхронизация не видит: их отражают upsert()/discard() или full_sync().
+    """
+
+    def __init__(self, movies_api, page_size=100):
+        """
+        :param movies_api: MoviesAPI, через который читается афиша.
+        :param page_size: Размер страницы при синхронизации.
+        """
+        self.movies_api = movies_api
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.by_id = {}
+        self.by_location = {}
+        self._by_price = [] # (price, id)
+        self._by_created = [] # (createdAt, id)
+        # Самый поздний createdAt, до которого копия синхронизирована, по значению published
+        self.synced_until = {True: "", False: ""}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, movie_id):
+        return movie_id in self.by_id
+
+    # --- индексы ---
+
+    def _remove_from_indexes(self, movie):
+        movie_id = movie["id"]
+        self.by_location.get(movie["location"], set()).discard(movie_id)
+        for index, key in ((self._by_price, movie["price"]), (self._by_created, movie["createdAt"])):
+            position = bisect_left(index, (key, movie_id))
+            if position < len(index) and index[position] == (key, movie_id):
+                del index[position]
+
+    def _upsert(self, movie):
+        previous = self.by_id.get(movie["id"])
+        if previous is not None:
+            self._remove_from_indexes(previous)
+        self.by_id[movie["id"]] = movie
+        self.by_location.setdefault(movie["location"], set()).add(movie["id"])
+        insort(self._by_price, (movie["price"], movie["id"]))
+        insort(self._by_created, (movie["createdAt"], movie["id"]))
+
+    def upsert(self, movie):
+        """Добавляет или обновляет фильм (например, после create_movie/update_movie в тесте)."""
+        with self._lock:
+            self._upsert(movie)
+
+    def discard(self, movie_id):
+        """Убирает фильм из копии (например, после delete_movie в тесте)."""
+        with self._lock:
+            movie = self.by_id.pop(movie_id, None)
+            if movie is not None:
+                self._remove_from_indexes(movie)
+
+    # --- синхронизация ---
+
+    def sync(self):
+        """
+        Догружает фильмы, созданные после последней синхронизации.
+        Опубликованные и неопубликованные фильмы читаются раздельно, каждый - до первого уже известного.
+        :return: Число новых или обновлённых фильмов.
+        """
+        loaded = 0
+        for published in (True, False):
+            filters = {"published": published, "createdAt": "desc"}
+            synced_until = self.synced_until[published]
+            newest = synced_until
+            # Генератор прерывается на первом старом фильме - следующие страницы не запрашиваются
+            for movie in self.movies_api.iter_movies(filters, page_size=self.page_size):
+                # Равный createdAt не останавливает: в ту же миллисекунду мог быть создан ещё один фильм
+                if movie["createdAt"] < synced_until:
+                    break
+                newest = max(newest, movie["createdAt"])
+                with self._lock:
+                    self._upsert(movie)
+                loaded += 1
+            self.synced_until[published] = newest
+        return loaded
+
+    def full_sync(self):
+        """Перестраивает копию с нуля. :return: Число фильмов в копии."""
+        with self._lock:
+            self._clear()
+        self.sync()
+        return len(self)
+
+    # --- запросы ---
+
+    def filter_ids(self, params=None):
+        """
+        ID фильмов, которые get_movies должен вернуть для params (без пагинации), в порядке выдачи.
+        Поддерживаются minPrice, maxPrice, locations, published, genreId и createdAt (asc/desc).
+        """
+        params = {**DEFAULT_QUERY, **(params or {})}
+        locations = params.get("locations")
+        if isinstance(locations, str):
+            locations = locations.split(",")
+        published = params.get("published")
+        if isinstance(published, str):
+            published = published.lower() == "true"
+        genre_id = params.get("genreId")
+
+        with self._lock:
+            low = bisect_left(self._by_price, (int(params["minPrice"]),))
+            high = bisect_right(self._by_price, (int(params["maxPrice"]), float("inf")))
+            candidates = {movie_id for _, movie_id in self._by_price[low:high]}
+            if locations:
+                candidates &= set().union(*(self.by_location.get(location, ()) for location in locations))
+            if published is not None or genre_id is not None:
+                candidates = {
+                    movie_id for movie_id in candidates
+                    if (published is None or self.by_id[movie_id]["published"] == published)
+                    and (genre_id is None or self.by_id[movie_id]["genreId"] == int(genre_id))
+                }
+            ordered = [movie_id for _, movie_id in self._by_created if movie_id in candidates]
+        if str(params["createdAt"]).lower() == "desc":
+            ordered.reverse()
+        return ordered
+
+    def query(self, params=None):
+        """
+        Ожидаемый ответ get_movies для params, посчитанный по локальным индексам.
+        :return: Словарь той же структуры, что ответ API: movies, count, page, pageSize, pageCount.
+        """
+        params = {**DEFAULT_QUERY, **(params or {})}
+        ordered = self.filter_ids(params)
+        page_size, page = int(params["pageSize"]), int(params["page"])
+        offset = (page - 1) * page_size
+        return {
+            "movies": [self.by_id[movie_id] for movie_id in ordered[offset:offset + page_size]],
+            "count": len(ordered),
+            "page": page,
+            "pageSize": page_size,
+            "pageCount": -(-len(ordered) // page_size)
+        }
@@ -0,0 +1,74 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+
+class CleanupRegistry:
+    """
+    Реестр созданных в тестах сущностей (фильмов и пользователей).
+    MoviesAPI.create_movie и AuthAPI.register_user записывают сюда ID автоматически,
+    а в конце сессии drain() удаляет всё параллельно. Повторы при 429/5xx и сетевых ошибках выполняет
+    политика повторов CustomRequester, здесь запросы не дублируются.
+    """
+    # Статусы, при которых удаление считается выполненным (404 - уже удалено в самом тесте)
+    done_statuses = (200, 204, 404)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.movie_ids = set()
+        self.user_ids = set()
+
+    def add_movie(self, movie_id):
+        with self._lock:
+            self.movie_ids.add(movie_id)
+
+    def discard_movie(self, movie_id):
+        with self._lock:
+            self.movie_ids.discard(movie_id)
+
+    def add_user(self, user_id):
+        with self._lock:
+            self.user_ids.add(user_id)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            self.user_ids.discard(user_id)
+
+    def _delete(self, delete, entity_id):
+        """
+        Удаляет одну сущность.
+        :return: None, если сущность удалена, иначе (ID, статус-код или текст ошибки).
+        """
+        try:
+            status_code = delete(entity_id, expected_status=None).status_code
+        except pytest.fail.Exception as e:
+            # Сетевая ошибка или разомкнутая цепь после всех повторов - остальные сущности удаляем дальше
+            logger.warning("Не удалось удалить %s: %s", entity_id, e)
+            return entity_id, str(e)
+        return None if status_code in self.done_statuses else (entity_id, status_code)
+
+    def drain(self, api_manager, max_workers=10):
+        """
+        Параллельно удаляет все зарегистрированные фильмы и пользователей.
+        Ошибка одного удаления не прерывает остальные.
+        :param api_manager: ApiManager с правами администратора.
+        :param max_workers: Число одновременных DELETE-запросов.
+        :return: Список (ID, статус-код или текст ошибки) сущностей, которые удалить не удалось.
+        """
+        with self._lock:
+            tasks = [(api_manager.movies_api.delete_movie, movie_id) for movie_id in self.movie_ids]
+            tasks += [(api_manager.user_api.delete_user, user_id) for user_id in self.user_ids]
+            self.movie_ids = set()
+            self.user_ids = set()
+
+        if not tasks:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            results = list(executor.map(lambda task: self._delete(*task), tasks))
+
+        return [result for result in results if result is not None]
@@ -1,51 +1,216 @@
+import hashlib
+import os
 import random
+import secrets
 import string
+import threading
+from functools import lru_cache
+from itertools import count
+
 from faker import Faker
 
 faker = Faker()
 
+# Пулы значений для потоковых генераторов DataGenerator.movies()/users(): строятся Faker'ом один раз
+# и с фиксированным seed, поэтому поток с одним и тем же seed воспроизводим между запусками.
+# Пароли в общий пул не входят - у каждого потока users() свой пул от его seed
+_POOL_SEED = 1184
+_POOL_SIZE = 1000
+
+
+_BASE36_DIGITS = string.digits + string.ascii_lowercase
+
+
+def _base36(number, width=0):
+    digits = []
+    while number:
+        number, remainder = divmod(number, 36)
+        digits.append(_BASE36_DIGITS[remainder])
+    return "".join(reversed(digits)).rjust(width, "0") or "0"
+
+
+class UniqueIdAllocator:
+    """
+    Уникальные без координации между процессами идентификаторы для email и названий фильмов.
+    Идентификатор = <запуск><воркер>z<счётчик>, только строчные латинские буквы и цифры:
+    - запуск - 8 символов хэша PYTEST_XDIST_TESTRUNUID (общий для воркеров одного прогона xdist)
+      или случайного ID процесса (вне xdist, в т.ч. процессы load и разные прогоны);
+    - воркер - номер воркера xdist (gw3 -> 3), вне xdist пусто;
+    - счётчик - монотонный в пределах процесса, base36.
+    Длина запуска фиксирована, номер воркера состоит из цифр, поэтому "z" однозначно отделяет счётчик.
+    """
+
+    def __init__(self, run_id=None, worker_id=None):
+        """
+        :param run_id: ID прогона (по умолчанию PYTEST_XDIST_TESTRUNUID или случайный).
+        :param worker_id: ID воркера xdist вида gw3 (по умолчанию PYTEST_XDIST_WORKER).
+        """
+        self._lock = threading.Lock()
+        self.reset(run_id, worker_id)
+
+    def reset(self, run_id=None, worker_id=None):
+        """
+        Начинает последовательность заново с новым префиксом.
+        Для воспроизведения кассет: одинаковый run_id в записи и воспроизведении даёт те же ID.
+        """
+        # secrets, а не random: тесты с кассетой фиксируют random.seed, и ID повторялись бы между прогонами
+        run_id = run_id or os.environ.get("PYTEST_XDIST_TESTRUNUID") or secrets.token_hex(16)
+        worker_id = worker_id if worker_id is not None else os.environ.get("PYTEST_XDIST_WORKER", "")
+        run_hash = int(hashlib.sha1(run_id.encode("utf-8")).hexdigest()[:10], 16) # 40 бит -> 8 символов
+        with self._lock:
+            self.prefix = f"{_base36(run_hash, 8)}{''.join(c for c in worker_id if c.isdigit())}z"
+            self._counter = count()
+
+    def next_id(self):
+        with self._lock:
+            value = next(self._counter)
+        return f"{self.prefix}{_base36(value)}"
+
+
+# Общий для процесса распределитель (потоки делят один счётчик)
+unique_ids = UniqueIdAllocator()
+
+
+@lru_cache(maxsize=None)
+def _payload_pools():
+    pool_faker = Faker()
+    pool_faker.seed_instance(_POOL_SEED)
+    return {
+        "words": [word.capitalize() for word in pool_faker.get_words_list()],
+        "first_names": [pool_faker.first_name() for _ in range(_POOL_SIZE)],
+        "last_names": [pool_faker.last_name() for _ in range(_POOL_SIZE)],
+        "descriptions": [pool_faker.paragraph(nb_sentences=3) for _ in range(_POOL_SIZE)],
+    }
+
+
 class DataGenerator:
 
     @staticmethod
     def generate_random_email():
-        random_string = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-        return f"kek{random_string}@gmail.com"
+        return f"kek{unique_ids.next_id()}@gmail.com"
 
     @staticmethod
     def generate_random_name():
         return f"{faker.first_name()} {faker.last_name()}"
 
     @staticmethod
-    def generate_random_password():
+    def generate_random_password(rng=random):
         """
         Генерация пароля, соответствующего требованиям:
         - Минимум 1 буква.
         - Минимум 1 цифра.
         - Допустимые символы.
         - Длина от 8 до 20 символов.
+        :param rng: Источник случайности (модуль random или random.Random с seed).
         """
         # Гарантируем наличие хотя бы одной буквы и одной цифры
-        letters = random.choice(string.ascii_letters)  # Одна буква
-        digits = random.choice(string.digits)  # Одна цифра
+        letters = rng.choice(string.ascii_letters)  # Одна буква
+        digits = rng.choice(string.digits)  # Одна цифра
 
         # Дополняем пароль случайными символами из допустимого набора
         special_chars = "?@#$%^&*|:"
         all_chars = string.ascii_letters + string.digits + special_chars
-        remaining_length = random.randint(6, 18)  # Остальная длина пароля (минимум 8, максимум 20)
-        remaining_chars = ''.join(random.choices(all_chars, k=remaining_length))
+        remaining_length = rng.randint(6, 18)  # Остальная длина пароля (минимум 8, максимум 20)
+        remaining_chars = ''.join(rng.choices(all_chars, k=remaining_length))
 
         # Перемешиваем пароль для рандомизации
         password = list(letters + digits + remaining_chars)
-        random.shuffle(password)
+        rng.shuffle(password)
 
         return ''.join(password)
 
+    @staticmethod
+    def generate_user_data():
+        """
+        Генерация данных для регистрации пользователя.
+        """
+        password = DataGenerator.generate_random_password()
+        return {
+            "email": DataGenerator.generate_random_email(),
+            "fullName": DataGenerator.generate_random_name(),
+            "password": password,
+            "passwordRepeat": password,
+            "roles": ["USER"]
+        }
+
+    @staticmethod
+    def generate_movie_data():
+        """
+        Генерация данных для создания фильма.
+        """
+        return {
+            "name": DataGenerator.generate_movie_title(),
+            "imageUrl": DataGenerator.generate_image_url(),
+            "price": DataGenerator.generate_price(),
+            "description": DataGenerator.generate_description(),
+            "location": DataGenerator.generate_location(),
+            "published": True,
+            "genreId": 1
+        }
+
+    @staticmethod
+    def movies(n=None, seed=None, ids=None):
+        """
+        Ленивый поток данных для создания фильмов (той же структуры, что generate_movie_data).
+        Поля берутся из заранее построенных пулов без вызовов Faker на каждый фильм - для массового
+        наполнения (MoviesAPI.create_movies_bulk) и нагрузочных прогонов.
+        :param n: Число фильмов (None - бесконечный поток).
+        :param seed: Seed потока: один и тот же seed даёт одну и ту же последовательность
+                     (None - seed из глобального random, поэтому учитывается random.seed()).
+                     Уникальный суффикс названия берётся из ids и от seed не зависит.
+        :param ids: UniqueIdAllocator для суффиксов названий (по умолчанию общий unique_ids).
+        """
+        pools = _payload_pools()
+        next_id = (ids or unique_ids).next_id
+        words, descriptions = pools["words"], pools["descriptions"]
+        rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        choice, getrandbits, rand = rng.choice, rng.getrandbits, rng.random
+        for _ in (range(n) if n is not None else count()):
+            yield {
+                "name": f"The {choice(words)} of {choice(words)} #{next_id()}",
+                "imageUrl": f"https://cdn.movies.com/posters/movie_{getrandbits(40):010x}.jpg",
+                "price": 1 + int(rand() * 1000),
+                "description": choice(descriptions),
+                "location": "SPB" if rand() < 0.5 else "MSK",
+                "published": True,
+                "genreId": 1
+            }
+
+    @staticmethod
+    def users(n=None, seed=None, ids=None):
+        """
+        Ленивый поток данных для регистрации пользователей (той же структуры, что generate_user_data)
+        из заранее построенных пулов имён.
+        :param n: Число пользователей (None - бесконечный поток).
+        :param seed: Seed потока: один и тот же seed даёт одну и ту же последовательность
+                     (None - seed из глобального random, поэтому учитывается random.seed()).
+                     Пароли берутся из собственного пула потока, построенного от этого seed, а не из общего
+                     для всех машин. Email строится из ids и от seed не зависит.
+        :param ids: UniqueIdAllocator для email (по умолчанию общий unique_ids).
+        """
+        pools = _payload_pools()
+        next_id = (ids or unique_ids).next_id
+        first_names, last_names = pools["first_names"], pools["last_names"]
+        rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        passwords = [DataGenerator.generate_random_password(rng)
+                     for _ in range(_POOL_SIZE if n is None else min(n, _POOL_SIZE))]
+        choice = rng.choice
+        for _ in (range(n) if n is not None else count()):
+            password = choice(passwords)
+            yield {
+                "email": f"kek{next_id()}@gmail.com",
+                "fullName": f"{choice(first_names)} {choice(last_names)}",
+                "password": password,
+                "passwordRepeat": password,
+                "roles": ["USER"]
+            }
+
     @staticmethod
     def generate_movie_title():
         # Генерируем название фильма (например, "The Secret of XXXXXX")
         adjective = faker.word().capitalize()
         noun = faker.word().capitalize()
-        return f"The {adjective} of {noun} #{random.randint(100, 999)}"
+        return f"The {adjective} of {noun} #{unique_ids.next_id()}"
 
     @staticmethod
     def generate_image_url():
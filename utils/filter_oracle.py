@@ -0,0 +1,165 @@
+import time
+from functools import partial
+from itertools import product
+
+from utils.histogram import LatencyHistogram
+
+# Измерения сетки фильтров get_movies: имя параметра (или кортеж имён) -> значения; None - параметр не передаётся
+FILTER_GRID = {
+    "pageSize": (5, 20),
+    "page": (1, 2),
+    ("minPrice", "maxPrice"): ((1, 1000), (1, 300), (300, 700), (900, 1000)),
+    "locations": (None, ["MSK"], ["SPB"], ["MSK", "SPB"]),
+    "published": (None, True, False),
+    "createdAt": ("asc", "desc"),
+}
+
+
+def filter_combinations(grid=None):
+    """
+    Все сочетания параметров get_movies из сетки (декартово произведение измерений).
+    :param grid: Сетка в формате FILTER_GRID (по умолчанию FILTER_GRID).
+    :return: Список словарей params.
+    """
+    grid = grid or FILTER_GRID
+    combinations = []
+    for values in product(*grid.values()):
+        params = {}
+        for names, value in zip(grid, values):
+            if value is None:
+                continue
+            if isinstance(names, tuple):
+                params.update(zip(names, value))
+            else:
+                params[names] = value
+        combinations.append(params)
+    return combinations
+
+
+class FilterCheck:
+    """
+    Результат проверки одного сочетания параметров: задержка запроса и расхождения с локальной копией.
+    """
+    def __init__(self, params, latency, mismatches):
+        self.params = params
+        self.latency = latency
+        self.mismatches = mismatches # описания расхождений; пустой список - страница совпала
+
+    @property
+    def ok(self):
+        return not self.mismatches
+
+    def __str__(self):
+        return f"{self.params} ({self.latency * 1000:.1f} мс): {'; '.join(self.mismatches) or 'ok'}"
+
+
+class FilterOracleReport:
+    """
+    Итог прогона FilterOracle: проверки по сочетаниям, число перепроверок и общее время.
+    """
+    def __init__(self):
+        self.checks = []
+        self.rechecked = 0 # сочетаний, перепроверенных после повторной синхронизации
+        self.elapsed = 0.0
+
+    @property
+    def mismatches(self):
+        return [check for check in self.checks if not check.ok]
+
+    @property
+    def histogram(self):
+        histogram = LatencyHistogram()
+        for check in self.checks:
+            histogram.record(check.latency)
+        return histogram
+
+    def slowest(self, count=5):
+        """Самые медленные сочетания параметров."""
+        return sorted(self.checks, key=lambda check: check.latency, reverse=True)[:count]
+
+    def __str__(self):
+        histogram = self.histogram
+        lines = [
+            f"Проверено сочетаний: {len(self.checks)}, расхождений: {len(self.mismatches)}, "
+            f"перепроверено: {self.rechecked}, время: {self.elapsed:.2f} с",
+            f"Задержка, мс: p50 {histogram.percentile(50) * 1000:.1f}, p95 {histogram.percentile(95) * 1000:.1f}, "
+            f"max {histogram.max * 1000:.1f}",
+            "Самые медленные:",
+            *(f"  {check}" for check in self.slowest()),
+        ]
+        if self.mismatches:
+            lines += ["Расхождения:", *(f"  {check}" for check in self.mismatches)]
+        return "\n".join(lines)
+
+
+class FilterOracle:
+    """
+    Проверка фильтров get_movies по сетке сочетаний параметров: запросы идут параллельно (ApiManager.gather),
+    каждая страница сравнивается с ожидаемой, посчитанной по CatalogMirror.
+    Афишу могут параллельно менять другие тесты, поэтому расхождения перепроверяются после полной
+    пересинхронизации копии, пока перепроверка не пройдёт без изменений афиши (не больше rechecks раз).
+    """
+
+    def __init__(self, api_manager, mirror, max_workers=None, rechecks=5):
+        """
+        :param api_manager: ApiManager, через который идут запросы.
+        :param mirror: CatalogMirror той же афиши.
+        :param max_workers: Одновременных запросов (по умолчанию - размер пула соединений).
+        :param rechecks: Максимум перепроверок расхождений.
+        """
+        self.api_manager = api_manager
+        self.mirror = mirror
+        self.max_workers = max_workers
+        self.rechecks = rechecks
+
+    def _check(self, params):
+        start = time.perf_counter()
+        actual = self.api_manager.movies_api.get_movies(params=params).json()
+        latency = time.perf_counter() - start
+        expected = self.mirror.query(params)
+
+        mismatches = [
+            f"{field}: ожидалось {expected[field]}, получено {actual.get(field)}"
+            for field in ("count", "page", "pageSize", "pageCount")
+            if actual.get(field) != expected[field]
+        ]
+        actual_ids = [movie["id"] for movie in actual.get("movies", [])]
+        expected_ids = [movie["id"] for movie in expected["movies"]]
+        if actual_ids != expected_ids:
+            mismatches.append(f"ID на странице: ожидалось {expected_ids}, получено {actual_ids}")
+        return FilterCheck(params, latency, mismatches)
+
+    def _check_all(self, combinations):
+        return self.api_manager.gather(
+            [partial(self._check, params) for params in combinations], max_workers=self.max_workers
+        )
+
+    def run(self, combinations=None):
+        """
+        Проверяет сочетания параметров.
+        :param combinations: Список params (по умолчанию filter_combinations()).
+        :return: FilterOracleReport.
+        """
+        combinations = combinations if combinations is not None else filter_combinations()
+        report = FilterOracleReport()
+        start = time.perf_counter()
+        self.mirror.sync()
+        report.checks = self._check_all(combinations)
+
+        for _ in range(self.rechecks):
+            failed = [index for index, check in enumerate(report.checks) if not check.ok]
+            if not failed:
+                break
+            self.mirror.full_sync()
+            snapshot = dict(self.mirror.by_id)
+            rechecked = self._check_all([report.checks[index].params for index in failed])
+            for index, check in zip(failed, rechecked):
+                report.checks[index] = check
+            report.rechecked += len(failed)
+            # Афиша не менялась во время перепроверки - оставшиеся расхождения не вызваны чужими тестами
+            self.mirror.full_sync()
+            if self.mirror.by_id == snapshot:
+                break
+
+        report.elapsed = time.perf_counter() - start
+        return report
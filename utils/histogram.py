@@ -0,0 +1,96 @@
+class LatencyHistogram:
+    """
+    Гистограмма задержек в стиле HdrHistogram: значения хранятся в микросекундах
+    в лог-линейных корзинах с относительной погрешностью не более ~1.6%.
+    Память не зависит от числа записей, гистограммы можно сливать (merge) и сериализовать.
+    """
+    SUB_BUCKET_BITS = 7
+    SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+    SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+
+    def __init__(self):
+        self.counts = {}
+        self.total_count = 0
+        self.total_sum = 0 # мкс, точная сумма для среднего
+        self.min_value = None
+        self.max_value = None
+
+    @classmethod
+    def _index(cls, value):
+        if value < cls.SUB_BUCKET_COUNT:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        return (shift + 1) * cls.SUB_BUCKET_HALF + (value >> shift) - cls.SUB_BUCKET_HALF
+
+    @classmethod
+    def _highest_equivalent(cls, index):
+        if index < cls.SUB_BUCKET_COUNT:
+            return index
+        shift = index // cls.SUB_BUCKET_HALF - 1
+        sub_bucket = index % cls.SUB_BUCKET_HALF + cls.SUB_BUCKET_HALF
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds, count=1):
+        """Записывает задержку в секундах."""
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total_sum += value * count
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_value = value if self.max_value is None else max(self.max_value, value)
+
+    def percentile(self, percent):
+        """Возвращает значение (в секундах), не меньше которого percent% записей."""
+        if not self.total_count:
+            return 0.0
+        threshold = max(1, -(-self.total_count * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self._highest_equivalent(index), self.max_value) / 1_000_000
+        return self.max_value / 1_000_000
+
+    @property
+    def mean(self):
+        return self.total_sum / self.total_count / 1_000_000 if self.total_count else 0.0
+
+    @property
+    def min(self):
+        return (self.min_value or 0) / 1_000_000
+
+    @property
+    def max(self):
+        return (self.max_value or 0) / 1_000_000
+
+    def merge(self, other):
+        """Добавляет к этой гистограмме записи другой гистограммы."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        for value in (other.min_value, other.max_value):
+            if value is not None:
+                self.min_value = value if self.min_value is None else min(self.min_value, value)
+                self.max_value = value if self.max_value is None else max(self.max_value, value)
+        return self
+
+    def to_dict(self):
+        return {
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "total_count": self.total_count,
+            "total_sum": self.total_sum,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.total_count = data["total_count"]
+        histogram.total_sum = data["total_sum"]
+        histogram.min_value = data["min_value"]
+        histogram.max_value = data["max_value"]
+        return histogram
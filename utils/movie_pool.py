@@ -0,0 +1,127 @@
+import json
+import os
+import zlib
+from itertools import count
+
+from filelock import FileLock
+
+from constants import MOVIE_POOL_PATH, MOVIE_POOL_SIZE
+from utils.cleanup_registry import CleanupRegistry
+from utils.data_generator import DataGenerator, unique_ids
+
+# Поля тела POST /movies - по ним строится копия фильма из пула
+MOVIE_PAYLOAD_FIELDS = ("name", "imageUrl", "price", "description", "location", "published", "genreId")
+
+
+class MoviePool:
+    """
+    Общий для воркеров pytest-xdist пул заранее созданных фильмов для тестов, которые только читают.
+    Первый открывший пул воркер создаёт фильмы параллельно (create_movies_bulk), остальные читают их
+    из файла; последний закрывший - удаляет их пакетно. Файл привязан к прогону (PYTEST_XDIST_TESTRUNUID),
+    поэтому параллельные прогоны не делят фильмы.
+    Тесты, которые меняют или удаляют фильм, берут собственную копию через clone() (clone-on-write).
+    """
+
+    def __init__(self, api_manager, path=None, size=MOVIE_POOL_SIZE, concurrency=None, seed=None, ids=None):
+        """
+        :param api_manager: ApiManager, авторизованный администратором, без cleanup_registry
+                            (фильмы пула удаляет сам пул, когда он больше никому не нужен).
+        :param path: Путь к файлу пула (по умолчанию - свой на каждый прогон).
+        :param size: Число фильмов в пуле.
+        :param concurrency: Одновременных запросов при создании (по умолчанию - размер пула соединений).
+        :param seed: Seed данных фильмов (см. DataGenerator.movies).
+        :param ids: UniqueIdAllocator для названий фильмов. Свои seed и ids делают пул одинаковым независимо
+                    от того, какой тест его создал (нужно для воспроизведения кассет).
+        """
+        self.api_manager = api_manager
+        run_id = os.environ.get("PYTEST_XDIST_TESTRUNUID", str(os.getpid()))
+        self.path = path or f"{MOVIE_POOL_PATH}_{run_id}.json"
+        self.size = size
+        self.concurrency = concurrency or api_manager.pool_size
+        self.seed = seed
+        self.ids = ids
+        self.owner = f"{os.environ.get('PYTEST_XDIST_WORKER', 'main')}:{os.getpid()}"
+        self.movies = []
+        # Блокировка одна на хост, а не на прогон - чтобы lock-файлы не копились во временной папке
+        self._file_lock = FileLock(f"{path or MOVIE_POOL_PATH}.lock")
+        self._next_index = count()
+
+    def _read_state(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"movies": [], "owners": []}
+
+    def _write_state(self, state):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def open(self):
+        """
+        Подключается к пулу, при необходимости создавая фильмы.
+        :raises RuntimeError: Если часть фильмов создать не удалось.
+        """
+        with self._file_lock:
+            state = self._read_state()
+            if not state["movies"]:
+                payloads = list(DataGenerator.movies(self.size, seed=self.seed, ids=self.ids))
+                report = self.api_manager.movies_api.create_movies_bulk(payloads, concurrency=self.concurrency)
+                if report.failures:
+                    self._delete(report.created_ids)
+                    raise RuntimeError(f"Не удалось создать пул фильмов: {report}. Ошибки: {report.failures[:3]}")
+                # В порядке данных, а не завершения запросов: порядок выдачи get() не зависит от сети
+                created = {movie["name"]: movie for movie in report.created_movies}
+                state["movies"] = [created[payload["name"]] for payload in payloads]
+            state["owners"].append(self.owner)
+            self._write_state(state)
+        self.movies = state["movies"]
+        return self
+
+    def close(self, delete=True):
+        """
+        Отключается от пула; последний отключившийся удаляет фильмы и файл пула.
+        :param delete: False - только отключиться (например, при воспроизведении кассеты, когда на сервере
+                       ничего не создавалось).
+        :return: Список (ID, статус) фильмов, которые удалить не удалось.
+        """
+        with self._file_lock:
+            state = self._read_state()
+            if self.owner in state["owners"]:
+                state["owners"].remove(self.owner)
+            if state["owners"]:
+                self._write_state(state)
+                return []
+            os.remove(self.path)
+        return self._delete([movie["id"] for movie in state["movies"]]) if delete else []
+
+    def _delete(self, movie_ids):
+        registry = CleanupRegistry()
+        for movie_id in movie_ids:
+            registry.add_movie(movie_id)
+        return registry.drain(self.api_manager, max_workers=self.concurrency)
+
+    def get(self, key=None):
+        """
+        Фильм из пула только для чтения.
+        :param key: Ключ выбора (например, nodeid теста): один и тот же ключ - один и тот же фильм,
+                    независимо от порядка тестов и воркера. None - по кругу.
+        :return: Копия тела ответа на создание фильма.
+        """
+        index = next(self._next_index) if key is None else zlib.crc32(key.encode("utf-8"))
+        return dict(self.movies[index % len(self.movies)])
+
+    def clone(self, movies_api, movie=None, key=None):
+        """
+        Создаёт собственную копию фильма из пула для теста, который его меняет или удаляет.
+        :param movies_api: MoviesAPI теста (с cleanup_registry - копия будет удалена в конце сессии).
+        :param movie: Фильм-образец (по умолчанию - get(key)).
+        :param key: Ключ выбора образца, см. get().
+        :return: Тело ответа на создание копии.
+        """
+        movie = movie or self.get(key)
+        payload = {field: movie[field] for field in MOVIE_PAYLOAD_FIELDS}
+        payload["name"] = f"{movie['name'].rsplit(' #', 1)[0]} #{unique_ids.next_id()}"
+        return movies_api.create_movie(payload).json()
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+
+from filelock import FileLock
+
+from constants import TOKEN_CACHE_PATH, TOKEN_DEFAULT_TTL, TOKEN_REFRESH_MARGIN
+
+
+class TokenCache:
+    """
+    Кэш токенов авторизации, общий для потоков и процессов (воркеров pytest-xdist).
+    Хранилище - JSON-файл под файловой блокировкой. Токен считается устаревшим
+    за refresh_margin секунд до истечения exp из JWT, чтобы обновить его заранее.
+    """
+
+    def __init__(self, path=TOKEN_CACHE_PATH, refresh_margin=TOKEN_REFRESH_MARGIN, default_ttl=TOKEN_DEFAULT_TTL):
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self._file_lock = FileLock(f"{path}.lock")
+        self._thread_lock = threading.Lock()
+        self._memory = {}
+
+    @staticmethod
+    def make_key(base_url, email, password):
+        """Ключ кэша: хэш от base_url и кредов (пароль в открытом виде в файл не попадает)."""
+        return hashlib.sha256(f"{base_url}\0{email}\0{password}".encode("utf-8")).hexdigest()
+
+    def token_expiry(self, token):
+        """
+        Возвращает время истечения токена (unix time) из поля exp JWT.
+        Если токен не JWT или exp отсутствует - now + default_ttl.
+        """
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return time.time() + self.default_ttl
+
+    def _is_fresh(self, entry):
+        return entry is not None and entry["expires_at"] - self.refresh_margin > time.time()
+
+    def _read_store(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                store = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        try:
+            os.chmod(self.path, 0o600) # файл мог остаться от версии, создававшей его доступным всем
+        except OSError:
+            pass
+        return store
+
+    def _write_store(self, store):
+        # В файле токены (в т.ч. администратора) в открытом виде - читать его может только владелец
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            json.dump(store, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Возвращает свежий токен из кэша или получает новый через fetch().
+        Пока один процесс логинится, остальные ждут на блокировке и затем читают его токен.
+        :param key: Ключ из make_key.
+        :param fetch: Функция без аргументов, возвращающая токен или None.
+        """
+        entry = self._memory.get(key)
+        if self._is_fresh(entry):
+            return entry["token"]
+
+        with self._thread_lock, self._file_lock:
+            store = self._read_store()
+            entry = store.get(key)
+            if not self._is_fresh(entry):
+                token = fetch()
+                if not token:
+                    return None
+                entry = {"token": token, "expires_at": self.token_expiry(token)}
+                store[key] = entry
+                self._write_store(store)
+            self._memory[key] = entry
+            return entry["token"]
+
+    def invalidate(self, key, token=None):
+        """
+        Удаляет токен из кэша (например, если сервер его отверг).
+        :param token: Отвергнутый токен: если другой поток или воркер уже заменил его новым, запись не удаляется.
+        """
+        with self._thread_lock, self._file_lock:
+            if token is None or self._memory.get(key, {}).get("token") == token:
+                self._memory.pop(key, None)
+            store = self._read_store()
+            entry = store.get(key)
+            if entry is not None and (token is None or entry["token"] == token):
+                del store[key]
+                self._write_store(store)
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from functools import partial
+
+from filelock import FileLock
+
+from constants import USER_POOL_LEASE_TTL, USER_POOL_PATH, USER_POOL_SIZE
+from utils.data_generator import DataGenerator
+
+
+class UserPool:
+    """
+    Пул заранее зарегистрированных пользователей, общий для воркеров pytest-xdist.
+    Пользователи хранятся в JSON-файле под файловой блокировкой и переживают запуск,
+    тест берёт пользователя в эксклюзивную аренду (lease) и возвращает его после себя (release).
+    """
+
+    def __init__(self, api_manager, path=USER_POOL_PATH, size=USER_POOL_SIZE, low_watermark=None,
+                 lease_ttl=USER_POOL_LEASE_TTL):
+        """
+        :param api_manager: Неавторизованный ApiManager, через который регистрируются пользователи.
+        :param path: Путь к файлу пула.
+        :param size: Желаемое число свободных пользователей.
+        :param low_watermark: Порог свободных пользователей, ниже которого пул пополняется в фоне.
+        :param lease_ttl: Через сколько секунд аренда упавшего воркера считается брошенной.
+        """
+        self.api_manager = api_manager
+        self.path = path
+        self.size = size
+        self.low_watermark = low_watermark if low_watermark is not None else max(1, size // 4)
+        self.lease_ttl = lease_ttl
+        self.owner = f"{os.environ.get('PYTEST_XDIST_WORKER', 'main')}:{os.getpid()}"
+        self._file_lock = FileLock(f"{path}.lock")
+        self._replenish_thread = None
+
+    def _read_users(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _write_users(self, users):
+        # В файле пароли пользователей в открытом виде - читать его может только владелец
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            json.dump(users, f, ensure_ascii=False)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    def _is_free(self, entry):
+        return entry["leased_by"] is None or time.time() - entry["leased_at"] > self.lease_ttl
+
+    def _register_users(self, count):
+        """Параллельно регистрирует count новых пользователей и возвращает записи для пула."""
+        users_data = list(DataGenerator.users(count))
+        responses = self.api_manager.gather(
+            [partial(self.api_manager.auth_api.register_user, user_data) for user_data in users_data]
+        )
+        entries = []
+        for user_data, response in zip(users_data, responses):
+            user = user_data.copy()
+            user["id"] = response.json()["id"]
+            entries.append({"user": user, "leased_by": None, "leased_at": 0})
+        return entries
+
+    def _is_alive(self, users):
+        """
+        Проверяет логином одного пользователя, что пул ещё существует на сервере
+        (база стенда могла быть очищена, локальный двойник - перезапущен).
+        """
+        user = users[0]["user"]
+        response = self.api_manager.auth_api.login_user(
+            {"email": user["email"], "password": user["password"]}, expected_status=None
+        )
+        return response.status_code == 200
+
+    def ensure(self):
+        """
+        Догоняет пул до size свободных пользователей.
+        Выполняется под блокировкой, поэтому при старте xdist регистрирует пользователей только один воркер.
+        """
+        with self._file_lock:
+            users = self._read_users()
+            if users and not self._is_alive(users):
+                users = []
+            missing = self.size - sum(1 for entry in users if self._is_free(entry))
+            if missing > 0:
+                users.extend(self._register_users(missing))
+                self._write_users(users)
+
+    def _replenish(self):
+        """Фоновое пополнение: регистрация идёт вне блокировки, чтобы не задерживать аренду."""
+        with self._file_lock:
+            missing = self.size - sum(1 for entry in self._read_users() if self._is_free(entry))
+        if missing <= 0:
+            return
+        entries = self._register_users(missing)
+        with self._file_lock:
+            users = self._read_users()
+            users.extend(entries)
+            self._write_users(users)
+
+    def _maybe_replenish(self, free_count):
+        if free_count >= self.low_watermark:
+            return
+        if self._replenish_thread is not None and self._replenish_thread.is_alive():
+            return
+        self._replenish_thread = threading.Thread(target=self._replenish, daemon=True)
+        self._replenish_thread.start()
+
+    def lease(self):
+        """
+        Берёт свободного пользователя в эксклюзивную аренду.
+        Если свободных нет - регистрирует нового синхронно.
+        :return: Копия данных пользователя (email, fullName, password, passwordRepeat, roles, id).
+        """
+        with self._file_lock:
+            users = self._read_users()
+            free = [entry for entry in users if self._is_free(entry)]
+            if free:
+                entry = free[0]
+                entry["leased_by"] = self.owner
+                entry["leased_at"] = time.time()
+                self._write_users(users)
+                self._maybe_replenish(len(free) - 1)
+                return entry["user"].copy()
+
+        entry = self._register_users(1)[0]
+        entry["leased_by"] = self.owner
+        entry["leased_at"] = time.time()
+        with self._file_lock:
+            users = self._read_users()
+            users.append(entry)
+            self._write_users(users)
+        self._maybe_replenish(0)
+        return entry["user"].copy()
+
+    def release(self, user):
+        """Возвращает пользователя в пул."""
+        with self._file_lock:
+            users = self._read_users()
+            for entry in users:
+                if entry["user"]["id"] == user["id"] and entry["leased_by"] == self.owner:
+                    entry["leased_by"] = None
+                    entry["leased_at"] = 0
+            self._write_users(users)
+
+    def close(self):
+        """Дожидается завершения фонового пополнения."""
+        if self._replenish_thread is not None:
+            self._replenish_thread.join()